@@ -5,14 +5,58 @@ A math quiz game with three difficulty levels.
 Users answer 10 questions and get scored based on their performance.
 """
 
+import time
+# Taken before the other imports so --profile-startup can time them
+IMPORT_STARTED = time.perf_counter()
+
+import struct
+import sys
 import tkinter as tk
-from tkinter import messagebox
-import random
+from pathlib import Path
+
+from adaptive import LEVELS, AdaptiveScheduler, ResponseTimes
+from results_log import ResultsWriter, MAX_QUESTIONS
+from review import ReviewStore
+import instrument
+from quiz_engine import (
+    QuizEngine, RESULT_CORRECT, RESULT_TRY_AGAIN, grade_for
+)
+
+# Colour used to show each grade on the results screen
+GRADE_COLORS = {
+    'A+': '#10b981',
+    'A': '#10b981',
+    'B': '#3b82f6',
+    'C': '#f59e0b',
+    'D': '#ef4444'
+}
+
+# Colour used for each quiz mode (menu buttons and the question badge)
+DIFFICULTY_COLORS = {
+    'easy': '#10b981',
+    'moderate': '#f59e0b',
+    'hard': '#ef4444',
+    'division': '#8b5cf6',
+    'powers': '#ec4899',
+    'mixed': '#0ea5e9'
+}
+
+# Every finished session is appended here
+RESULTS_PATH = Path(__file__).with_name("quiz_results.bin")
+
+# Methods timed when metrics are switched on (see instrument.py)
+HOT_METHODS = ('start_quiz', 'display_problem', 'check_answer', 'is_correct', 'display_results')
+
+# Every learner's spaced-repetition schedule (missed and slow facts)
+REVIEWS_PATH = Path(__file__).with_name("quiz_reviews.bin")
+DEFAULT_LEARNER = "Player"
+
+IMPORT_SECONDS = time.perf_counter() - IMPORT_STARTED
 
 class MathsQuiz:
     """Main quiz class"""
     
-    def __init__(self, root):
+    def __init__(self, root, learner=DEFAULT_LEARNER):
         """Setup the main window"""
         self.root = root
         self.root.title("Jareer's Mathematical Challenge Quiz")
@@ -22,31 +66,66 @@ class MathsQuiz:
         
         # Variables to track quiz state
         self.difficulty = ""
-        self.score = 0
-        self.question_num = 0
         self.total_questions = 10
-        self.attempt_count = 0
-        self.correct_ans = 0
-        self.number1 = 0
-        self.number2 = 0
-        self.math_operation = ""
-        self.questions_data = []
+        
+        # The engine owns questions and scoring, this class only draws them
+        self.engine = QuizEngine(total_questions=self.total_questions)
+        self.session = None
+        
+        # after() id of the pending move to the next question, if any
+        self.next_pending = None
+        
+        # Set by main() when metrics are switched on; transition_due is
+        # when the pending move to the next question should happen
+        self.metrics = None
+        self.transition_due = 0.0
+        
+        # How long each question took, from being shown to being answered
+        self.response_times = ResponseTimes(capacity=50)
+        self.shown_at = 0.0
+        
+        # (answer, attempts, seconds) for each question, saved at the end
+        self.chosen_difficulty = ""
+        self.answer_history = []
+        self.results_writer = None
+        
+        # Missed and slow facts come back for review (loaded with the first quiz)
+        self.learner = learner
+        self.review_store = None
+        self.reviews = None
+        
+        # Screens are built once and then reused (name -> frame)
+        self.screens = {}
+        self.current_screen = None
         
         # Show the main menu
         self.display_menu()
     
-    def clear_window(self):
-        """Clear everything from the window"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
+    def show_screen(self, name):
+        """Swap to a cached screen, building it the first time it is needed"""
+        screen = self.screens.get(name)
+        if screen is None:
+            builders = {
+                'menu': self.build_menu_screen,
+                'question': self.build_question_screen,
+                'results': self.build_results_screen
+            }
+            screen = builders[name]()
+            self.screens[name] = screen
+        
+        # Only repack when the visible screen actually changes
+        if screen is not self.current_screen:
+            if self.current_screen is not None:
+                self.current_screen.pack_forget()
+            screen.pack(fill='both', expand=True)
+            self.current_screen = screen
+        
+        return screen
     
-    def display_menu(self):
-        """Show the main menu with difficulty options"""
-        self.clear_window()
-        
+    def build_menu_screen(self):
+        """Build the main menu with difficulty options"""
         # Main background
         main_frame = tk.Frame(self.root, bg='#16213e')
-        main_frame.pack(fill='both', expand=True)
         
         # Top section
         header_frame = tk.Frame(main_frame, bg='#0f3460', height=120)
@@ -83,19 +162,20 @@ class MathsQuiz:
         
         # Container for buttons
         buttons_frame = tk.Frame(main_frame, bg='#16213e')
-        buttons_frame.pack(pady=30)
+        buttons_frame.pack(pady=(15, 5))
         
         # Three difficulty levels
         difficulty_info = [
-            ("🟢 EASY MODE", "Addition & Subtraction (1-9)", "easy", '#10b981'),
-            ("🟡 MODERATE MODE", "Addition & Subtraction (10-99)", "moderate", '#f59e0b'),
-            ("🔴 HARD MODE", "Multiplication (1-12)", "hard", '#ef4444')
+            ("🟢 EASY MODE", "Addition & Subtraction (1-9)", "easy"),
+            ("🟡 MODERATE MODE", "Addition & Subtraction (10-99)", "moderate"),
+            ("🔴 HARD MODE", "Multiplication (1-12)", "hard")
         ]
         
         # Create each button
-        for title_text, desc, level, btn_color in difficulty_info:
+        for title_text, desc, level in difficulty_info:
+            btn_color = DIFFICULTY_COLORS[level]
             container = tk.Frame(buttons_frame, bg='#16213e')
-            container.pack(pady=15)
+            container.pack(pady=8)
             
             # Button
             btn = tk.Button(
@@ -122,6 +202,62 @@ class MathsQuiz:
             )
             desc_label.pack(pady=3)
         
+        # Drills on the 1-12 facts, as a row of smaller buttons
+        drills_frame = tk.Frame(main_frame, bg='#16213e')
+        drills_frame.pack(pady=(0, 10))
+        drill_info = [
+            ("➗ Division", "division"),
+            ("🔺 Powers", "powers"),
+            ("🔀 Mixed", "mixed")
+        ]
+        for title_text, level in drill_info:
+            btn = tk.Button(
+                drills_frame,
+                text=title_text,
+                font=('Arial', 11, 'bold'),
+                bg=DIFFICULTY_COLORS[level],
+                fg='white',
+                width=11,
+                relief='flat',
+                cursor='hand2',
+                command=lambda lv=level: self.start_quiz(lv)
+            )
+            btn.pack(side='left', padx=5)
+        
+        # Extra options shown side by side
+        options_frame = tk.Frame(main_frame, bg='#16213e')
+        options_frame.pack()
+        
+        # Endless practice keeps asking questions until the user stops
+        self.endless_var = tk.BooleanVar(value=False)
+        endless_check = tk.Checkbutton(
+            options_frame,
+            text="♾ Endless practice",
+            variable=self.endless_var,
+            font=('Arial', 11),
+            fg='#94a3b8',
+            bg='#16213e',
+            selectcolor='#0f3460',
+            activebackground='#16213e',
+            activeforeground='#ffffff'
+        )
+        endless_check.pack(side='left', padx=10)
+        
+        # Adaptive mode starts at the chosen level and follows the user's speed
+        self.adaptive_var = tk.BooleanVar(value=False)
+        adaptive_check = tk.Checkbutton(
+            options_frame,
+            text="🧠 Adaptive difficulty",
+            variable=self.adaptive_var,
+            font=('Arial', 11),
+            fg='#94a3b8',
+            bg='#16213e',
+            selectcolor='#0f3460',
+            activebackground='#16213e',
+            activeforeground='#ffffff'
+        )
+        adaptive_check.pack(side='left', padx=10)
+        
         # Bottom text
         footer = tk.Label(
             main_frame,
@@ -131,139 +267,119 @@ class MathsQuiz:
             bg='#16213e'
         )
         footer.pack(side='bottom', pady=20)
+        
+        return main_frame
+    
+    def display_menu(self):
+        """Show the main menu with difficulty options"""
+        self.show_screen('menu')
     
     def start_quiz(self, difficulty):
         """Start the quiz with chosen difficulty"""
         self.difficulty = difficulty
-        self.score = 0
-        self.question_num = 0
-        self.questions_data = []
-        
-        # Create all 10 questions
-        for i in range(self.total_questions):
-            num1, num2 = self.random_int()
-            operation = self.decide_operation()
-            
-            # Calculate answer
-            if operation == '+':
-                answer = num1 + num2
-            elif operation == '-':
-                answer = num1 - num2
-            else:  # multiplication
-                answer = num1 * num2
-            
-            # Store question
-            self.questions_data.append({
-                'num1': num1,
-                'num2': num2,
-                'operation': operation,
-                'answer': answer
-            })
+        
+        self.response_times = ResponseTimes(capacity=50)
+        self.chosen_difficulty = difficulty
+        self.answer_history = []
+        
+        # Normal quizzes generate all 10 questions in one batch, endless
+        # and adaptive quizzes stream them in as they are needed (adaptive
+        # mode moves along the easy/moderate/hard levels only)
+        adaptive = self.adaptive_var.get() and difficulty in LEVELS
+        scheduler = AdaptiveScheduler(difficulty) if adaptive else None
+        self.session = self.engine.new_session(
+            difficulty,
+            endless=self.endless_var.get(),
+            scheduler=scheduler,
+            reviews=self.load_reviews()
+        )
         
         # Show first question
         self.display_problem()
     
-    def random_int(self):
-        """Generate random numbers based on difficulty"""
-        if self.difficulty == "easy":
-            return random.randint(1, 9), random.randint(1, 9)
-        elif self.difficulty == "moderate":
-            return random.randint(10, 99), random.randint(10, 99)
-        else:  # hard
-            return random.randint(1, 12), random.randint(1, 12)
+    def load_reviews(self):
+        """The learner's review queues, reading the saved schedule the first time"""
+        if self.review_store is None:
+            try:
+                self.review_store = ReviewStore(str(REVIEWS_PATH))
+                self.reviews = self.review_store.learner(self.learner)
+            except (OSError, ValueError) as e:
+                # Reviews are a bonus - play on without them (and never
+                # save over a file that could not be read)
+                print(f"Could not load reviews: {e}")
+                self.review_store = False
+        return self.reviews
     
-    def decide_operation(self):
-        """Choose the operation type"""
-        if self.difficulty == "hard":
-            return '×'  # Multiplication for hard mode
-        else:
-            return random.choice(['+', '-'])  # Addition or subtraction
-    
-    def display_problem(self):
-        """Show a math question"""
-        # Check if quiz is done
-        if self.question_num >= self.total_questions:
-            self.display_results()
-            return
-        
-        self.clear_window()
-        
-        # Get current question
-        current_q = self.questions_data[self.question_num]
-        self.number1 = current_q['num1']
-        self.number2 = current_q['num2']
-        self.math_operation = current_q['operation']
-        self.correct_ans = current_q['answer']
-        self.attempt_count = 0
-        
-        # Colors for each difficulty
-        difficulty_colors = {
-            'easy': '#10b981',
-            'moderate': '#f59e0b',
-            'hard': '#ef4444'
-        }
-        
-        current_color = difficulty_colors.get(self.difficulty, '#00d9ff')
-        
+    def build_question_screen(self):
+        """Build the question screen once; display_problem fills it in"""
         # Main container
         main_frame = tk.Frame(self.root, bg='#16213e')
-        main_frame.pack(fill='both', expand=True)
         
         # Top section
         header = tk.Frame(main_frame, bg='#0f3460', height=80)
         header.pack(fill='x')
         
         # Question number
-        progress_text = f"Question {self.question_num + 1} of {self.total_questions}"
-        progress = tk.Label(
+        self.progress_label = tk.Label(
             header,
-            text=progress_text,
+            text="",
             font=('Arial', 13),
             fg='#94a3b8',
             bg='#0f3460'
         )
-        progress.pack(pady=10)
+        self.progress_label.pack(pady=10)
         
         # Score
-        score_display = tk.Label(
+        self.score_display = tk.Label(
             header,
-            text=f"Current Score: {self.score} / 100",
+            text="",
             font=('Arial', 16, 'bold'),
             fg='#00d9ff',
             bg='#0f3460'
         )
-        score_display.pack(pady=5)
+        self.score_display.pack(pady=5)
+        
+        # Stop button, only shown during endless practice
+        self.stop_btn = tk.Button(
+            header,
+            text="⏹ FINISH",
+            font=('Arial', 10, 'bold'),
+            bg='#ef4444',
+            fg='white',
+            relief='flat',
+            cursor='hand2',
+            command=self.stop_practice
+        )
         
         # Question box
         question_card = tk.Frame(main_frame, bg='#1e293b', relief='ridge', bd=3)
         question_card.pack(pady=40, padx=60, fill='both', expand=True)
         
         # Difficulty label
-        badge = tk.Label(
+        self.badge = tk.Label(
             question_card,
-            text=self.difficulty.upper(),
+            text="",
             font=('Arial', 10, 'bold'),
             fg='white',
-            bg=current_color,
+            bg='#00d9ff',
             padx=15,
             pady=5
         )
-        badge.pack(pady=(20, 10))
+        self.badge.pack(pady=(20, 10))
         
         # The math problem
-        problem_text = f"{self.number1}  {self.math_operation}  {self.number2}  ="
-        problem = tk.Label(
+        self.problem_label = tk.Label(
             question_card,
-            text=problem_text,
+            text="",
             font=('Courier New', 40, 'bold'),
             fg='#ffffff',
             bg='#1e293b'
         )
-        problem.pack(pady=30)
+        self.problem_label.pack(pady=30)
         
         # Input box
         self.answer_var = tk.StringVar()
-        answer_entry = tk.Entry(
+        self.answer_entry = tk.Entry(
             question_card,
             textvariable=self.answer_var,
             font=('Arial', 24),
@@ -275,8 +391,7 @@ class MathsQuiz:
             fg='white',
             insertbackground='white'
         )
-        answer_entry.pack(pady=20)
-        answer_entry.focus()
+        self.answer_entry.pack(pady=20)
         
         # Submit button
         submit_btn = tk.Button(
@@ -294,7 +409,7 @@ class MathsQuiz:
         submit_btn.pack(pady=15)
         
         # Press Enter to submit
-        answer_entry.bind('<Return>', lambda e: self.check_answer())
+        self.answer_entry.bind('<Return>', lambda e: self.check_answer())
         
         # Feedback text
         self.feedback_msg = tk.Label(
@@ -304,13 +419,69 @@ class MathsQuiz:
             bg='#1e293b'
         )
         self.feedback_msg.pack(pady=10)
+        
+        return main_frame
+    
+    def display_problem(self):
+        """Show a math question"""
+        self.next_pending = None
+        if self.transition_due:
+            # How late the after() move to this question ran
+            self.metrics.observe('transition_late', time.perf_counter() - self.transition_due)
+            self.transition_due = 0.0
+        
+        # Check if quiz is done
+        if self.session.finished:
+            self.display_results()
+            return
+        
+        # Get current question
+        current_q = self.session.current_question()
+        
+        # Adaptive mode can change the level between questions
+        self.difficulty = self.session.difficulty
+        current_color = DIFFICULTY_COLORS.get(self.difficulty, '#00d9ff')
+        
+        self.show_screen('question')
+        
+        # Only text, colours and the answer box change between questions
+        if self.session.endless:
+            progress_text = f"Practice Question {self.session.question_num + 1}"
+            score_text = f"Current Score: {self.session.score}"
+            self.stop_btn.place(relx=1.0, x=-15, y=15, anchor='ne')
+        else:
+            progress_text = f"Question {self.session.question_num + 1} of {self.total_questions}"
+            score_text = f"Current Score: {self.session.score} / 100"
+            self.stop_btn.place_forget()
+        self.progress_label.config(text=progress_text)
+        self.score_display.config(text=score_text)
+        badge_text = self.difficulty.upper()
+        if self.session.reviewing:
+            badge_text += " · REVIEW"
+        self.badge.config(text=badge_text, bg=current_color)
+        
+        problem_text = f"{current_q.num1}  {current_q.operation}  {current_q.num2}  ="
+        self.problem_label.config(text=problem_text)
+        
+        self.answer_var.set("")
+        self.feedback_msg.config(text="")
+        self.answer_entry.focus()
+        
+        # Start timing this question
+        self.shown_at = time.perf_counter()
     
     def check_answer(self):
         """Check if the answer is a valid number"""
+        # Ignore extra presses while waiting for the next question
+        if self.next_pending is not None:
+            return
+        
         try:
             user_input = int(self.answer_var.get())
             self.is_correct(user_input)
         except ValueError:
+            if self.metrics is not None:
+                self.metrics.count('answer_invalid')
             self.feedback_msg.config(
                 text="⚠ Please enter a valid number!",
                 fg='#f59e0b'
@@ -318,75 +489,61 @@ class MathsQuiz:
     
     def is_correct(self, user_answer):
         """Check if answer is correct and update score"""
-        if user_answer == self.correct_ans:
-            # Correct answer
-            if self.attempt_count == 0:
-                # First try - 10 points
-                self.score += 10
-                self.feedback_msg.config(
-                    text="✓ CORRECT! +10 Points",
-                    fg='#10b981'
-                )
-            else:
-                # Second try - 5 points
-                self.score += 5
-                self.feedback_msg.config(
-                    text="✓ CORRECT! +5 Points",
-                    fg='#10b981'
-                )
+        correct_ans = self.session.correct_answer()
+        elapsed = time.perf_counter() - self.shown_at
+        result = self.session.submit(user_answer, elapsed)
+        if self.metrics is not None:
+            self.metrics.count(f"answer_{result}")
+        
+        # Record the time once the question is finished with
+        if result != RESULT_TRY_AGAIN:
+            first_try = self.session.last_points == 10
+            self.response_times.add(elapsed, first_try)
+            if len(self.answer_history) < MAX_QUESTIONS:
+                self.answer_history.append((user_answer, 1 if first_try else 2, elapsed))
+        
+        if result == RESULT_CORRECT:
+            # 10 points on the first try, 5 on the second
+            self.feedback_msg.config(
+                text=f"✓ CORRECT! +{self.session.last_points} Points",
+                fg='#10b981'
+            )
             
             # Go to next question
-            self.question_num += 1
-            self.root.after(1200, self.display_problem)
+            self.schedule_next(1200)
+        elif result == RESULT_TRY_AGAIN:
+            # First try wrong - try again
+            self.feedback_msg.config(
+                text="✗ Incorrect! Try again (5 points available)",
+                fg='#ef4444'
+            )
+            self.answer_var.set("")
         else:
-            # Wrong answer
-            self.attempt_count += 1
-            
-            if self.attempt_count == 1:
-                # First try wrong - try again
-                self.feedback_msg.config(
-                    text="✗ Incorrect! Try again (5 points available)",
-                    fg='#ef4444'
-                )
-                self.answer_var.set("")
-            else:
-                # Second try wrong - move on
-                self.feedback_msg.config(
-                    text=f"✗ Incorrect! Answer was {self.correct_ans}",
-                    fg='#ef4444'
-                )
-                self.question_num += 1
-                self.root.after(2000, self.display_problem)
+            # Second try wrong - move on
+            self.feedback_msg.config(
+                text=f"✗ Incorrect! Answer was {correct_ans}",
+                fg='#ef4444'
+            )
+            self.schedule_next(2000)
     
-    def display_results(self):
-        """Show final score and grade"""
-        self.clear_window()
-        
-        # Calculate grade
-        if self.score >= 90:
-            grade = "A+"
-            message = "Outstanding Performance! 🌟"
-            grade_color = '#10b981'
-        elif self.score >= 80:
-            grade = "A"
-            message = "Excellent Work! 🎯"
-            grade_color = '#10b981'
-        elif self.score >= 70:
-            grade = "B"
-            message = "Good Job! 👍"
-            grade_color = '#3b82f6'
-        elif self.score >= 60:
-            grade = "C"
-            message = "Keep Practicing! 📚"
-            grade_color = '#f59e0b'
-        else:
-            grade = "D"
-            message = "Try Again! 💪"
-            grade_color = '#ef4444'
-        
+    def schedule_next(self, delay_ms):
+        """Show the next question after delay_ms"""
+        if self.metrics is not None:
+            self.transition_due = time.perf_counter() + delay_ms / 1000
+        self.next_pending = self.root.after(delay_ms, self.display_problem)
+    
+    def stop_practice(self):
+        """End an endless practice session and show the results"""
+        if self.next_pending is not None:
+            self.root.after_cancel(self.next_pending)
+            self.next_pending = None
+            self.transition_due = 0.0
+        self.display_results()
+    
+    def build_results_screen(self):
+        """Build the results screen once; display_results fills it in"""
         # Main container
         main_frame = tk.Frame(self.root, bg='#16213e')
-        main_frame.pack(fill='both', expand=True)
         
         # Top section
         header = tk.Frame(main_frame, bg='#0f3460', height=100)
@@ -406,34 +563,33 @@ class MathsQuiz:
         results_card.pack(pady=30, padx=80, fill='both', expand=True)
         
         # Final score
-        score_label = tk.Label(
+        self.final_score_label = tk.Label(
             results_card,
-            text=f"Final Score: {self.score} / 100",
+            text="",
             font=('Arial', 32, 'bold'),
             fg='#00d9ff',
             bg='#1e293b'
         )
-        score_label.pack(pady=(40, 20))
+        self.final_score_label.pack(pady=(40, 20))
         
         # Grade
-        grade_label = tk.Label(
+        self.grade_label = tk.Label(
             results_card,
-            text=f"Grade: {grade}",
+            text="",
             font=('Arial', 28, 'bold'),
-            fg=grade_color,
             bg='#1e293b'
         )
-        grade_label.pack(pady=15)
+        self.grade_label.pack(pady=15)
         
         # Message
-        message_label = tk.Label(
+        self.message_label = tk.Label(
             results_card,
-            text=message,
+            text="",
             font=('Arial', 18),
             fg='#94a3b8',
             bg='#1e293b'
         )
-        message_label.pack(pady=15)
+        self.message_label.pack(pady=15)
         
         # Buttons
         buttons_frame = tk.Frame(results_card, bg='#1e293b')
@@ -468,10 +624,116 @@ class MathsQuiz:
             command=self.root.quit
         )
         exit_btn.pack(side='left', padx=10)
+        
+        return main_frame
+    
+    def display_results(self):
+        """Show final score and grade"""
+        # Calculate grade
+        if self.session.endless:
+            # Grade practice on the share of the 10 points per question won
+            answered = self.session.question_num
+            percent = self.session.score * 10 // answered if answered else 0
+            grade, message = grade_for(percent)
+            score_text = f"Practice Score: {self.session.score} ({answered} questions)"
+        else:
+            grade, message = self.session.grade()
+            score_text = f"Final Score: {self.session.score} / 100"
+        grade_color = GRADE_COLORS[grade]
+        
+        self.save_results(grade)
+        self.save_reviews()
+        
+        self.show_screen('results')
+        
+        self.final_score_label.config(text=score_text)
+        self.grade_label.config(text=f"Grade: {grade}", fg=grade_color)
+        if len(self.response_times):
+            message += f"\nAverage answer time: {self.response_times.mean():.1f}s"
+        self.message_label.config(text=message)
+    
+    def save_results(self, grade):
+        """Append the finished session to the results log"""
+        try:
+            if self.results_writer is None:
+                self.results_writer = ResultsWriter(RESULTS_PATH)
+            self.results_writer.append(
+                self.chosen_difficulty,
+                self.session.score,
+                grade,
+                self.answer_history,
+                answered=self.session.question_num
+            )
+            self.results_writer.flush()
+        except (OSError, ValueError, struct.error) as e:
+            # Saving is a bonus - the quiz still works without it
+            print(f"Could not save results: {e}")
+    
+    def save_reviews(self):
+        """Write the review schedule so missed facts come back next time"""
+        if not self.review_store:
+            return
+        try:
+            self.review_store.save()
+        except OSError as e:
+            print(f"Could not save reviews: {e}")
+
+
+def profile_method(cls, name, timings):
+    """Wrap cls.name so the time spent in it is added to timings[name]"""
+    original = getattr(cls, name)
+    
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+    
+    setattr(cls, name, timed)
+
+
+def report_startup(root, timings):
+    """Print the startup profile when the main loop is first idle"""
+    def report():
+        timings['first mainloop idle'] = time.perf_counter() - IMPORT_STARTED
+        print("Startup profile (ms):")
+        print(f"  {'imports':<22}{IMPORT_SECONDS * 1000:8.1f}")
+        for name, seconds in timings.items():
+            print(f"  {name:<22}{seconds * 1000:8.1f}")
+    
+    root.after_idle(report)
 
 
 # Run the program
-if __name__ == "__main__":
+def main():
+    # --profile-startup prints where startup time goes (off by default)
+    profile = '--profile-startup' in sys.argv[1:]
+    # --learner NAME keeps a separate review schedule for each person
+    learner = DEFAULT_LEARNER
+    if '--learner' in sys.argv[1:-1]:
+        learner = sys.argv[sys.argv.index('--learner') + 1]
+    # --metrics-jsonl PATH / --metrics-port PORT export runtime metrics (off by default)
+    metrics = instrument.from_args('maths_quiz', sys.argv[1:])
+    timings = {}
+    if profile:
+        profile_method(MathsQuiz, 'display_menu', timings)
+    if metrics is not None:
+        metrics.wrap_methods(MathsQuiz, HOT_METHODS)
+    
+    start = time.perf_counter()
     root = tk.Tk()
-    quiz_app = MathsQuiz(root)
-    root.mainloop()
\ No newline at end of file
+    timings['tk.Tk()'] = time.perf_counter() - start
+    quiz_app = MathsQuiz(root, learner)
+    if profile:
+        report_startup(root, timings)
+    if metrics is not None:
+        quiz_app.metrics = metrics
+        metrics.start(root)
+    root.mainloop()
+    if metrics is not None:
+        metrics.stop()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""
+Adaptive difficulty for the Maths Quiz
+
+ResponseTimes keeps the most recent answer times in a fixed-size ring
+buffer. AdaptiveScheduler reads the rolling averages from it after every
+answered question and moves the learner between the easy (1-9),
+moderate (10-99) and hard (1-12 ×) ranges. Every update is O(1), so it
+is cheap enough to run inside a Tk callback.
+"""
+
+from array import array
+
+# Difficulty levels from easiest to hardest
+LEVELS = ('easy', 'moderate', 'hard')
+
+
+class ResponseTimes:
+    """Ring buffer of the last `capacity` response times (in seconds)
+
+    A running total is kept alongside the buffer so the average never
+    needs a loop over the stored values.
+    """
+
+    def __init__(self, capacity=20):
+        self.capacity = capacity
+        self.times = array('d', [0.0] * capacity)
+        self.first_try = array('b', [0] * capacity)
+        self.index = 0
+        self.count = 0
+        self.total_time = 0.0
+        self.total_first_try = 0
+
+    def add(self, seconds, first_try=False):
+        """Store one response, overwriting the oldest when full"""
+        index = self.index
+        if self.count == self.capacity:
+            # Take the value being overwritten out of the totals
+            self.total_time -= self.times[index]
+            self.total_first_try -= self.first_try[index]
+        else:
+            self.count += 1
+        self.times[index] = seconds
+        self.first_try[index] = 1 if first_try else 0
+        self.total_time += seconds
+        self.total_first_try += self.first_try[index]
+        self.index = (index + 1) % self.capacity
+
+    def __len__(self):
+        return self.count
+
+    def mean(self):
+        """Average response time of the stored answers"""
+        return self.total_time / self.count if self.count else 0.0
+
+    def first_try_rate(self):
+        """Share of the stored answers that were right first time"""
+        return self.total_first_try / self.count if self.count else 0.0
+
+    def latest(self):
+        """The most recent response time (0.0 if there is none)"""
+        if not self.count:
+            return 0.0
+        return self.times[(self.index - 1) % self.capacity]
+
+
+class AdaptiveScheduler:
+    """Moves up or down a level based on recent speed and accuracy
+
+    After at least `window` answers at the current level:
+    - fast (average under fast_seconds) and mostly right first time -> up
+    - slow (average over slow_seconds) or often wrong -> down
+    """
+
+    def __init__(self, level='easy', window=4, fast_seconds=5.0,
+                 slow_seconds=12.0, promote_rate=0.75, demote_rate=0.4):
+        if level not in LEVELS:
+            raise ValueError(f"Unknown difficulty: {level}")
+        self.level = level
+        self.window = window
+        self.fast_seconds = fast_seconds
+        self.slow_seconds = slow_seconds
+        self.promote_rate = promote_rate
+        self.demote_rate = demote_rate
+        self.recent = ResponseTimes(window)
+
+    def record(self, seconds, first_try):
+        """Add one answered question and return the level to use next"""
+        recent = self.recent
+        recent.add(seconds, first_try)
+        if len(recent) < self.window:
+            return self.level
+
+        mean = recent.mean()
+        rate = recent.first_try_rate()
+        position = LEVELS.index(self.level)
+        if mean <= self.fast_seconds and rate >= self.promote_rate:
+            position = min(position + 1, len(LEVELS) - 1)
+        elif mean >= self.slow_seconds or rate <= self.demote_rate:
+            position = max(position - 1, 0)
+
+        if LEVELS[position] != self.level:
+            # Judge the new level on its own answers only
+            self.level = LEVELS[position]
+            self.recent = ResponseTimes(self.window)
+        return self.level
@@ -0,0 +1,545 @@
+"""
+Benchmarks for the Maths Quiz
+
+Run from this folder, e.g.
+    python benchmark.py transitions
+    python benchmark.py reviews
+    python benchmark.py simulate --save-baseline
+    python benchmark.py simulate --check
+
+simulate plays whole quizzes through MathsQuiz's own methods with
+synthetic answer streams. --save-baseline stores the median time of
+each call; --check exits with an error when a call has got slower than
+that baseline (by more than --tolerance). The baseline file is not
+committed - timings only mean something on the machine that saved them,
+so save one there before the first --check.
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+import tkinter as tk
+from pathlib import Path
+
+import Index
+from Index import MathsQuiz
+from quiz_engine import QuizEngine, grade_for
+from results_log import ResultsLog, ResultsWriter, pack_session, DIFFICULTIES
+from review import ReviewStore
+from operations import MODES, fact_table
+from question_generator import (
+    QuestionGenerator, QuestionSet, OPERATION_SYMBOLS, NUMPY_MIN_BATCH, load_numpy
+)
+
+
+def count_widget_creations():
+    """Wrap tk.BaseWidget.__init__ so every new widget bumps a counter"""
+    counter = {'widgets': 0}
+    original_init = tk.BaseWidget.__init__
+    
+    def counting_init(self, *args, **kwargs):
+        counter['widgets'] += 1
+        original_init(self, *args, **kwargs)
+    
+    tk.BaseWidget.__init__ = counting_init
+    
+    def restore():
+        tk.BaseWidget.__init__ = original_init
+    
+    return counter, restore
+
+
+def bench_transitions(rounds=20, rebuild=False):
+    """Time question-to-question transitions on the question screen
+    
+    With rebuild=True the question screen is thrown away before every
+    question, which is what the old clear_window() approach did.
+    """
+    root = tk.Tk()
+    root.withdraw()
+    quiz = MathsQuiz(root)
+    counter, restore = count_widget_creations()
+    
+    timings = []
+    created = 0
+    try:
+        for _ in range(rounds):
+            quiz.start_quiz('moderate')
+            root.update_idletasks()
+            for _ in range(quiz.total_questions - 1):
+                if rebuild:
+                    # Throw the cached screen away so it gets rebuilt
+                    quiz.screens.pop('question').destroy()
+                    quiz.current_screen = None
+                # Answer the question on screen (untimed) so the next one is new
+                quiz.session.submit(quiz.session.correct_answer())
+                before = counter['widgets']
+                start = time.perf_counter()
+                quiz.display_problem()
+                root.update_idletasks()
+                timings.append(time.perf_counter() - start)
+                created += counter['widgets'] - before
+    finally:
+        restore()
+        root.destroy()
+    
+    label = "rebuild per question" if rebuild else "cached screens"
+    avg_ms = sum(timings) / len(timings) * 1000
+    widgets = created / len(timings)
+    print(f"{label:>22}: {avg_ms:7.3f} ms/transition, "
+          f"{widgets:5.1f} widgets created/transition")
+
+
+def bench_generator(sizes=(10, 10_000, 10_000_000)):
+    """Questions per second from the batch generator for each backend"""
+    backends = [False, True] if load_numpy() is not None else [False]
+    for use_numpy in backends:
+        generator = QuestionGenerator(seed=1, use_numpy=use_numpy)
+        label = "numpy" if use_numpy else "python"
+        # One untimed large batch sets up the NumPy random generator
+        generator.generate('moderate', NUMPY_MIN_BATCH)
+        for size in sizes:
+            # Repeat small batches so the timer has something to measure
+            repeats = max(1, 100_000 // size)
+            start = time.perf_counter()
+            for _ in range(repeats):
+                generator.generate('moderate', size)
+            elapsed = time.perf_counter() - start
+            rate = size * repeats / elapsed
+            print(f"{label:>6} N={size:<10,} {rate:15,.0f} questions/sec")
+
+
+def bench_storage(count=100_000):
+    """Bytes per question: list of dicts versus the array-backed QuestionSet"""
+    batch = QuestionGenerator(seed=1, use_numpy=False).generate('moderate', count)
+    
+    def as_dicts():
+        # The layout start_quiz used to build
+        return [{'num1': a, 'num2': b, 'operation': OPERATION_SYMBOLS[op], 'answer': ans}
+                for a, b, op, ans in zip(*batch)]
+    
+    for label, build in (("list of dicts", as_dicts),
+                         ("QuestionSet", lambda: QuestionSet.from_batch(batch))):
+        tracemalloc.start()
+        questions = build()
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"{label:>14}: {used / len(questions):7.1f} bytes/question")
+
+
+def bench_engine(count=200_000, chunk=1000):
+    """Simulated headless sessions per second for two answer streams"""
+    for label, miss_first in (("all correct", False), ("second try", True)):
+        engine = QuizEngine(QuestionGenerator(seed=1))
+        start = time.perf_counter()
+        for _ in range(count // chunk):
+            # Sessions come and go in chunks, like learners on a server
+            for session in engine.new_sessions('moderate', chunk):
+                while not session.finished:
+                    right = session.correct_answer()
+                    if miss_first:
+                        session.submit(right + 1)
+                    session.submit(right)
+        elapsed = time.perf_counter() - start
+        print(f"{label:>12}: {count / elapsed:10,.0f} sessions/sec "
+              f"(score {session.score}, grade {session.grade()[0]})")
+
+
+def bench_results_log(count=2_000_000):
+    """Write a synthetic results log, then time the aggregate queries"""
+    rng = random.Random(1)
+    history = [(rng.randint(-90, 198), rng.choice((1, 2)), rng.uniform(1, 15))
+               for _ in range(10)]
+    # A few hundred distinct records are enough - only the summary fields vary
+    templates = []
+    for _ in range(512):
+        score = rng.randrange(0, 101, 5)
+        templates.append(pack_session(rng.choice(DIFFICULTIES), score,
+                                      grade_for(score)[0], history))
+    
+    path = os.path.join(tempfile.mkdtemp(), "quiz_results.bin")
+    start = time.perf_counter()
+    with ResultsWriter(path) as writer:
+        for i in range(count):
+            writer.append_packed(templates[i & 511])
+    print(f"wrote {count:,} sessions ({os.path.getsize(path) / 1e6:.0f} MB) "
+          f"in {time.perf_counter() - start:.2f}s")
+    
+    with ResultsLog(path) as log:
+        for label, query in (("leaderboard", lambda: log.leaderboard(10)),
+                             ("leaderboard hard", lambda: log.leaderboard(10, 'hard')),
+                             ("average by difficulty", log.average_by_difficulty),
+                             ("grade distribution", log.grade_distribution)):
+            start = time.perf_counter()
+            result = query()
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{label:>22}: {elapsed:8.1f} ms  {str(result)[:60]}")
+    os.remove(path)
+
+
+def bench_reviews(learners=5000, facts=15, answers=200_000):
+    """Save and load a big review file, then time review lookups and updates
+    
+    Every learner gets `facts` missed facts in each of easy, moderate and
+    hard, so the file holds learners * facts * 3 learner-fact pairs.
+    """
+    rng = random.Random(1)
+    now = [1e9]
+    path = os.path.join(tempfile.mkdtemp(), "quiz_reviews.bin")
+    store = ReviewStore(path, clock=lambda: now[0])
+    modes = ('easy', 'moderate', 'hard')
+    sizes = {mode: len(fact_table(mode)) for mode in modes}
+    for learner in range(learners):
+        reviews = store.learner(f"learner{learner}")
+        for mode in modes:
+            for index in rng.sample(range(sizes[mode]), facts):
+                reviews.record(mode, index, missed=True)
+            # Spread the due times out
+            now[0] += rng.random()
+    pairs = learners * facts * len(modes)
+    
+    start = time.perf_counter()
+    store.save()
+    print(f"save:      {(time.perf_counter() - start) * 1000:8.1f} ms for {pairs:,} "
+          f"learner-fact pairs ({os.path.getsize(path) / 1e6:.1f} MB)")
+    del store
+    
+    start = time.perf_counter()
+    store = ReviewStore(path, clock=lambda: now[0])
+    print(f"load:      {(time.perf_counter() - start) * 1000:8.1f} ms ({len(store):,} learners)")
+    start = time.perf_counter()
+    reviews = store.learner("learner0")
+    print(f"learner(): {(time.perf_counter() - start) * 1e6:8.1f} us")
+    
+    # One learner with every moderate fact scheduled, answering as they go
+    queue = reviews.queue('moderate')
+    for index in range(sizes['moderate']):
+        reviews.record('moderate', index, missed=True)
+    now[0] += 3600
+    start = time.perf_counter()
+    for _ in range(answers):
+        index = reviews.next_due('moderate')
+        if index is not None:
+            reviews.record('moderate', index, missed=rng.random() < 0.3)
+        now[0] += 0.05
+    elapsed = time.perf_counter() - start
+    print(f"next_due + record: {elapsed / answers * 1e6:6.2f} us per answer "
+          f"({len(queue):,} facts scheduled, heap {len(queue.heap):,})")
+    
+    # What the quiz does at the end of a session: only one learner unpacked
+    start = time.perf_counter()
+    store.save()
+    print(f"save again: {(time.perf_counter() - start) * 1000:7.1f} ms (one learner unpacked)")
+    os.remove(path)
+
+
+class StubWidget:
+    """Stands in for any tk widget: keeps its options, draws nothing"""
+    
+    def __init__(self, master=None, **options):
+        self.options = options
+    
+    def config(self, **options):
+        self.options.update(options)
+    
+    configure = config
+    
+    def _ignore(self, *args, **kwargs):
+        pass
+    
+    pack = pack_forget = place = place_forget = bind = focus = destroy = _ignore
+
+
+class StubRoot(StubWidget):
+    """Stub for tk.Tk: after() callbacks are only stored, never run"""
+    
+    def __init__(self):
+        super().__init__()
+        self.pending = {}
+        self.next_id = 0
+    
+    title = geometry = resizable = withdraw = update_idletasks = quit = StubWidget._ignore
+    
+    def after(self, ms, callback, *args):
+        self.next_id += 1
+        self.pending[self.next_id] = (callback, args)
+        return self.next_id
+    
+    def after_cancel(self, after_id):
+        self.pending.pop(after_id, None)
+
+
+class StubVar:
+    """Stub for tk.StringVar / tk.BooleanVar"""
+    
+    def __init__(self, master=None, value=None):
+        self.value = value
+    
+    def get(self):
+        return self.value
+    
+    def set(self, value):
+        self.value = value
+
+
+# Used in place of the tkinter module when there is no display (or --stub)
+STUB_TK = types.SimpleNamespace(
+    Tk=StubRoot, Frame=StubWidget, Label=StubWidget, Button=StubWidget,
+    Entry=StubWidget, Checkbutton=StubWidget, StringVar=StubVar, BooleanVar=StubVar
+)
+
+# What each synthetic learner types for a question with answer `right`
+ANSWER_STREAMS = {
+    'all correct': lambda right: (str(right),),
+    'second try': lambda right: (str(right + 1), str(right)),
+    'all wrong': lambda right: (str(right + 1), str(right + 2)),
+    # Not a number (the ValueError path), then the right answer
+    'invalid': lambda right: ("abc", str(right))
+}
+
+# Score every quiz in a stream should end with
+EXPECTED_SCORES = {'all correct': 100, 'second try': 50, 'all wrong': 0, 'invalid': 100}
+
+# Calls timed by the simulation
+SIMULATED_CALLS = ('start_quiz', 'check_answer', 'display_problem', 'display_results')
+
+# Memory-backed folder for the simulated sessions' results and reviews
+# (used when it exists), so disk writes do not add noise to the timings
+TMPFS = '/dev/shm'
+
+# Where --save-baseline writes and --check reads by default
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+
+def make_quiz(stub):
+    """A MathsQuiz on a hidden real window, or on STUB_TK without a display
+    
+    For the stub, Index.tk is swapped for STUB_TK (put back by the caller).
+    """
+    if not stub:
+        try:
+            root = tk.Tk()
+            root.withdraw()
+            return MathsQuiz(root), True
+        except tk.TclError as e:
+            print(f"No display ({e}) - using the stub root")
+    Index.tk = STUB_TK
+    return MathsQuiz(StubRoot()), False
+
+
+def simulate(quiz, stream, quizzes, difficulty, measure):
+    """Play quizzes with one answer stream, passing every call to measure
+    
+    measure(name, fn, *args) makes the call. The waits before the next
+    question are skipped by cancelling them and moving on straight away.
+    """
+    answers_for = ANSWER_STREAMS[stream]
+    root = quiz.root
+    for _ in range(quizzes):
+        measure('start_quiz', quiz.start_quiz, difficulty)
+        while True:
+            for text in answers_for(quiz.session.correct_answer()):
+                quiz.answer_var.set(text)
+                measure('check_answer', quiz.check_answer)
+            root.after_cancel(quiz.next_pending)
+            quiz.next_pending = None
+            if quiz.session.finished:
+                break
+            measure('display_problem', quiz.display_problem)
+        measure('display_results', quiz.display_results)
+        if quiz.session.score != EXPECTED_SCORES[stream]:
+            raise AssertionError(f"{stream}: score {quiz.session.score}, "
+                                 f"expected {EXPECTED_SCORES[stream]}")
+
+
+def latency_histogram(times_ns):
+    """Lines of a log2 histogram of call times (microseconds)"""
+    buckets = {}
+    for ns in times_ns:
+        bucket = (ns // 1000).bit_length()
+        buckets[bucket] = buckets.get(bucket, 0) + 1
+    most = max(buckets.values())
+    lines = []
+    for bucket in range(min(buckets), max(buckets) + 1):
+        count = buckets.get(bucket, 0)
+        low = 0 if bucket == 0 else 1 << (bucket - 1)
+        label = f"{low}-{1 << bucket} us"
+        lines.append(f"      {label:>14} {count:8,} {'#' * -(-40 * count // most)}")
+    return lines
+
+
+def percentile(sorted_times, fraction):
+    return sorted_times[min(len(sorted_times) - 1, int(len(sorted_times) * fraction))]
+
+
+def bench_simulate(quizzes=200, difficulty='hard', stub=False, save_path=None,
+                   check_path=None, tolerance=0.5, passes=5):
+    """Drive the quiz's own methods with each answer stream
+    
+    Reports latency per call (with histograms) and memory allocated per
+    call. Each stream gets an untimed warm-up, then is timed `passes`
+    times with the garbage collector paused; the median of the passes'
+    medians is what is saved and checked, so one noisy pass does not
+    decide the result. The results log and review file go to a tmpfs
+    when there is one. With check_path, exits with an error when any of
+    those medians is more than `tolerance` slower than the stored baseline.
+    """
+    baseline = None
+    if check_path:
+        # Read first so a missing baseline fails before the long run
+        try:
+            with open(check_path, encoding='utf-8') as file:
+                baseline = json.load(file)
+        except FileNotFoundError:
+            sys.exit(f"No baseline at {check_path} - run "
+                     f"'python benchmark.py simulate --save-baseline' first")
+    
+    folder = tempfile.mkdtemp(dir=TMPFS if os.path.isdir(TMPFS) else None)
+    # Keep the simulated sessions out of the real results and reviews
+    saved_paths = Index.RESULTS_PATH, Index.REVIEWS_PATH
+    Index.RESULTS_PATH = Path(folder, "quiz_results.bin")
+    Index.REVIEWS_PATH = Path(folder, "quiz_reviews.bin")
+    
+    medians = {}
+    try:
+        for stream in ANSWER_STREAMS:
+            quiz, real_tk = make_quiz(stub)
+            # Only look for a display once
+            stub = not real_tk
+            # A fresh learner per stream so earlier misses are not reviewed
+            quiz.learner = stream
+            
+            # Untimed warm-up: first-call costs (caches, the review file...)
+            simulate(quiz, stream, max(1, quizzes // 10), difficulty,
+                     lambda name, fn, *args: fn(*args))
+            
+            times = {name: [] for name in SIMULATED_CALLS}
+            pass_medians = {name: [] for name in SIMULATED_CALLS}
+            for _ in range(passes):
+                pass_times = {name: [] for name in SIMULATED_CALLS}
+                
+                def timed(name, fn, *args):
+                    start = time.perf_counter_ns()
+                    fn(*args)
+                    pass_times[name].append(time.perf_counter_ns() - start)
+                
+                gc.collect()
+                gc.disable()
+                try:
+                    simulate(quiz, stream, quizzes, difficulty, timed)
+                finally:
+                    gc.enable()
+                for name, values in pass_times.items():
+                    times[name].extend(values)
+                    pass_medians[name].append(percentile(sorted(values), 0.5) / 1000)
+            
+            # Second pass under tracemalloc (too slow to time at the same time)
+            allocated = {name: [0, 0, 0] for name in SIMULATED_CALLS}
+            
+            def traced(name, fn, *args):
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+                fn(*args)
+                current, peak = tracemalloc.get_traced_memory()
+                totals = allocated[name]
+                totals[0] += 1
+                totals[1] += peak - before
+                totals[2] += current - before
+            
+            tracemalloc.start()
+            simulate(quiz, stream, max(1, quizzes // 10), difficulty, traced)
+            tracemalloc.stop()
+            if real_tk:
+                quiz.root.destroy()
+            
+            print(f"{stream} ({passes} x {quizzes} {difficulty} quizzes, "
+                  f"{'hidden Tk window' if real_tk else 'stub root'}):")
+            for name in SIMULATED_CALLS:
+                ordered = sorted(times[name])
+                medians[f"{stream}/{name}"] = percentile(sorted(pass_medians[name]), 0.5)
+                calls, peak_bytes, kept_bytes = allocated[name]
+                print(f"  {name:<16} n={len(ordered):<7,} p50 {percentile(ordered, 0.5) / 1000:8.1f} us  "
+                      f"p90 {percentile(ordered, 0.9) / 1000:8.1f}  "
+                      f"p99 {percentile(ordered, 0.99) / 1000:8.1f}  "
+                      f"max {ordered[-1] / 1000:8.1f}  "
+                      f"alloc {peak_bytes / calls:8,.0f} B/call, kept {kept_bytes / calls:6,.0f} B/call")
+                print('\n'.join(latency_histogram(ordered)))
+    finally:
+        Index.RESULTS_PATH, Index.REVIEWS_PATH = saved_paths
+        Index.tk = tk
+        for name in os.listdir(folder):
+            os.remove(os.path.join(folder, name))
+        os.rmdir(folder)
+    
+    if save_path:
+        with open(save_path, 'w', encoding='utf-8') as file:
+            json.dump(medians, file, indent=2, sort_keys=True)
+        print(f"baseline saved to {save_path}")
+    if baseline is not None:
+        check_baseline(medians, baseline, tolerance)
+
+
+def check_baseline(medians, baseline, tolerance, slack_us=2.0):
+    """Exit with an error if any median is slower than the baseline allows
+    
+    slack_us stops tiny calls failing on timer noise alone.
+    """
+    slower = []
+    print(f"against the baseline (tolerance {tolerance:.0%}):")
+    for key, old in sorted(baseline.items()):
+        new = medians.get(key)
+        if new is None:
+            continue
+        limit = max(old * (1 + tolerance), old + slack_us)
+        status = "ok" if new <= limit else "SLOWER"
+        print(f"  {key:<32} {old:8.1f} -> {new:8.1f} us  {status}")
+        if new > limit:
+            slower.append(key)
+    if slower:
+        sys.exit(f"Regression: {', '.join(slower)} slower than the baseline")
+    print("no regressions")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maths Quiz benchmarks")
+    parser.add_argument('which', choices=['transitions', 'generator', 'storage', 'engine', 'results',
+                                          'reviews', 'simulate'])
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--quizzes', type=int, default=200,
+                        help="quizzes per answer stream for simulate")
+    parser.add_argument('--difficulty', default='hard', choices=sorted(MODES))
+    parser.add_argument('--stub', action='store_true',
+                        help="simulate on a stub root even when a display is available")
+    parser.add_argument('--save-baseline', nargs='?', const=BASELINE_PATH, metavar='PATH')
+    parser.add_argument('--check', nargs='?', const=BASELINE_PATH, metavar='PATH')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help="allowed slowdown for --check (0.5 = 50%%)")
+    args = parser.parse_args()
+    
+    if args.which == 'transitions':
+        bench_transitions(args.rounds, rebuild=True)
+        bench_transitions(args.rounds, rebuild=False)
+    elif args.which == 'generator':
+        bench_generator()
+    elif args.which == 'storage':
+        bench_storage()
+    elif args.which == 'engine':
+        bench_engine()
+    elif args.which == 'results':
+        bench_results_log()
+    elif args.which == 'reviews':
+        bench_reviews()
+    elif args.which == 'simulate':
+        bench_simulate(args.quizzes, args.difficulty, args.stub, args.save_baseline,
+                       args.check, args.tolerance)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
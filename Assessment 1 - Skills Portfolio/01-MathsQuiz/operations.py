@@ -0,0 +1,170 @@
+"""
+Question types for the Maths Quiz
+
+Every kind of question is an Operation in the OPERATIONS registry: its
+symbol, which operand pairs it allows and how to work out the answer.
+A quiz mode (easy, hard, division...) is a set of operations over an
+operand range.
+
+Each mode only has a fixed set of facts - hard mode's 1-12 × table is
+just 144 of them - so the facts and their answers are worked out once
+per mode into a FactTable, and questions are picked from it by index
+with no arithmetic or validity checks per question. FactDeck deals
+those indexes without replacement, O(1) each, so a drill goes through
+every fact before any of them comes up again.
+"""
+
+import operator
+from array import array
+from collections import namedtuple
+
+# Exponents used by the powers mode (squares and cubes)
+POWER_EXPONENTS = (2, 3)
+
+
+def all_pairs(low, high):
+    """Every (num1, num2) with both in low..high"""
+    values = range(low, high + 1)
+    return ((a, b) for a in values for b in values)
+
+
+def division_pairs(low, high):
+    """Divisions with a whole-number answer: (answer × divisor) ÷ divisor"""
+    values = range(low, high + 1)
+    return ((answer * divisor, divisor) for answer in values for divisor in values)
+
+
+def power_pairs(low, high):
+    """(base, exponent) for every base in low..high"""
+    return ((base, exponent) for base in range(low, high + 1) for exponent in POWER_EXPONENTS)
+
+
+class Operation:
+    """One kind of question: its symbol, allowed operands and answer"""
+    __slots__ = ('code', 'name', 'symbol', 'answer', 'pairs')
+    
+    def __init__(self, code, name, symbol, answer, pairs=all_pairs):
+        self.code = code          # stored in the op column of a question batch
+        self.name = name
+        self.symbol = symbol
+        self.answer = answer      # answer(num1, num2)
+        self.pairs = pairs        # pairs(low, high) -> the allowed (num1, num2)
+    
+    def __repr__(self):
+        return f"Operation({self.name!r}, {self.symbol!r})"
+
+
+# Every operation, indexed by its code, and the same by symbol
+OPERATIONS = []
+OPERATIONS_BY_SYMBOL = {}
+
+
+def register(name, symbol, answer, pairs=all_pairs):
+    """Add an operation to the registry and return it"""
+    # Codes are kept in a signed byte column
+    if len(OPERATIONS) >= 127:
+        raise ValueError("Too many operations")
+    operation = Operation(len(OPERATIONS), name, symbol, answer, pairs)
+    OPERATIONS.append(operation)
+    OPERATIONS_BY_SYMBOL[symbol] = operation
+    return operation
+
+
+ADD = register('addition', '+', operator.add)
+SUB = register('subtraction', '-', operator.sub)
+MUL = register('multiplication', '×', operator.mul)
+DIV = register('division', '÷', operator.floordiv, division_pairs)
+POW = register('powers', '^', operator.pow, power_pairs)
+
+# A quiz mode: the operations it mixes and the operand range (inclusive)
+Mode = namedtuple('Mode', 'operations low high')
+
+MODES = {
+    'easy': Mode((ADD, SUB), 1, 9),
+    'moderate': Mode((ADD, SUB), 10, 99),
+    'hard': Mode((MUL,), 1, 12),
+    'division': Mode((DIV,), 1, 12),
+    'powers': Mode((POW,), 1, 12),
+    'mixed': Mode((ADD, SUB, MUL, DIV), 1, 12)
+}
+
+
+class FactTable:
+    """Every fact of a mode, with its answer, in parallel typed arrays"""
+    __slots__ = ('num1', 'num2', 'ops', 'answers', 'numpy_columns', 'indexes')
+    
+    def __init__(self, mode):
+        self.num1 = array('i')
+        self.num2 = array('i')
+        self.ops = array('b')
+        self.answers = array('i')
+        for operation in mode.operations:
+            for a, b in operation.pairs(mode.low, mode.high):
+                self.num1.append(a)
+                self.num2.append(b)
+                self.ops.append(operation.code)
+                self.answers.append(operation.answer(a, b))
+        self.numpy_columns = None
+        self.indexes = None
+    
+    def __len__(self):
+        return len(self.answers)
+    
+    def find(self, num1, num2, op):
+        """Index of the fact num1 <op> num2 (op is an operation code), or None"""
+        if self.indexes is None:
+            # Built on first use - only spaced repetition asks for it
+            self.indexes = {fact: index for index, fact in
+                            enumerate(zip(self.ops, self.num1, self.num2))}
+        return self.indexes.get((op, num1, num2))
+    
+    def columns(self, np):
+        """The four columns as NumPy arrays (made on first use)"""
+        if self.numpy_columns is None:
+            self.numpy_columns = (np.frombuffer(self.num1, dtype=np.intc),
+                                  np.frombuffer(self.num2, dtype=np.intc),
+                                  np.frombuffer(self.ops, dtype=np.int8),
+                                  np.frombuffer(self.answers, dtype=np.intc))
+        return self.numpy_columns
+
+
+# Tables already built, by mode name
+_tables = {}
+
+
+def fact_table(difficulty):
+    """The FactTable for a mode, built the first time it is asked for"""
+    table = _tables.get(difficulty)
+    if table is None:
+        if difficulty not in MODES:
+            raise ValueError(f"Unknown difficulty: {difficulty}")
+        table = _tables[difficulty] = FactTable(MODES[difficulty])
+    return table
+
+
+class FactDeck:
+    """Deals the indexes 0..size-1 in random order without repeats
+    
+    The indexes not dealt yet are kept at the front of an array: a draw
+    swaps a random one of them to the end of that part and shrinks it,
+    so every draw is O(1). Once all have been dealt, the deck starts over.
+    """
+    __slots__ = ('order', 'remaining')
+    
+    def __init__(self, size):
+        self.order = array('i', range(size))
+        self.remaining = size
+    
+    def __len__(self):
+        return len(self.order)
+    
+    def draw(self, rng):
+        """The next index, using rng (a random.Random) to pick it"""
+        if not self.remaining:
+            self.remaining = len(self.order)
+        order = self.order
+        pick = rng.randrange(self.remaining)
+        last = self.remaining - 1
+        order[pick], order[last] = order[last], order[pick]
+        self.remaining = last
+        return order[last]
\ No newline at end of file
@@ -0,0 +1,233 @@
+"""
+Batch question generator for the Maths Quiz
+
+Builds N questions for a difficulty in one pass and returns them as
+columns (first numbers, second numbers, operator codes and answers).
+Questions are picked from the difficulty's fact table (see
+operations.py), so no answer is worked out per question. NumPy is used
+for large batches when it is installed (it is imported on the first
+such batch, so the GUI never pays for it), otherwise plain Python is
+used. drill() deals facts without repeats instead.
+QuestionStream hands out questions one at a time for open-ended quizzes.
+"""
+
+import random
+from array import array
+from collections import deque, namedtuple
+
+from operations import ADD, SUB, MUL, DIV, POW, MODES, OPERATIONS, FactDeck, fact_table
+
+# Set by load_numpy() - stays None until a large batch asks for it
+np = None
+_numpy_checked = False
+
+# Operand range for each difficulty (inclusive)
+DIFFICULTY_RANGES = {name: (mode.low, mode.high) for name, mode in MODES.items()}
+
+def load_numpy():
+    """Import NumPy on first use and return it (None if not installed)"""
+    global np, _numpy_checked
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            # NumPy is optional - the pure Python path gives the same kind of output
+            pass
+    return np
+
+
+# Operator codes stored in the op column
+OP_ADD = ADD.code
+OP_SUB = SUB.code
+OP_MUL = MUL.code
+OP_DIV = DIV.code
+OP_POW = POW.code
+OPERATION_SYMBOLS = tuple(operation.symbol for operation in OPERATIONS)
+
+# Below this size NumPy's per-call overhead costs more than it saves
+NUMPY_MIN_BATCH = 1000
+
+# One batch of questions stored column by column
+QuestionBatch = namedtuple('QuestionBatch', ['num1', 'num2', 'ops', 'answers'])
+
+
+class Question:
+    """A single question handed out by a QuestionSet"""
+    __slots__ = ('num1', 'num2', 'operation', 'answer')
+    
+    def __init__(self, num1, num2, operation, answer):
+        self.num1 = num1
+        self.num2 = num2
+        self.operation = operation
+        self.answer = answer
+    
+    def __repr__(self):
+        return f"Question({self.num1} {self.operation} {self.num2} = {self.answer})"
+
+
+class QuestionSet:
+    """Questions kept in parallel typed arrays instead of one dict each
+    
+    Indexing builds a Question on the fly, so only 13 bytes per question
+    (three 4-byte ints and a 1-byte operator code) are held in memory.
+    """
+    __slots__ = ('num1', 'num2', 'ops', 'answers')
+    
+    def __init__(self, num1=(), num2=(), ops=(), answers=()):
+        self.num1 = array('i', num1)
+        self.num2 = array('i', num2)
+        self.ops = array('b', ops)
+        self.answers = array('i', answers)
+    
+    @classmethod
+    def from_batch(cls, batch):
+        """Build a set from a QuestionBatch (NumPy or list columns)"""
+        if np is not None and isinstance(batch.num1, np.ndarray):
+            # Copy the raw bytes across rather than boxing every value
+            questions = cls()
+            questions.num1.frombytes(batch.num1.astype(np.intc).tobytes())
+            questions.num2.frombytes(batch.num2.astype(np.intc).tobytes())
+            questions.ops.frombytes(batch.ops.astype(np.int8).tobytes())
+            questions.answers.frombytes(batch.answers.astype(np.intc).tobytes())
+            return questions
+        return cls(batch.num1, batch.num2, batch.ops, batch.answers)
+    
+    def __len__(self):
+        return len(self.answers)
+    
+    def __getitem__(self, index):
+        return Question(
+            self.num1[index],
+            self.num2[index],
+            OPERATION_SYMBOLS[self.ops[index]],
+            self.answers[index]
+        )
+    
+    def __iter__(self):
+        for index in range(len(self.answers)):
+            yield self[index]
+    
+    def nbytes(self):
+        """Bytes used by the question data itself"""
+        return sum(len(column) * column.itemsize
+                   for column in (self.num1, self.num2, self.ops, self.answers))
+
+
+class QuestionGenerator:
+    """Generates batches of questions, optionally from a fixed seed"""
+    
+    def __init__(self, seed=None, use_numpy=True):
+        """Create the random sources (same seed -> same questions)"""
+        self.use_numpy = use_numpy
+        self.seed = seed
+        self.rng = random.Random(seed)
+        # The NumPy generator is made with the first large batch
+        self.np_rng = None
+        # One deck of fact indexes per difficulty, for drill()
+        self.decks = {}
+    
+    def generate(self, difficulty, count):
+        """Generate count questions for a difficulty as a QuestionBatch
+        
+        Every fact of the difficulty is equally likely each time, so the
+        same question can come up twice (see drill() for no repeats).
+        """
+        table = fact_table(difficulty)
+        if self.use_numpy and count >= NUMPY_MIN_BATCH and load_numpy() is not None:
+            return self._generate_numpy(table, count)
+        return self._generate_python(table, count)
+    
+    def _generate_numpy(self, table, count):
+        """Vectorised version using NumPy arrays"""
+        if self.np_rng is None:
+            self.np_rng = np.random.default_rng(self.seed)
+        picks = self.np_rng.integers(0, len(table), count)
+        return QuestionBatch(*(column[picks] for column in table.columns(np)))
+    
+    def _generate_python(self, table, count):
+        """Pure Python version using list columns"""
+        return self._batch(table, self.rng.choices(range(len(table)), k=count))
+    
+    def drill(self, difficulty, count):
+        """count questions with no fact repeated until every fact has come up
+        
+        The deck carries on from one call to the next, so back-to-back
+        quizzes keep going through the facts instead of starting over.
+        """
+        table = fact_table(difficulty)
+        deck = self.decks.get(difficulty)
+        if deck is None:
+            deck = self.decks[difficulty] = FactDeck(len(table))
+        draw, rng = deck.draw, self.rng
+        return self._batch(table, [draw(rng) for _ in range(count)])
+    
+    @staticmethod
+    def _batch(table, picks):
+        """QuestionBatch of list columns for the facts at these indexes"""
+        num1, num2, ops, answers = table.num1, table.num2, table.ops, table.answers
+        return QuestionBatch([num1[i] for i in picks], [num2[i] for i in picks],
+                             [ops[i] for i in picks], [answers[i] for i in picks])
+
+
+class QuestionStream:
+    """Endless iterator of questions, generated on demand
+    
+    Only a small look-ahead buffer is kept, so memory stays constant no
+    matter how many questions are asked. The buffer is topped up every
+    time a question is taken, so the next one is always ready.
+    """
+    
+    def __init__(self, difficulty, generator=None, lookahead=1, limit=None):
+        """limit=None keeps going forever; questions do not repeat until
+        every fact of the difficulty has been asked"""
+        if difficulty not in DIFFICULTY_RANGES:
+            raise ValueError(f"Unknown difficulty: {difficulty}")
+        self.difficulty = difficulty
+        self.generator = generator or QuestionGenerator()
+        self.lookahead = max(0, lookahead)
+        self.remaining = limit
+        self.buffer = deque()
+        self._fill()
+    
+    def _fill(self):
+        """Generate questions until the look-ahead buffer is full"""
+        wanted = self.lookahead - len(self.buffer)
+        if self.remaining is not None:
+            wanted = min(wanted, self.remaining - len(self.buffer))
+        if wanted > 0:
+            batch = self.generator.drill(self.difficulty, wanted)
+            self.buffer.extend(QuestionSet.from_batch(batch))
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self):
+        if self.remaining is not None and self.remaining <= 0:
+            raise StopIteration
+        
+        if self.buffer:
+            question = self.buffer.popleft()
+        else:
+            # No look-ahead - make this one now
+            batch = self.generator.drill(self.difficulty, 1)
+            question = QuestionSet.from_batch(batch)[0]
+        
+        if self.remaining is not None:
+            self.remaining -= 1
+        self._fill()
+        return question
+    
+    def set_difficulty(self, difficulty):
+        """Switch level; buffered questions for the old level are dropped"""
+        if difficulty not in DIFFICULTY_RANGES:
+            raise ValueError(f"Unknown difficulty: {difficulty}")
+        if difficulty != self.difficulty:
+            self.difficulty = difficulty
+            self.buffer.clear()
+            self._fill()
+    
+    def peek(self):
+        """The next question without taking it (None if none are buffered)"""
+        return self.buffer[0] if self.buffer else None
\ No newline at end of file
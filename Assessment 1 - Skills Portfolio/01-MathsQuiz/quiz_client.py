@@ -0,0 +1,116 @@
+"""
+Load generator for the Maths Quiz server
+
+Opens many concurrent connections, plays full quizzes on each of them
+and reports answer latency (p50/p99) and completed sessions per second.
+
+Run against a server that is already up:
+    python quiz_client.py --port 8765 --clients 1000 --sessions 5
+or let the client start a server in the same event loop (single core):
+    python quiz_client.py --local --clients 1000 --sessions 5
+"""
+
+import argparse
+import asyncio
+import time
+
+from operations import MODES, OPERATIONS_BY_SYMBOL
+from quiz_server import QuizServer, DEFAULT_HOST, DEFAULT_PORT
+
+
+def solve(question_line):
+    """Work out the answer to a 'Q n num1 op num2' line"""
+    _, _, num1, symbol, num2 = question_line.split()
+    return OPERATIONS_BY_SYMBOL[symbol].answer(int(num1), int(num2))
+
+
+async def play(host, port, sessions, difficulty, latencies, miss_first):
+    """One simulated learner playing several quizzes on one connection"""
+    reader, writer = await asyncio.open_connection(host, port, limit=1024)
+    completed = 0
+    try:
+        for _ in range(sessions):
+            writer.write(f"START {difficulty}\n".encode())
+            line = (await reader.readline()).decode()
+            
+            while not line.startswith('DONE'):
+                answer = solve(line)
+                if miss_first:
+                    # Wrong first, so the TRY_AGAIN path gets exercised too
+                    start = time.perf_counter()
+                    writer.write(f"ANSWER {answer + 1}\n".encode())
+                    await reader.readline()
+                    latencies.append(time.perf_counter() - start)
+                
+                start = time.perf_counter()
+                writer.write(f"ANSWER {answer}\n".encode())
+                await reader.readline()          # CORRECT ...
+                latencies.append(time.perf_counter() - start)
+                line = (await reader.readline()).decode()   # next Q or DONE
+            completed += 1
+        
+        writer.write(b"QUIT\n")
+        await writer.drain()
+    finally:
+        writer.close()
+    return completed
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+async def run_load(args):
+    """Start the learners (and the local server if asked) and report"""
+    server_task = None
+    if args.local:
+        ready = asyncio.Event()
+        server_task = asyncio.create_task(
+            QuizServer().serve(args.host, args.port, ready))
+        await ready.wait()
+    
+    latencies = []
+    start = time.perf_counter()
+    results = await asyncio.gather(*[
+        play(args.host, args.port, args.sessions, args.difficulty,
+             latencies, args.miss_first)
+        for _ in range(args.clients)
+    ])
+    elapsed = time.perf_counter() - start
+    
+    if server_task is not None:
+        server_task.cancel()
+    
+    latencies.sort()
+    total = sum(results)
+    print(f"{args.clients} concurrent clients, {total:,} sessions in {elapsed:.2f}s")
+    print(f"  sessions/sec : {total / elapsed:,.0f}")
+    print(f"  answers      : {len(latencies):,}")
+    print(f"  p50 latency  : {percentile(latencies, 0.50) * 1000:.3f} ms")
+    print(f"  p99 latency  : {percentile(latencies, 0.99) * 1000:.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maths Quiz load generator")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--sessions', type=int, default=5,
+                        help="quizzes played by each client")
+    parser.add_argument('--difficulty', default='moderate',
+                        choices=list(MODES))
+    parser.add_argument('--miss-first', action='store_true',
+                        help="answer every question wrong once first")
+    parser.add_argument('--local', action='store_true',
+                        help="run the server in this process's event loop")
+    args = parser.parse_args()
+    
+    asyncio.run(run_load(args))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
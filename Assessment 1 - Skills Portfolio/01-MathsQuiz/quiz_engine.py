@@ -0,0 +1,233 @@
+"""
+Headless quiz engine for the Maths Quiz
+
+Holds the scoring rules without any tkinter code, so the same logic can
+drive the Tk window, a server or a simulation:
+- 10 points for a correct answer on the first try
+- 5 points on the second try
+- after two wrong answers the quiz moves on to the next question
+"""
+
+from operations import OPERATIONS_BY_SYMBOL, fact_table
+from question_generator import (
+    OPERATION_SYMBOLS, Question, QuestionGenerator, QuestionSet, QuestionStream
+)
+from review import SLOW_SECONDS
+
+# Points for a correct answer, indexed by the number of earlier misses
+POINTS_BY_ATTEMPT = (10, 5)
+MAX_ATTEMPTS = len(POINTS_BY_ATTEMPT)
+
+# What happened to an answer passed to QuizSession.submit
+RESULT_CORRECT = 'correct'        # right answer, moved to the next question
+RESULT_TRY_AGAIN = 'try_again'    # first miss, same question again
+RESULT_WRONG = 'wrong'            # second miss, moved to the next question
+
+# Grade bands: (minimum score, grade, message), highest first
+GRADE_BANDS = (
+    (90, "A+", "Outstanding Performance! 🌟"),
+    (80, "A", "Excellent Work! 🎯"),
+    (70, "B", "Good Job! 👍"),
+    (60, "C", "Keep Practicing! 📚"),
+    (0, "D", "Try Again! 💪")
+)
+
+
+def grade_for(score):
+    """Return (grade, message) for a final score"""
+    for min_score, grade, message in GRADE_BANDS:
+        if score >= min_score:
+            return grade, message
+    return GRADE_BANDS[-1][1], GRADE_BANDS[-1][2]
+
+
+class QuizSession:
+    """One learner's run through a set or stream of questions
+    
+    questions is either a QuestionSet (played from index start onwards)
+    or any iterator of Question objects such as a QuestionStream.
+    total_questions=None means keep going until the questions run out,
+    which for a QuestionStream is never (endless practice).
+    
+    With a scheduler (see adaptive.py) the session reports how long each
+    question took and lets the scheduler pick the level of the next one.
+    This needs a QuestionStream so the level can change mid-quiz.
+    
+    With reviews (a LearnerReviews, see review.py) every answer is passed
+    on to the learner's spaced-repetition queues, and a fact that is due
+    for review is asked in place of the next planned question.
+    """
+    __slots__ = ('difficulty', 'questions', 'source', 'start', 'current',
+                 'answer', 'total_questions', 'question_num',
+                 'attempt_count', 'score', 'last_points', 'scheduler',
+                 'reviews', 'fact')
+    
+    def __init__(self, difficulty, questions, start=0, total_questions=None,
+                 scheduler=None, reviews=None):
+        self.difficulty = difficulty
+        self.scheduler = scheduler
+        self.reviews = reviews
+        self.start = start
+        if isinstance(questions, QuestionSet):
+            # Indexed straight into the arrays - no iterator needed
+            self.questions = questions
+            self.source = None
+            if total_questions is None:
+                total_questions = len(questions) - start
+        else:
+            self.questions = None
+            self.source = iter(questions)
+        self.total_questions = total_questions
+        self.question_num = 0
+        self.attempt_count = 0
+        self.score = 0
+        self.last_points = 0
+        self._load_question()
+    
+    def _load_question(self):
+        """Point current/answer at question number question_num"""
+        # Fact index of the question when it is a review
+        self.fact = None
+        if self.total_questions is not None and self.question_num >= self.total_questions:
+            self.current = None
+        elif self.reviews is not None and self._load_review():
+            return
+        elif self.source is None:
+            # Built lazily by current_question(), only the answer is needed here
+            self.current = False
+            self.answer = self.questions.answers[self.start + self.question_num]
+            return
+        else:
+            self.current = next(self.source, None)
+            if self.current is not None:
+                self.answer = self.current.answer
+                return
+        self.answer = None
+    
+    def _load_review(self):
+        """Ask the fact most overdue for review instead, if there is one"""
+        index = self.reviews.next_due(self.difficulty)
+        if index is None:
+            return False
+        table = fact_table(self.difficulty)
+        self.fact = index
+        self.answer = table.answers[index]
+        self.current = Question(table.num1[index], table.num2[index],
+                                OPERATION_SYMBOLS[table.ops[index]], self.answer)
+        return True
+    
+    @property
+    def finished(self):
+        return self.current is None
+    
+    @property
+    def endless(self):
+        return self.total_questions is None
+    
+    @property
+    def reviewing(self):
+        """True when the current question was brought back for review"""
+        return self.fact is not None
+    
+    def current_question(self):
+        """The Question being asked, or None once the quiz is over"""
+        if self.current is False:
+            self.current = self.questions[self.start + self.question_num]
+        return self.current
+    
+    def correct_answer(self):
+        return self.answer
+    
+    def submit(self, user_answer, elapsed=None):
+        """Score an answer and return RESULT_CORRECT/TRY_AGAIN/WRONG
+        
+        elapsed is the time in seconds since the question was shown.
+        """
+        if self.current is None:
+            raise ValueError("Quiz is already finished")
+        
+        if user_answer == self.answer:
+            points = POINTS_BY_ATTEMPT[self.attempt_count]
+            self.last_points = points
+            self.score += points
+            result = RESULT_CORRECT
+        else:
+            self.last_points = 0
+            self.attempt_count += 1
+            if self.attempt_count < MAX_ATTEMPTS:
+                return RESULT_TRY_AGAIN
+            # Out of attempts - move on
+            result = RESULT_WRONG
+        
+        if self.reviews is not None:
+            self._record_review(result == RESULT_WRONG, elapsed)
+        
+        if self.scheduler is not None and elapsed is not None:
+            first_try = result == RESULT_CORRECT and self.attempt_count == 0
+            self._change_level(self.scheduler.record(elapsed, first_try))
+        
+        self.question_num += 1
+        self.attempt_count = 0
+        self._load_question()
+        return result
+    
+    def _record_review(self, missed, elapsed):
+        """Tell the review queues how the current fact went"""
+        # Right on the second try or after a long think still needs practice
+        slow = self.attempt_count > 0 or (elapsed is not None and elapsed > SLOW_SECONDS)
+        if not (missed or slow or self.reviews.has_queue(self.difficulty)):
+            # Nothing to schedule, so skip looking the fact up
+            return
+        index = self.fact
+        if index is None:
+            question = self.current_question()
+            code = OPERATIONS_BY_SYMBOL[question.operation].code
+            index = fact_table(self.difficulty).find(question.num1, question.num2, code)
+        if index is not None:
+            self.reviews.record(self.difficulty, index, missed, slow)
+    
+    def _change_level(self, difficulty):
+        """Ask the question stream for a different level from now on"""
+        if difficulty != self.difficulty:
+            self.difficulty = difficulty
+            self.source.set_difficulty(difficulty)
+    
+    def grade(self):
+        """Return (grade, message) for the current score"""
+        return grade_for(self.score)
+
+
+class QuizEngine:
+    """Creates quiz sessions with freshly generated questions"""
+    
+    def __init__(self, generator=None, total_questions=10, lookahead=2):
+        self.generator = generator or QuestionGenerator()
+        self.total_questions = total_questions
+        self.lookahead = lookahead
+    
+    def new_session(self, difficulty, endless=False, scheduler=None, reviews=None):
+        """Start one session for a difficulty
+        
+        Endless and adaptive sessions pull questions from a QuestionStream
+        as they go instead of generating the whole quiz up front. reviews
+        is the learner's LearnerReviews for spaced repetition (optional).
+        """
+        if endless or scheduler is not None:
+            total = None if endless else self.total_questions
+            stream = QuestionStream(difficulty, self.generator, self.lookahead, total)
+            return QuizSession(difficulty, stream, total_questions=total,
+                               scheduler=scheduler, reviews=reviews)
+        
+        # A quiz never asks the same fact twice (unless it has fewer facts
+        # than questions)
+        batch = self.generator.drill(difficulty, self.total_questions)
+        return QuizSession(difficulty, QuestionSet.from_batch(batch),
+                           total_questions=self.total_questions, reviews=reviews)
+    
+    def new_sessions(self, difficulty, count):
+        """Start many sessions that share one generated QuestionSet"""
+        size = self.total_questions
+        batch = self.generator.generate(difficulty, count * size)
+        questions = QuestionSet.from_batch(batch)
+        return [QuizSession(difficulty, questions, i * size, size)
+                for i in range(count)]
\ No newline at end of file
@@ -0,0 +1,141 @@
+"""
+Maths Quiz server
+
+Runs the quiz engine over a simple line protocol with asyncio, so one
+event loop can hold thousands of learners at once. Every connection gets
+its own QuizSession (questions, attempt counter and score).
+
+Protocol (one UTF-8 line per message):
+    client: START <easy|moderate|hard|division|powers|mixed>
+    server: Q <number> <num1> <operation> <num2>
+    client: ANSWER <number>
+    server: CORRECT <points> <score>   then the next Q line or DONE
+            TRY_AGAIN <score>
+            WRONG <correct answer> <score>   then the next Q line or DONE
+            INVALID   (answer was not a whole number)
+    server: DONE <score> <grade>
+    client: QUIT
+Anything else gets "ERROR <reason>". A line over 1 KB gets
+"ERROR line too long" and the connection is closed.
+
+Run:  python quiz_server.py --port 8765
+"""
+
+import argparse
+import asyncio
+
+from question_generator import DIFFICULTY_RANGES
+from quiz_engine import QuizEngine, RESULT_CORRECT, RESULT_TRY_AGAIN
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+
+class QuizServer:
+    """Serves one QuizSession per connected client"""
+    
+    def __init__(self, engine=None):
+        self.engine = engine or QuizEngine()
+        self.active_sessions = 0
+        self.completed_sessions = 0
+    
+    def question_line(self, session):
+        """Protocol line for the session's current question"""
+        question = session.current_question()
+        return (f"Q {session.question_num + 1} {question.num1} "
+                f"{question.operation} {question.num2}\n")
+    
+    def finished_line(self, session):
+        """Protocol line sent when a session ends"""
+        self.completed_sessions += 1
+        return f"DONE {session.score} {session.grade()[0]}\n"
+    
+    def handle_line(self, session, line):
+        """Work out the reply to one line; returns (reply, session)"""
+        command, _, argument = line.strip().partition(' ')
+        command = command.upper()
+        
+        if command == 'START':
+            difficulty = argument.strip().lower()
+            if difficulty not in DIFFICULTY_RANGES:
+                return "ERROR unknown difficulty\n", session
+            session = self.engine.new_session(difficulty)
+            return self.question_line(session), session
+        
+        if command == 'ANSWER':
+            if session is None or session.finished:
+                return "ERROR no quiz in progress\n", session
+            try:
+                user_answer = int(argument)
+            except ValueError:
+                return "INVALID\n", session
+            
+            correct_ans = session.correct_answer()
+            result = session.submit(user_answer)
+            if result == RESULT_TRY_AGAIN:
+                return f"TRY_AGAIN {session.score}\n", session
+            if result == RESULT_CORRECT:
+                reply = f"CORRECT {session.last_points} {session.score}\n"
+            else:
+                reply = f"WRONG {correct_ans} {session.score}\n"
+            
+            # Follow up with the next question or the final result
+            if session.finished:
+                return reply + self.finished_line(session), session
+            return reply + self.question_line(session), session
+        
+        return "ERROR unknown command\n", session
+    
+    async def handle_client(self, reader, writer):
+        """Run one connection until the client quits or disconnects"""
+        self.active_sessions += 1
+        session = None
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    # Longer than the stream limit - the rest of it is still
+                    # unread, so say why and hang up rather than misread it
+                    writer.write(b"ERROR line too long\n")
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                text = line.decode('utf-8', errors='replace')
+                if text.strip().upper() == 'QUIT':
+                    break
+                reply, session = self.handle_line(session, text)
+                writer.write(reply.encode('utf-8'))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.active_sessions -= 1
+            writer.close()
+    
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, ready=None):
+        """Listen until cancelled; ready (an asyncio.Event) is set once bound"""
+        server = await asyncio.start_server(self.handle_client, host, port,
+                                            limit=1024, backlog=4096)
+        if ready is not None:
+            ready.set()
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maths Quiz line-protocol server")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    
+    print(f"Maths Quiz server listening on {args.host}:{args.port}")
+    try:
+        asyncio.run(QuizServer().serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
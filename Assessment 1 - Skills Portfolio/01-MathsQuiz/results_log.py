@@ -0,0 +1,261 @@
+"""
+Results log for the Maths Quiz
+
+Every finished session is appended to a binary file as one fixed-width
+record: when it was played, difficulty, score, grade, and for up to 10
+questions the final answer given, the number of attempts and the time
+taken. Writes are buffered; reads memory-map the file so the queries
+(leaderboard, average score per difficulty, grade distribution) work
+straight on the bytes without building a Python object per session.
+NumPy makes the queries vectorised when it is installed; it is only
+imported when a ResultsLog is opened, so writing results never loads it.
+"""
+
+import heapq
+import mmap
+import os
+import struct
+import time
+
+# Per-question details are kept for this many questions per session
+MAX_QUESTIONS = 10
+
+# New modes go on the end, so the codes in older logs keep their meaning
+DIFFICULTIES = ('easy', 'moderate', 'hard', 'division', 'powers', 'mixed')
+GRADES = ('A+', 'A', 'B', 'C', 'D')
+
+# File header: magic, format version, record size
+MAGIC = b'MQRL'
+VERSION = 1
+HEADER = struct.Struct('<4sHH8x')
+
+# Record: timestamp, difficulty, grade, score, questions answered,
+# then answers, attempts and times (milliseconds) for MAX_QUESTIONS
+RECORD = struct.Struct(f'<dBBIH{MAX_QUESTIONS}i{MAX_QUESTIONS}B{MAX_QUESTIONS}H')
+SUMMARY = struct.Struct('<dBBI')
+
+# Answers are stored as int32 - anything typed beyond that is clamped to it
+ANSWER_MIN, ANSWER_MAX = -2 ** 31, 2 ** 31 - 1
+
+# Filled in by load_numpy() when the first log is opened for reading
+np = None
+RECORD_DTYPE = None
+_numpy_checked = False
+
+
+def load_numpy():
+    """Import NumPy and build the record dtype once (None if not installed)"""
+    global np, RECORD_DTYPE, _numpy_checked
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy
+        except ImportError:
+            # NumPy is optional - queries fall back to struct.unpack_from
+            return None
+        RECORD_DTYPE = numpy.dtype([
+            ('timestamp', '<f8'),
+            ('difficulty', 'u1'),
+            ('grade', 'u1'),
+            ('score', '<u4'),
+            ('answered', '<u2'),
+            ('answers', '<i4', MAX_QUESTIONS),
+            ('attempts', 'u1', MAX_QUESTIONS),
+            ('times_ms', '<u2', MAX_QUESTIONS)
+        ])
+        assert RECORD_DTYPE.itemsize == RECORD.size
+        np = numpy
+    return np
+
+
+def pack_session(difficulty, score, grade, history, answered=None, timestamp=None):
+    """Pack one session into record bytes
+    
+    history is a list of (answer, attempts, seconds) per question; only
+    the first MAX_QUESTIONS are kept. answered defaults to len(history).
+    """
+    kept = history[:MAX_QUESTIONS]
+    padding = [0] * (MAX_QUESTIONS - len(kept))
+    answers = [min(max(answer, ANSWER_MIN), ANSWER_MAX) for answer, _, _ in kept] + padding
+    attempts = [attempts for _, attempts, _ in kept] + padding
+    times_ms = [min(int(seconds * 1000), 0xFFFF) for _, _, seconds in kept] + padding
+    return RECORD.pack(
+        time.time() if timestamp is None else timestamp,
+        DIFFICULTIES.index(difficulty),
+        GRADES.index(grade),
+        score,
+        min(len(history) if answered is None else answered, 0xFFFF),
+        *answers, *attempts, *times_ms
+    )
+
+
+class ResultsWriter:
+    """Appends session records through a buffered file
+    
+    An existing file must have a matching header (ValueError if not). A
+    half-written record at its end (e.g. after a crash) is cut off before
+    anything is appended, so new records line up with the old ones.
+    """
+    
+    def __init__(self, path, buffer_size=1 << 16):
+        self.path = path
+        # 'a+b' makes the file if needed and keeps every write at the end
+        self.file = open(path, 'a+b', buffering=buffer_size)
+        size = self.file.seek(0, os.SEEK_END)
+        if size == 0:
+            self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+            return
+        
+        self.file.seek(0)
+        header = self.file.read(HEADER.size)
+        if len(header) < HEADER.size or HEADER.unpack(header) != (MAGIC, VERSION, RECORD.size):
+            self.file.close()
+            raise ValueError(f"{path} has an unsupported format")
+        whole = size - (size - HEADER.size) % RECORD.size
+        if whole != size:
+            self.file.truncate(whole)
+    
+    def append(self, difficulty, score, grade, history, answered=None, timestamp=None):
+        """Queue one session for writing"""
+        self.file.write(pack_session(difficulty, score, grade, history, answered, timestamp))
+    
+    def append_packed(self, record):
+        """Queue an already packed record"""
+        self.file.write(record)
+    
+    def flush(self):
+        self.file.flush()
+    
+    def close(self):
+        self.file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ResultsLog:
+    """Read-only, memory-mapped view of a results file"""
+    
+    def __init__(self, path):
+        load_numpy()
+        self.path = path
+        self.file = open(path, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        if size < HEADER.size:
+            self.file.close()
+            raise ValueError(f"{path} is not a quiz results log")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        magic, version, record_size = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{path} has an unsupported format")
+        
+        # A half-written record at the end (e.g. after a crash) is ignored
+        self.count = (size - HEADER.size) // RECORD.size
+    
+    def __len__(self):
+        return self.count
+    
+    def close(self):
+        self.map.close()
+        self.file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def records(self):
+        """NumPy structured array over the mapped file (no copy)"""
+        return np.frombuffer(self.map, dtype=RECORD_DTYPE, count=self.count,
+                             offset=HEADER.size)
+    
+    def session(self, index):
+        """Full details of one session as a dict"""
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        values = RECORD.unpack_from(self.map, HEADER.size + index * RECORD.size)
+        timestamp, difficulty, grade, score, answered = values[:5]
+        kept = min(answered, MAX_QUESTIONS)
+        answers = values[5:5 + kept]
+        attempts = values[5 + MAX_QUESTIONS:5 + MAX_QUESTIONS + kept]
+        times_ms = values[5 + 2 * MAX_QUESTIONS:5 + 2 * MAX_QUESTIONS + kept]
+        return {
+            'timestamp': timestamp,
+            'difficulty': DIFFICULTIES[difficulty],
+            'grade': GRADES[grade],
+            'score': score,
+            'answered': answered,
+            'history': [(a, n, ms / 1000) for a, n, ms in zip(answers, attempts, times_ms)]
+        }
+    
+    def _summaries(self):
+        """(timestamp, difficulty, grade, score) for each record, one at a time"""
+        unpack_from = SUMMARY.unpack_from
+        data = self.map
+        for offset in range(HEADER.size, HEADER.size + self.count * RECORD.size, RECORD.size):
+            yield unpack_from(data, offset)
+    
+    def leaderboard(self, top=10, difficulty=None):
+        """Best sessions first: list of (index, score, grade, difficulty)"""
+        level = None if difficulty is None else DIFFICULTIES.index(difficulty)
+        
+        if np is not None:
+            records = self.records()
+            indexes = np.arange(self.count)
+            scores = records['score']
+            if level is not None:
+                indexes = indexes[records['difficulty'] == level]
+                scores = scores[indexes]
+            if len(indexes) > top:
+                # Partial sort: only the top entries get fully ordered
+                best = np.argpartition(-scores.astype(np.int64), top - 1)[:top]
+            else:
+                best = np.arange(len(indexes))
+            best = best[np.lexsort((indexes[best], -scores[best].astype(np.int64)))]
+            return [(int(indexes[i]), int(scores[i]), GRADES[records['grade'][indexes[i]]],
+                     DIFFICULTIES[records['difficulty'][indexes[i]]])
+                    for i in best]
+        
+        entries = ((score, -index, grade, diff)
+                   for index, (_, diff, grade, score) in enumerate(self._summaries())
+                   if level is None or diff == level)
+        return [(-neg_index, score, GRADES[grade], DIFFICULTIES[diff])
+                for score, neg_index, grade, diff in heapq.nlargest(top, entries)]
+    
+    def average_by_difficulty(self):
+        """Average score for each difficulty that has been played"""
+        if np is not None:
+            records = self.records()
+            counts = np.bincount(records['difficulty'], minlength=len(DIFFICULTIES))
+            totals = np.bincount(records['difficulty'], weights=records['score'],
+                                 minlength=len(DIFFICULTIES))
+        else:
+            counts = [0] * len(DIFFICULTIES)
+            totals = [0] * len(DIFFICULTIES)
+            for _, diff, _, score in self._summaries():
+                counts[diff] += 1
+                totals[diff] += score
+        return {DIFFICULTIES[i]: float(totals[i]) / int(counts[i])
+                for i in range(len(DIFFICULTIES)) if counts[i]}
+    
+    def grade_distribution(self, difficulty=None):
+        """How many sessions got each grade"""
+        level = None if difficulty is None else DIFFICULTIES.index(difficulty)
+        if np is not None:
+            records = self.records()
+            grades = records['grade']
+            if level is not None:
+                grades = grades[records['difficulty'] == level]
+            counts = np.bincount(grades, minlength=len(GRADES))
+        else:
+            counts = [0] * len(GRADES)
+            for _, diff, grade, _ in self._summaries():
+                if level is None or diff == level:
+                    counts[grade] += 1
+        return {GRADES[i]: int(counts[i]) for i in range(len(GRADES))}
\ No newline at end of file
@@ -0,0 +1,244 @@
+"""
+Spaced repetition for the Maths Quiz
+
+Facts a learner missed, or only got slowly, come back later: each one is
+due again after an interval that grows every time it is answered well
+and starts over when it is missed. Once the interval passes
+RETIRE_SECONDS the fact is dropped from the schedule.
+
+Each learner has a ReviewQueue per quiz mode. A fact is its index in the
+mode's fact table (see operations.py), and the queue keeps a heap of
+due times, so finding the next due fact and rescheduling one are both
+O(log n). ReviewStore keeps every learner's queues in one binary file
+and only unpacks a learner's queues when that learner plays, so a file
+with hundreds of thousands of learner-fact pairs still opens quickly.
+"""
+
+import heapq
+import os
+import struct
+import sys
+import time
+from array import array
+
+from operations import fact_table
+from results_log import DIFFICULTIES
+
+# A missed fact is asked again after this many seconds (a few questions later)
+FIRST_INTERVAL = 30
+# Each good answer multiplies the interval by this
+GROWTH = 4
+# A fact whose interval grows past this is known and leaves the schedule
+RETIRE_SECONDS = 30 * 24 * 3600
+# A right answer slower than this still counts as needing practice
+SLOW_SECONDS = 10.0
+
+# Heap entries are single ints: due time (whole seconds) above the fact index
+INDEX_BITS = 24
+INDEX_MASK = (1 << INDEX_BITS) - 1
+
+# File header: magic, format version
+MAGIC = b'MQSR'
+VERSION = 1
+HEADER = struct.Struct('<4sH10x')
+
+# Then one block per learner: name length and the size of the queues
+# after the name; each queue is its mode code, fact table size and number
+# of facts, then three uint32 columns (index, due, interval)
+LEARNER = struct.Struct('<HI')
+QUEUE = struct.Struct('<BII')
+
+
+class ReviewQueue:
+    """The scheduled facts of one learner in one mode"""
+    __slots__ = ('size', 'due', 'intervals', 'heap')
+    
+    def __init__(self, size):
+        self.size = size          # facts in the mode's table
+        self.due = {}             # fact index -> due time (seconds)
+        self.intervals = {}       # fact index -> current interval (seconds)
+        # due << INDEX_BITS | index; entries whose due time no longer
+        # matches self.due are stale and skipped when they reach the top
+        self.heap = []
+    
+    def __len__(self):
+        return len(self.due)
+    
+    def _schedule(self, index, interval, now):
+        due = int(now) + interval
+        self.due[index] = due
+        self.intervals[index] = interval
+        heapq.heappush(self.heap, due << INDEX_BITS | index)
+        if len(self.heap) > 2 * len(self.due) + 64:
+            # Too many stale entries - rebuild from the live ones, O(n)
+            self.heap = [d << INDEX_BITS | i for i, d in self.due.items()]
+            heapq.heapify(self.heap)
+    
+    def record(self, index, missed, slow, now):
+        """Reschedule a fact after it has been answered"""
+        interval = self.intervals.get(index)
+        if missed:
+            self._schedule(index, FIRST_INTERVAL, now)
+        elif slow:
+            # Right in the end - ask again after the same wait
+            self._schedule(index, interval or FIRST_INTERVAL, now)
+        elif interval is not None:
+            interval *= GROWTH
+            if interval > RETIRE_SECONDS:
+                del self.due[index]
+                del self.intervals[index]
+            else:
+                self._schedule(index, interval, now)
+    
+    def next_due(self, now):
+        """Index of the fact most overdue at time now, or None
+        
+        The fact stays scheduled until record() is called for it.
+        """
+        heap = self.heap
+        while heap:
+            entry = heap[0]
+            index = entry & INDEX_MASK
+            due = entry >> INDEX_BITS
+            if self.due.get(index) == due:
+                return index if due <= now else None
+            heapq.heappop(heap)
+        return None
+    
+    def pack(self, code):
+        """The queue as bytes for the file (code is the mode's code)"""
+        indexes = array('I', self.due)
+        dues = array('I', self.due.values())
+        intervals = array('I', (self.intervals[i] for i in indexes))
+        if sys.byteorder == 'big':
+            for column in (indexes, dues, intervals):
+                column.byteswap()
+        return b''.join((QUEUE.pack(code, self.size, len(indexes)),
+                         indexes.tobytes(), dues.tobytes(), intervals.tobytes()))
+    
+    @classmethod
+    def unpack(cls, data, offset):
+        """Rebuild a queue packed at data[offset:]; returns (queue, end offset)"""
+        _, size, count = QUEUE.unpack_from(data, offset)
+        start = offset + QUEUE.size
+        columns = []
+        for _ in range(3):
+            column = array('I')
+            column.frombytes(data[start:start + 4 * count])
+            if sys.byteorder == 'big':
+                column.byteswap()
+            columns.append(column)
+            start += 4 * count
+        indexes, dues, intervals = columns
+        queue = cls(size)
+        queue.due = dict(zip(indexes, dues))
+        queue.intervals = dict(zip(indexes, intervals))
+        queue.heap = [d << INDEX_BITS | i for i, d in zip(indexes, dues)]
+        heapq.heapify(queue.heap)
+        return queue, start
+
+
+class LearnerReviews:
+    """One learner's review queues, one per mode"""
+    
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.queues = {}
+    
+    def __len__(self):
+        return sum(len(queue) for queue in self.queues.values())
+    
+    def queue(self, difficulty):
+        """The queue for a mode, made the first time it is needed"""
+        queue = self.queues.get(difficulty)
+        if queue is None:
+            queue = self.queues[difficulty] = ReviewQueue(len(fact_table(difficulty)))
+        return queue
+    
+    def has_queue(self, difficulty):
+        return difficulty in self.queues
+    
+    def next_due(self, difficulty):
+        """Fact index to review now in this mode, or None"""
+        queue = self.queues.get(difficulty)
+        return None if queue is None else queue.next_due(self.clock())
+    
+    def record(self, difficulty, index, missed, slow=False):
+        """Note how a fact went: missed, slow (right but only just) or fine"""
+        if missed or slow or difficulty in self.queues:
+            self.queue(difficulty).record(index, missed, slow, self.clock())
+
+
+class ReviewStore:
+    """Every learner's review queues, saved in one binary file
+    
+    Learners read from the file stay as raw bytes until learner() is
+    called for them; save() writes those bytes straight back.
+    """
+    
+    def __init__(self, path, clock=time.time):
+        self.path = path
+        self.clock = clock
+        self.learners = {}    # name -> LearnerReviews
+        self.packed = {}      # name -> learner block not unpacked yet
+        if os.path.exists(path):
+            self._load()
+    
+    def _load(self):
+        with open(self.path, 'rb') as file:
+            data = memoryview(file.read())
+        if len(data) < HEADER.size:
+            raise ValueError(f"{self.path} is not a review file")
+        magic, version = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} has an unsupported format")
+        
+        # Only the learner headers are read here - one per learner
+        offset = HEADER.size
+        while offset + LEARNER.size <= len(data):
+            name_length, queues_size = LEARNER.unpack_from(data, offset)
+            name_end = offset + LEARNER.size + name_length
+            end = name_end + queues_size
+            if end > len(data):
+                # A cut-off block at the end is ignored
+                break
+            name = str(data[offset + LEARNER.size:name_end], 'utf-8')
+            self.packed[name] = data[offset:end]
+            offset = end
+    
+    def __len__(self):
+        """Learners with anything saved or scheduled"""
+        return len(self.learners.keys() | self.packed.keys())
+    
+    def learner(self, name):
+        """A learner's LearnerReviews (new and empty for a new name)"""
+        reviews = self.learners.get(name)
+        if reviews is None:
+            reviews = self.learners[name] = LearnerReviews(self.clock)
+            block = self.packed.pop(name, None)
+            if block is not None:
+                offset = LEARNER.size + LEARNER.unpack_from(block)[0]
+                while offset < len(block):
+                    code, size = QUEUE.unpack_from(block, offset)[:2]
+                    queue, offset = ReviewQueue.unpack(block, offset)
+                    difficulty = DIFFICULTIES[code] if code < len(DIFFICULTIES) else None
+                    if difficulty is not None and len(fact_table(difficulty)) == size:
+                        # (Dropped if the mode's facts have changed since)
+                        reviews.queues[difficulty] = queue
+        return reviews
+    
+    def save(self):
+        """Write everything to a temporary file, then swap it in"""
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION))
+            file.writelines(self.packed.values())
+            for name, reviews in self.learners.items():
+                queues = b''.join(queue.pack(DIFFICULTIES.index(difficulty))
+                                  for difficulty, queue in reviews.queues.items() if len(queue))
+                if queues:
+                    name_bytes = name.encode('utf-8')
+                    file.write(LEARNER.pack(len(name_bytes), len(queues)))
+                    file.write(name_bytes)
+                    file.write(queues)
+        os.replace(temp_path, self.path)
\ No newline at end of file
@@ -1,116 +1,278 @@
+import time
+# Taken before the other imports so --profile-startup can time them
+IMPORT_STARTED = time.perf_counter()
+
+import sys
 import tkinter as tk
 from tkinter import font
-import random
 from pathlib import Path
+import queue
+import threading
+
+from background import PLACEHOLDER_COLOR, build_background, cached_background
+from joke_index import load_or_build
+from joke_layout import JokeLayout
+from joke_pack import PackedJokeStore, pack_path_for
+from joke_store import JokeStore, MappedJokeStore, ShuffleBag
+import instrument
+
+# Backup jokes used if randomJokes.txt cannot be read
+FALLBACK_JOKES = [
+    ("Why did the chicken cross the road?", "To get to the other side."),
+    ("What happens if you boil a clown?", "You get a laughing stock."),
+    ("Why did the car get a flat tire?", "Because there was a fork in the road!")
+]
+
+# How often (ms) the UI checks for jokes from the loading thread
+LOAD_POLL_MS = 20
+
+# How often (ms) randomJokes.txt is checked for new jokes
+WATCH_POLL_MS = 1000
+
+# Width (pixels) the setup and punchline are broken into lines at
+JOKE_WIDTH = 600
+
+# Methods timed when metrics are switched on (see instrument.py)
+HOT_METHODS = ('tell_joke', 'search_joke', 'show_punchline', 'next_joke',
+               'load_background', 'show_background', 'poll_loader')
+
+IMPORT_SECONDS = time.perf_counter() - IMPORT_STARTED
 
 # Main class for the Alexa Joke Teller application
 class AlexaJokeApp:
-    def __init__(self, root):
+    def __init__(self, root, jokes_path=None):
+        # Remember when startup began (for time-to-first-paint/first-joke)
+        self.startup_began = time.perf_counter()
+        self.startup_times = {}
+        
         # Initialize the main window
         self.root = root
         self.root.title("Alexa Joke Teller")
         self.root.geometry("800x600")
         self.root.resizable(False, False)
         
-        # Load all jokes from the text file
-        self.jokes = self.load_jokes()
+        # Jokes are indexed on a worker thread and handed over through this queue
+        self.load_queue = queue.Queue()
+        self.loading = False
+        
+        # Start loading the jokes from the text file (finishes in the background)
+        self.jokes = self.load_jokes(jokes_path)
+        
+        # Deals out every joke once before any joke repeats
+        self.joke_bag = ShuffleBag(len(self.jokes))
+        
+        # Word search index - loaded or built once all the jokes are in
+        self.joke_index = None
+        self.indexing = False
+        
+        # Changes to the jokes file are watched for once loading is done
+        self.watching = False
+        self.reloading = False
+        
+        # Set by main() when metrics are switched on
+        self.metrics = None
         
         # Variables to store current joke details
         self.current_joke = None
         self.setup_text = ""
         self.punchline_text = ""
         
+        # Fonts are made once here - setup_ui reuses them
+        self.title_font = font.Font(family="Arial", size=24, weight="bold")
+        self.joke_font = font.Font(family="Arial", size=14)
+        self.button_font = font.Font(family="Arial", size=11, weight="bold")
+        
+        # Each joke is broken into lines once and kept by joke id
+        self.layout = JokeLayout(self.joke_font.measure, JOKE_WIDTH)
+        
         # Create the user interface
         self.setup_ui()
         
-    def load_jokes(self):
-        """Load jokes from the randomJokes.txt file"""
-        jokes = []
+        # Note when the window first gets drawn, and start taking in jokes
+        self.root.after_idle(self.mark_startup, 'first_paint')
+        if len(self.jokes):
+            self.mark_startup('first_joke')
+        self.poll_loader()
+    
+    def load_jokes(self, jokes_path=None):
+        """Load jokes from the randomJokes.txt file into a joke store"""
         try:
-            # Import os module to work with file paths
-            import os
-            
-            # Get the folder where this script is running from
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            
-            # Build the path to randomJokes.txt in the same folder
-            jokes_path = os.path.join(script_dir, "randomJokes.txt")
-            
-            # Print debug info to help with troubleshooting
-            print(f"Looking for jokes file at: {jokes_path}")
-            print(f"File exists: {os.path.exists(jokes_path)}")
-            
-            # Open and read the jokes file
-            with open(jokes_path, 'r', encoding='utf-8') as file:
-                file_content = file.read()
+            # randomJokes.txt sits in the same folder as this script (unless given one)
+            if jokes_path is None:
+                jokes_path = Path(__file__).with_name("randomJokes.txt")
             
-            # Split the file into individual lines (each line is one joke)
-            lines = file_content.strip().split('\n')
+            # A compiled joke pack (python joke_pack.py) is ready at once -
+            # use it if it was built from the current jokes file
+            jokes = PackedJokeStore.load(pack_path_for(jokes_path), jokes_path)
+            if jokes is not None:
+                return jokes
             
-            # Parse each joke - setup and punchline are separated by '?'
-            for line in lines:
-                if '?' in line:
-                    parts = line.split('?', 1)  # Split only at first '?'
-                    setup = parts[0].strip() + '?'  # The question part
-                    punchline = parts[1].strip()  # The answer part
-                    jokes.append((setup, punchline))  # Add to jokes list
-            
-            print(f"Successfully loaded {len(jokes)} jokes!")
-                    
+            # Otherwise memory-map the jokes file - the position of each line is worked
+            # out on a worker thread, and each joke is only split into setup
+            # and punchline (at the first '?') when it is drawn
+            jokes = MappedJokeStore(jokes_path, index=False)
+            self.loading = True
+            worker = threading.Thread(target=self.index_jokes, args=(jokes,), daemon=True)
+            worker.start()
+        
         except Exception as e:
             # If file not found or error occurs, use backup jokes
             print(f"Error loading jokes: {e}")
-            jokes = [
-                ("Why did the chicken cross the road?", "To get to the other side."),
-                ("What happens if you boil a clown?", "You get a laughing stock."),
-                ("Why did the car get a flat tire?", "Because there was a fork in the road!")
-            ]
+            jokes = JokeStore(FALLBACK_JOKES)
         
         return jokes
     
-    def setup_ui(self):
-        """Set up all the visual elements of the GUI"""
+    def index_jokes(self, jokes):
+        """Worker thread: scan the jokes file and queue each batch of lines"""
+        try:
+            # A small first batch means the first joke is ready almost at once
+            for starts, ends in jokes.scan_batches(first_chunk=1 << 16):
+                self.load_queue.put(('batch', starts, ends))
+            self.load_queue.put(('done', None, None))
+        except Exception as e:
+            self.load_queue.put(('error', e, None))
+    
+    def poll_loader(self):
+        """Main thread: move any loaded jokes from the queue into the store"""
+        added = False
+        try:
+            while True:
+                kind, first, second = self.load_queue.get_nowait()
+                if kind == 'batch':
+                    self.jokes.add_lines(first, second)
+                    added = True
+                elif kind == 'done':
+                    self.loading = False
+                    if not len(self.jokes):
+                        # An empty file - say so instead of "Loading jokes..." for ever
+                        self.setup_label.config(text="No jokes available!")
+                elif kind == 'index':
+                    # Search index is ready - searching can start
+                    self.joke_index = first
+                    self.indexing = False
+                    self.search_button.config(state=tk.NORMAL)
+                elif kind == 'index_error':
+                    # Telling random jokes still works without search
+                    print(f"Error building search index: {first}")
+                    self.indexing = False
+                elif kind == 'reloaded':
+                    # The file was rewritten - switch to the new jokes in one go
+                    old_jokes, old_index = self.jokes, self.joke_index
+                    self.jokes, self.joke_index = first, second
+                    self.joke_bag.reset(len(self.jokes))
+                    self.layout.clear()
+                    self.reloading = False
+                    self.search_button.config(state=tk.NORMAL)
+                    old_jokes.close()
+                    if old_index is not None:
+                        old_index.close()
+                    added = True
+                elif kind == 'reload_error':
+                    # Keep the jokes we already have and try again on the next change
+                    print(f"Error reloading jokes: {first}")
+                    self.reloading = False
+                else:
+                    # Reading failed part way - fall back to the backup jokes
+                    print(f"Error loading jokes: {first}")
+                    self.loading = False
+                    self.jokes = JokeStore(FALLBACK_JOKES)
+                    self.joke_bag.reset(len(self.jokes))
+                    self.layout.clear()
+                    added = True
+        except queue.Empty:
+            pass
+        
+        if added:
+            # (Jokes that arrive mid-round join it - see ShuffleBag)
+            self.joke_bag.resize(len(self.jokes))
+            self.jokes_ready()
+        
+        # Once every joke is in, get the search index ready in the background
+        if not self.loading and self.joke_index is None and not self.indexing:
+            self.start_indexing()
         
-        # Try to load and display the background image
+        if self.loading or self.indexing or self.reloading:
+            self.root.after(LOAD_POLL_MS, self.poll_loader)
+        elif not self.watching and not isinstance(self.jokes, JokeStore):
+            # All loaded - from now on pick up changes to the file
+            self.watching = True
+            self.root.after(WATCH_POLL_MS, self.watch_jokes_file)
+    
+    def jokes_ready(self):
+        """Let the user ask for a joke as soon as there is one"""
+        if len(self.jokes) and self.current_joke is None:
+            self.joke_button.config(state=tk.NORMAL)
+            self.setup_label.config(text="Click 'Alexa tell me a Joke' to start!")
+            self.mark_startup('first_joke')
+    
+    def start_indexing(self):
+        """Load the saved search index (or build it) on a worker thread"""
+        self.indexing = True
+        # (The backup jokes are not in a file, so their index is never saved)
+        jokes_path = None if isinstance(self.jokes, JokeStore) else self.jokes.path
+        worker = threading.Thread(target=self.index_words, args=(self.jokes, jokes_path), daemon=True)
+        worker.start()
+    
+    def index_words(self, jokes, jokes_path):
+        """Worker thread: reuse the index saved next to the jokes file if it is
+        still up to date, otherwise build it and save it for next time"""
         try:
-            from PIL import Image, ImageTk
-            import os
-            
-            # Get the current script directory
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            bg_path = os.path.join(script_dir, "bgimage.png")
-            
-            print(f"Looking for background image at: {bg_path}")
-            print(f"File exists: {os.path.exists(bg_path)}")
-            
-            # If background image exists, load and resize it
-            if os.path.exists(bg_path):
-                bg_image = Image.open(bg_path)
-                bg_image = bg_image.resize((800, 600), Image.Resampling.LANCZOS)
-                self.bg_photo = ImageTk.PhotoImage(bg_image)
-                
-                # Create label to hold the background image
-                bg_label = tk.Label(self.root, image=self.bg_photo)
-                bg_label.place(x=0, y=0, relwidth=1, relheight=1)
-                print("Background image loaded successfully!")
-            else:
-                # If no image found, use solid dark blue background
-                print("Background image not found, using solid color")
-                self.root.configure(bg='#1a1a2e')
-                
-        except ImportError as e:
-            # If Pillow library not installed, use solid color
-            print(f"PIL/Pillow not installed: {e}")
-            print("Install with: pip install Pillow")
-            self.root.configure(bg='#1a1a2e')
+            self.load_queue.put(('index', load_or_build(jokes, jokes_path), None))
         except Exception as e:
-            print(f"Error loading background: {e}")
-            self.root.configure(bg='#1a1a2e')
+            self.load_queue.put(('index_error', e, None))
+    
+    def watch_jokes_file(self):
+        """Check every WATCH_POLL_MS whether randomJokes.txt has changed"""
+        if not self.reloading:
+            change = self.jokes.changed()
+            if change == 'grown':
+                # Only the appended bytes are read - cheap enough to do right here
+                first_new = self.jokes.grow()
+                # The old last line is read again if it had no newline, so
+                # its joke may have more text now than its cached layout
+                self.layout.forget_from(first_new)
+                if self.joke_index is not None:
+                    self.joke_index.add(self.jokes.texts(first_new), len(self.jokes))
+                self.joke_bag.resize(len(self.jokes))
+                # (The file may have been empty until now)
+                self.jokes_ready()
+            elif change == 'rewritten':
+                # Build a whole new store and index on a worker thread, then
+                # swap both in at once (see poll_loader)
+                self.reloading = True
+                worker = threading.Thread(target=self.reload_jokes, args=(self.jokes.path,), daemon=True)
+                worker.start()
+                self.poll_loader()
+        self.root.after(WATCH_POLL_MS, self.watch_jokes_file)
+    
+    def reload_jokes(self, jokes_path):
+        """Worker thread: index a rewritten jokes file (or its rebuilt pack) from scratch"""
+        try:
+            jokes = PackedJokeStore.load(pack_path_for(jokes_path), jokes_path)
+            if jokes is None:
+                jokes = MappedJokeStore(jokes_path)
+            self.load_queue.put(('reloaded', jokes, load_or_build(jokes, jokes_path)))
+        except Exception as e:
+            self.load_queue.put(('reload_error', e, None))
+    
+    def mark_startup(self, name):
+        """Record how long after startup something happened (first time only)"""
+        if name not in self.startup_times:
+            self.startup_times[name] = time.perf_counter() - self.startup_began
+    
+    def setup_ui(self):
+        """Set up all the visual elements of the GUI"""
+        
+        # Solid dark blue background straight away - the picture is put
+        # into this label once it is ready (created first so it stays behind)
+        self.root.configure(bg=PLACEHOLDER_COLOR)
+        self.bg_photo = None
+        self.bg_label = tk.Label(self.root, bg=PLACEHOLDER_COLOR, bd=0)
+        self.bg_label.place(x=0, y=0, relwidth=1, relheight=1)
+        self.load_background()
         
-        # Create custom fonts for different text elements
-        title_font = font.Font(family="Arial", size=24, weight="bold")
-        joke_font = font.Font(family="Arial", size=14)
-        button_font = font.Font(family="Arial", size=11, weight="bold")
+        # Custom fonts for different text elements (made in __init__)
+        title_font, joke_font, button_font = self.title_font, self.joke_font, self.button_font
         
         # Main container frame - holds all elements with dark background
         main_frame = tk.Frame(self.root, bg='#0f0f1e', bd=2, relief=tk.RAISED)
@@ -123,23 +285,57 @@ class AlexaJokeApp:
             font=title_font,
             bg='#0f0f1e',
             fg='#6c63ff',
-            pady=20
+            pady=10
         )
         title_label.pack()
         
+        # Search row - ask for a joke about a topic (e.g. chicken, or pizz* for a prefix)
+        search_frame = tk.Frame(main_frame, bg='#0f0f1e')
+        search_frame.pack()
+        
+        self.search_var = tk.StringVar()
+        self.search_entry = tk.Entry(
+            search_frame,
+            textvariable=self.search_var,
+            font=joke_font,
+            width=30,
+            bg='#1a1a2e',
+            fg='#ffffff',
+            insertbackground='#ffffff',
+            relief=tk.FLAT
+        )
+        self.search_entry.grid(row=0, column=0, padx=5, ipady=4)
+        self.search_entry.bind('<Return>', lambda event: self.search_joke())
+        
+        # Enabled once the search index is ready
+        self.search_button = tk.Button(
+            search_frame,
+            text="🔍 Joke about...",
+            command=self.search_joke,
+            font=button_font,
+            bg='#6c63ff',
+            fg='white',
+            activebackground='#5848cc',
+            activeforeground='white',
+            bd=0,
+            relief=tk.FLAT,
+            cursor='hand2',
+            state=tk.DISABLED
+        )
+        self.search_button.grid(row=0, column=1, padx=5)
+        
         # Frame to display the jokes
         joke_frame = tk.Frame(main_frame, bg='#1a1a2e', bd=2, relief=tk.SUNKEN)
-        joke_frame.pack(pady=20, padx=30, fill=tk.BOTH, expand=True)
+        joke_frame.pack(pady=10, padx=30, fill=tk.BOTH, expand=True)
         
         # Label to show the joke setup (question)
         self.setup_label = tk.Label(
             joke_frame,
-            text="Click 'Alexa tell me a Joke' to start!",
+            text="Click 'Alexa tell me a Joke' to start!" if len(self.jokes) else "Loading jokes...",
             font=joke_font,
             bg='#1a1a2e',
             fg='#ffffff',
-            wraplength=600,
-            justify=tk.CENTER,
+            justify=tk.CENTER,  # No wraplength - joke text comes already broken into lines
             pady=20
         )
         self.setup_label.pack(pady=(30, 10))
@@ -151,7 +347,6 @@ class AlexaJokeApp:
             font=joke_font,
             bg='#1a1a2e',
             fg='#00ff88',
-            wraplength=600,
             justify=tk.CENTER,
             pady=10
         )
@@ -180,6 +375,7 @@ class AlexaJokeApp:
             fg='white',
             activebackground='#5848cc',
             activeforeground='white',
+            state=tk.NORMAL if len(self.jokes) else tk.DISABLED,  # Disabled until jokes load
             **button_config
         )
         self.joke_button.grid(row=0, column=0, padx=5, pady=5)
@@ -224,44 +420,146 @@ class AlexaJokeApp:
             **button_config
         )
         self.quit_button.grid(row=1, column=1, padx=5, pady=5)
+    
+    def load_background(self):
+        """Show the background image, scaling it on a worker thread if needed"""
+        bg_path = Path(__file__).with_name("bgimage.png")
+        
+        # If no image found, keep the solid colour
+        if not bg_path.exists():
+            return
         
+        # Cache hit: Tk reads the already scaled copy itself (no Pillow needed)
+        cached = cached_background(bg_path)
+        if cached is not None:
+            self.show_background(cached)
+            return
+        
+        # Cache miss: decode and resize away from the UI thread
+        self.bg_queue = queue.Queue()
+        worker = threading.Thread(target=self.scale_background, args=(bg_path,), daemon=True)
+        worker.start()
+        self.poll_background()
+    
+    def scale_background(self, bg_path):
+        """Worker thread: build the scaled background and hand it back"""
+        try:
+            self.bg_queue.put(('done', build_background(bg_path)))
+        except Exception as e:
+            self.bg_queue.put(('error', e))
+    
+    def poll_background(self):
+        """Main thread: wait for the worker, then swap in the image"""
+        try:
+            kind, result = self.bg_queue.get_nowait()
+        except queue.Empty:
+            self.root.after(LOAD_POLL_MS, self.poll_background)
+            return
+        
+        if kind == 'done':
+            self.show_background(result)
+        elif isinstance(result, ImportError):
+            # If Pillow library not installed, keep the solid colour
+            print(f"PIL/Pillow not installed: {result}")
+            print("Install with: pip install Pillow")
+        else:
+            print(f"Error loading background: {result}")
+    
+    def show_background(self, image):
+        """Put a cached image file (or a scaled PIL image) behind the widgets"""
+        try:
+            if isinstance(image, str):
+                self.bg_photo = tk.PhotoImage(file=image)
+            else:
+                # The cache could not be written, so Pillow has to convert it
+                from PIL import ImageTk
+                self.bg_photo = ImageTk.PhotoImage(image)
+        except tk.TclError as e:
+            # A damaged cache file - remove it so the next start rebuilds it
+            print(f"Error loading background: {e}")
+            Path(image).unlink(missing_ok=True)
+            return
+        self.bg_label.config(image=self.bg_photo)
+    
     def tell_joke(self):
         """Display a random joke setup when button is clicked"""
         
-        # Check if jokes list is empty
-        if not self.jokes:
+        # Check if the joke store is empty
+        if not len(self.jokes):
             self.setup_label.config(text="No jokes available!")
             return
         
-        # Pick a random joke from the list
-        self.current_joke = random.choice(self.jokes)
-        self.setup_text = self.current_joke[0]  # The setup (question)
-        self.punchline_text = self.current_joke[1]  # The punchline (answer)
+        # Draw the next joke id from the shuffle bag (no repeats until all are told),
+        # skipping any line in the file that turns out not to be a joke
+        joke = None
+        for _ in range(len(self.jokes)):
+            self.current_joke = self.joke_bag.next()
+            joke = self.jokes.get(self.current_joke)
+            if joke is not None:
+                break
+        if joke is None:
+            self.setup_label.config(text="No jokes available!")
+            return
+        self.show_joke(joke)
+    
+    def search_joke(self):
+        """Display a random joke containing the words in the search box"""
+        query = self.search_var.get().strip()
+        if not query:
+            self.setup_label.config(text="Type a topic first, e.g. chicken or pizz*")
+            return
+        if self.joke_index is None:
+            return
+        
+        joke_id = self.joke_index.random_match(query)
+        joke = None if joke_id is None else self.jokes.get(joke_id)
+        if joke is None:
+            if self.metrics is not None:
+                self.metrics.count('search_miss')
+            self.next_joke()  # Back to the ready state
+            self.setup_label.config(text=self.layout.wrap(f"No jokes about '{query}' - try another word!"))
+            return
+        self.current_joke = joke_id
+        self.show_joke(joke)
+    
+    def show_joke(self, joke):
+        """Show the setup of a (setup, punchline) joke and wait for the punchline"""
+        self.setup_text, self.punchline_text = joke
         
         # Display the setup in the label
-        self.setup_label.config(text=self.setup_text)
+        self.setup_label.config(text=self.layout.get((self.current_joke, 'setup'), self.setup_text))
         self.punchline_label.config(text="")  # Clear punchline
         
+        # Lay the punchline out while the setup is being read
+        self.root.after_idle(self.prepare_punchline, self.current_joke)
+        
         # Update button states
         self.punchline_button.config(state=tk.NORMAL)  # Enable show punchline
         self.joke_button.config(state=tk.DISABLED)  # Disable tell joke
         self.next_button.config(state=tk.DISABLED)  # Disable next joke
-        
+    
+    def prepare_punchline(self, joke_id):
+        """Break the punchline into lines before it is asked for"""
+        if joke_id == self.current_joke:
+            self.layout.get((joke_id, 'punchline'), self.punchline_text)
+    
     def show_punchline(self):
         """Display the punchline when button is clicked"""
         
-        # Show the answer to the joke
-        self.punchline_label.config(text=self.punchline_text)
+        # Show the answer to the joke (normally laid out already by prepare_punchline)
+        self.punchline_label.config(text=self.layout.get((self.current_joke, 'punchline'),
+                                                         self.punchline_text))
         
         # Update button states
         self.punchline_button.config(state=tk.DISABLED)  # Disable punchline
         self.next_button.config(state=tk.NORMAL)  # Enable next joke
-        
+    
     def next_joke(self):
         """Reset the display to get ready for next joke"""
         
-        # Clear the joke display
-        self.setup_label.config(text="Ready for another joke!")
+        # Clear the joke display and say how many jokes are left this round
+        left = self.joke_bag.remaining() or len(self.jokes)
+        self.setup_label.config(text=f"Ready for another joke! ({left} of {len(self.jokes)} left)")
         self.punchline_label.config(text="")
         
         # Reset button states
@@ -269,11 +567,60 @@ class AlexaJokeApp:
         self.punchline_button.config(state=tk.DISABLED)  # Disable punchline
         self.next_button.config(state=tk.DISABLED)  # Disable next joke
 
+def profile_method(cls, name, timings):
+    """Wrap cls.name so the time spent in it is added to timings[name]"""
+    original = getattr(cls, name)
+    
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+    
+    setattr(cls, name, timed)
+
+
+def report_startup(root, app, timings):
+    """Print the startup profile once the main loop first goes idle"""
+    def report():
+        timings['first mainloop idle'] = time.perf_counter() - IMPORT_STARTED
+        print("Startup profile (ms):")
+        print(f"  {'imports':<22}{IMPORT_SECONDS * 1000:8.1f}")
+        for name, seconds in timings.items():
+            print(f"  {name:<22}{seconds * 1000:8.1f}")
+        for name, seconds in app.startup_times.items():
+            print(f"  {name + ' (app)':<22}{seconds * 1000:8.1f}")
+        print(f"  {len(app.jokes)} jokes indexed so far")
+    
+    root.after_idle(report)
+
+
 # Main function to run the program
 def main():
+    # --profile-startup prints where startup time goes (off by default)
+    profile = '--profile-startup' in sys.argv[1:]
+    timings = {}
+    if profile:
+        for name in ('load_jokes', 'setup_ui'):
+            profile_method(AlexaJokeApp, name, timings)
+    # --metrics-jsonl PATH / --metrics-port PORT export runtime metrics (off by default)
+    metrics = instrument.from_args('alexa_jokes', sys.argv[1:])
+    if metrics is not None:
+        metrics.wrap_methods(AlexaJokeApp, HOT_METHODS)
+    
+    start = time.perf_counter()
     root = tk.Tk()  # Create main window
+    timings['tk.Tk()'] = time.perf_counter() - start
     app = AlexaJokeApp(root)  # Create application instance
+    if profile:
+        report_startup(root, app, timings)
+    if metrics is not None:
+        app.metrics = metrics
+        metrics.start(root)
     root.mainloop()  # Start the GUI event loop
+    if metrics is not None:
+        metrics.stop()
 
 # Run the program when script is executed
 if __name__ == "__main__":
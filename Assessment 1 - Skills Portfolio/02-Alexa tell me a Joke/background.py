@@ -0,0 +1,75 @@
+"""
+Background image cache for the Alexa Joke Teller
+
+Decoding the full-size bgimage.png and resizing it with LANCZOS is the
+slowest part of startup, so the scaled result is saved once as a PPM
+file in a cache folder. Tk reads PPM by itself, so a cache hit needs
+neither Pillow nor any resampling. The cache file name holds the source
+file's size and mtime and the target size - when any of them change the
+old name simply stops matching and the image is rebuilt.
+"""
+
+import os
+
+# Size the background is scaled to (the window size)
+BG_SIZE = (800, 600)
+
+# Shown until the background image is ready (and if it cannot be loaded)
+PLACEHOLDER_COLOR = '#1a1a2e'
+
+# Folder (next to this file) that holds the scaled images
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.bgcache')
+
+
+def cache_path_for(source, size=BG_SIZE, cache_dir=CACHE_DIR):
+    """Path of the cached scaled copy of source (it may not exist yet)"""
+    stat = os.stat(source)
+    stem = os.path.splitext(os.path.basename(source))[0]
+    width, height = size
+    name = f"{stem}-{width}x{height}-{stat.st_size}-{stat.st_mtime_ns}.ppm"
+    return os.path.join(cache_dir, name)
+
+
+def cached_background(source, size=BG_SIZE, cache_dir=CACHE_DIR):
+    """Return the cache path if a scaled copy is ready, else None"""
+    path = cache_path_for(source, size, cache_dir)
+    return path if os.path.exists(path) else None
+
+
+def build_background(source, size=BG_SIZE, cache_dir=CACHE_DIR):
+    """Decode and scale source, then save it to the cache
+    
+    Slow, so it is meant to run on a worker thread. Pillow is only
+    imported here. Returns the cache path, or the scaled PIL image if
+    the cache folder cannot be written.
+    """
+    from PIL import Image
+    
+    path = cache_path_for(source, size, cache_dir)
+    with Image.open(source) as image:
+        scaled = image.convert('RGB').resize(size, Image.Resampling.LANCZOS)
+    
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write to a temporary name first so a half-written file is never used
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        scaled.save(temp_path, 'PPM')
+        os.replace(temp_path, path)
+    except OSError:
+        return scaled
+    
+    remove_stale(path)
+    return path
+
+
+def remove_stale(current_path):
+    """Delete older cached copies of the same image and size"""
+    folder, name = os.path.split(current_path)
+    # Everything up to the size and mtime part of the name
+    prefix = name.rsplit('-', 2)[0] + '-'
+    for other in os.listdir(folder):
+        if other.startswith(prefix) and other != name:
+            try:
+                os.remove(os.path.join(folder, other))
+            except OSError:
+                pass
\ No newline at end of file
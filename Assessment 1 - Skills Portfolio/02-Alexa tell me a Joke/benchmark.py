@@ -0,0 +1,312 @@
+"""
+Benchmarks for the Alexa Joke Teller
+
+Run from this folder, e.g.
+    python benchmark.py startup --size-mb 1024
+    python benchmark.py gui --size-mb 0
+    python benchmark.py background
+    python benchmark.py search --size-mb 64
+    python benchmark.py layout
+"""
+
+import argparse
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from background import BG_SIZE, build_background, cached_background
+from joke_index import JokeIndex, index_path_for
+from joke_pack import PackedJokeStore, pack_path_for
+from joke_store import MappedJokeStore
+
+SETUPS = ["Why did the {} cross the road?", "What do you call a {} with no eyes?",
+          "How does a {} keep cool?", "Why was the {} so tired?"]
+PUNCHLINES = ["To get to the other {}.", "A {} with no idea.",
+              "It sits next to a {} fan.", "It had a {} day."]
+WORDS = ["chicken", "pizza", "clown", "robot", "penguin", "teacher", "atom",
+         "cow", "banana", "skeleton", "computer", "dinosaur"]
+
+
+def generate_corpus(path, size_mb, seed=1):
+    """Write a randomJokes.txt style file of about size_mb megabytes"""
+    rng = random.Random(seed)
+    # Build a block of jokes once and repeat it - content barely matters here
+    lines = []
+    for i in range(20_000):
+        setup = rng.choice(SETUPS).format(rng.choice(WORDS))
+        punchline = rng.choice(PUNCHLINES).format(rng.choice(WORDS))
+        lines.append(f"{setup}{punchline} #{i}\n")
+    block = "".join(lines).encode('utf-8')
+    
+    target = size_mb * 1024 * 1024
+    with open(path, 'wb') as file:
+        written = 0
+        while written < target:
+            file.write(block)
+            written += len(block)
+
+
+def load_eager(path):
+    """The original load_jokes: read everything and split every line"""
+    jokes = []
+    with open(path, 'r', encoding='utf-8') as file:
+        file_content = file.read()
+    for line in file_content.strip().split('\n'):
+        if '?' in line:
+            parts = line.split('?', 1)
+            jokes.append((parts[0].strip() + '?', parts[1].strip()))
+    return jokes
+
+
+def load_pack(path):
+    """Open the joke pack compiled from path"""
+    return PackedJokeStore.load(pack_path_for(path), path)
+
+
+LOADERS = {
+    'eager': load_eager,
+    'mapped': MappedJokeStore,
+    'pack': load_pack
+}
+
+
+def measure_load(loader, path, draws=10_000):
+    """Child process: load once, then draw random jokes; print seconds,
+    peak RSS in MB, joke count and seconds per draw"""
+    start = time.perf_counter()
+    jokes = LOADERS[loader](path)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is in kilobytes on Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    
+    ids = [random.randrange(len(jokes)) for _ in range(draws)]
+    start = time.perf_counter()
+    for joke_id in ids:
+        jokes[joke_id]
+    per_draw = (time.perf_counter() - start) / draws
+    print(f"{elapsed} {peak_mb} {len(jokes)} {per_draw}")
+
+
+def bench_startup(size_mb, loaders):
+    """Compare loaders on a generated corpus, each in a fresh process"""
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, "randomJokes.txt")
+    print(f"generating {size_mb} MB corpus...")
+    generate_corpus(path, size_mb)
+    if 'pack' in loaders:
+        # Compiled with the CLI in its own process, so its memory use is not
+        # inherited by the processes measured below
+        start = time.perf_counter()
+        subprocess.run([sys.executable, 'joke_pack.py', path], check=True, capture_output=True,
+                       cwd=os.path.dirname(os.path.abspath(__file__)))
+        print(f"compiled joke pack in {time.perf_counter() - start:.2f} s")
+    
+    try:
+        for loader in loaders:
+            child = subprocess.run(
+                [sys.executable, __file__, '_load', loader, path],
+                capture_output=True, text=True
+            )
+            if child.returncode != 0:
+                # Usually the eager loader running out of memory
+                print(f"{loader:>7}: failed (exit code {child.returncode})")
+                continue
+            output = child.stdout.split()
+            elapsed, peak_mb, count = float(output[0]), float(output[1]), int(output[2])
+            per_draw = float(output[3])
+            print(f"{loader:>7}: {elapsed * 1000:9.2f} ms startup, {peak_mb:8.1f} MB peak RSS, "
+                  f"{count:,} jokes, {per_draw * 1e6:5.2f} us/draw")
+    finally:
+        for name in os.listdir(folder):
+            os.remove(os.path.join(folder, name))
+        os.rmdir(folder)
+
+
+def measure_background(mode, cache_dir):
+    """Child process: get the scaled background once, print seconds"""
+    start = time.perf_counter()
+    source = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bgimage.png")
+    if mode == 'original':
+        # What setup_ui used to do on every launch
+        from PIL import Image
+        image = Image.open(source)
+        image.resize(BG_SIZE, Image.Resampling.LANCZOS)
+    elif mode == 'miss':
+        build_background(source, cache_dir=cache_dir)
+    else:
+        # Cache hit: the lookup plus reading the file Tk would load
+        with open(cached_background(source, cache_dir=cache_dir), 'rb') as file:
+            file.read()
+    print(time.perf_counter() - start)
+
+
+def bench_background(repeat=5):
+    """Original decode+resize against a cold and a warm cache, fresh processes"""
+    cache_dir = tempfile.mkdtemp()
+    try:
+        for mode in ('original', 'miss', 'hit'):
+            times = []
+            for _ in range(repeat):
+                if mode == 'miss':
+                    for name in os.listdir(cache_dir):
+                        os.remove(os.path.join(cache_dir, name))
+                child = subprocess.run(
+                    [sys.executable, __file__, '_background', mode, cache_dir],
+                    capture_output=True, text=True, check=True
+                )
+                times.append(float(child.stdout))
+            print(f"{mode:>8}: {min(times) * 1000:8.1f} ms (best of {repeat})")
+    finally:
+        for name in os.listdir(cache_dir):
+            os.remove(os.path.join(cache_dir, name))
+        os.rmdir(cache_dir)
+
+
+def bench_search(size_mb, queries=('chicken', 'pizz*', 'robot road', 'dino* cool', 'zebra')):
+    """Build, save and load the joke index, then time random matches"""
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, "randomJokes.txt")
+    index_path = index_path_for(path)
+    generate_corpus(path, size_mb)
+    store = MappedJokeStore(path)
+    print(f"{len(store):,} jokes ({size_mb} MB)")
+    
+    try:
+        start = time.perf_counter()
+        index = JokeIndex.build(store.texts(), len(store))
+        print(f"  build: {time.perf_counter() - start:7.2f} s, {len(index.terms):,} words, "
+              f"{len(index.postings):,} postings")
+        start = time.perf_counter()
+        index.save(index_path, path)
+        print(f"   save: {time.perf_counter() - start:7.2f} s, "
+              f"{os.path.getsize(index_path) / 1024 / 1024:.1f} MB")
+        start = time.perf_counter()
+        index = JokeIndex.load(index_path, path)
+        print(f"   load: {(time.perf_counter() - start) * 1000:7.2f} ms")
+        
+        rng = random.Random(1)
+        for query in queries:
+            repeats = 10_000
+            start = time.perf_counter()
+            for _ in range(repeats):
+                joke_id = index.random_match(query, rng)
+            elapsed = (time.perf_counter() - start) / repeats
+            found = "no match" if joke_id is None else store.get(joke_id)[0]
+            print(f"  {query!r:>14}: {elapsed * 1e6:8.1f} us per random match  ({found})")
+        index.close()
+    finally:
+        store.close()
+        for name in os.listdir(folder):
+            os.remove(os.path.join(folder, name))
+        os.rmdir(folder)
+
+
+def bench_gui_startup(size_mb):
+    """Time to first paint and to first joke for the real window
+    
+    Needs a display. size_mb=0 uses the bundled randomJokes.txt.
+    """
+    import tkinter as tk
+    from Index import AlexaJokeApp
+    
+    path = None
+    if size_mb:
+        path = os.path.join(tempfile.mkdtemp(), "randomJokes.txt")
+        generate_corpus(path, size_mb)
+    
+    root = tk.Tk()
+    app = AlexaJokeApp(root, jokes_path=path)
+    
+    def check_done():
+        # Stop once both moments have been recorded
+        if {'first_paint', 'first_joke'} <= set(app.startup_times):
+            root.quit()
+        else:
+            root.after(5, check_done)
+    
+    root.after(5, check_done)
+    root.mainloop()
+    root.destroy()
+    for name in ('first_paint', 'first_joke'):
+        print(f"{name:>12}: {app.startup_times[name] * 1000:8.1f} ms")
+    if path:
+        os.remove(path)
+
+
+def bench_layout(jokes=500, words=60, repeat=3):
+    """Punchline reveal with Tk wrapping the text versus pre-broken lines
+    
+    Needs a display. Every joke is `words` words long, so it runs over
+    several lines.
+    """
+    import tkinter as tk
+    from tkinter import font
+    from Index import JOKE_WIDTH
+    from joke_layout import JokeLayout
+    
+    rng = random.Random(4)
+    texts = [' '.join(rng.choice(WORDS + ["and", "the", "with", "because"]) for _ in range(words))
+             for _ in range(jokes)]
+    root = tk.Tk()
+    joke_font = font.Font(family="Arial", size=14)
+    wrapped_label = tk.Label(root, font=joke_font, wraplength=JOKE_WIDTH, justify=tk.CENTER)
+    plain_label = tk.Label(root, font=joke_font, justify=tk.CENTER)
+    wrapped_label.pack()
+    plain_label.pack()
+    layout = JokeLayout(joke_font.measure, JOKE_WIDTH, cache_size=jokes)
+    
+    def per_joke_ms(fn):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for joke_id, text in enumerate(texts):
+                fn(joke_id, text)
+                root.update_idletasks()
+            best = min(best, time.perf_counter() - start)
+        return best / len(texts) * 1000
+    
+    start = time.perf_counter()
+    for joke_id, text in enumerate(texts):
+        layout.get(joke_id, text)
+    prepare_ms = (time.perf_counter() - start) / len(texts) * 1000
+    
+    tk_ms = per_joke_ms(lambda joke_id, text: wrapped_label.config(text=text))
+    cached_ms = per_joke_ms(lambda joke_id, text: plain_label.config(text=layout.get(joke_id, text)))
+    root.destroy()
+    print(f"{words} words per joke, {len(layout.word_widths)} distinct words")
+    print(f"   Tk wrapping on reveal: {tk_ms:7.3f} ms/joke")
+    print(f"cached layout on reveal: {cached_ms:7.3f} ms/joke")
+    print(f"layout while setup shown: {prepare_ms:6.3f} ms/joke (first time only)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Alexa Joke Teller benchmarks")
+    parser.add_argument('which', choices=['startup', 'gui', 'background', 'search', 'layout',
+                                          '_load', '_background'])
+    parser.add_argument('args', nargs='*')
+    parser.add_argument('--size-mb', type=int, default=1024)
+    parser.add_argument('--loaders', default='eager,mapped,pack')
+    args = parser.parse_args()
+    
+    if args.which == 'startup':
+        bench_startup(args.size_mb, args.loaders.split(','))
+    elif args.which == 'gui':
+        bench_gui_startup(args.size_mb)
+    elif args.which == 'background':
+        bench_background()
+    elif args.which == 'search':
+        bench_search(args.size_mb)
+    elif args.which == 'layout':
+        bench_layout()
+    elif args.which == '_load':
+        measure_load(*args.args)
+    elif args.which == '_background':
+        measure_background(*args.args)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,225 @@
+"""
+Runtime metrics for the Tk apps
+
+Counters, call timers and event-loop lag, exported while the app runs.
+Nothing here is touched unless metrics are switched on from the command
+line (--metrics-jsonl PATH and/or --metrics-port PORT): the hot methods
+are only wrapped in timers then, so with metrics off they run exactly as
+written and cost nothing extra.
+
+Event-loop lag comes from a root.after heartbeat: it asks to run every
+HEARTBEAT_MS, and how late it actually runs is how long the loop was
+busy with something else (a slow callback, a redraw...).
+
+Exports:
+- JSON lines: one snapshot per EXPORT_SECONDS appended to a file
+- Prometheus text format on http://127.0.0.1:PORT/metrics, with the
+  app and kiosk (--kiosk NAME, the host name by default) as labels
+
+The same file is kept in each app's folder so each one runs on its own.
+"""
+
+import argparse
+import bisect
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# How often (ms) the heartbeat asks to run
+HEARTBEAT_MS = 100
+
+# How often (seconds) a snapshot is appended to the JSON-lines file
+EXPORT_SECONDS = 10
+
+# Histogram bucket limits in seconds (the last bucket is everything above)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class Timer:
+    """Count, total, maximum and bucketed durations of one kind of call"""
+    __slots__ = ('count', 'total', 'max', 'buckets')
+    
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+    
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+    
+    def snapshot(self):
+        return {'count': self.count, 'sum': self.total, 'max': self.max,
+                'buckets': list(self.buckets)}
+
+
+class Metrics:
+    """Counters and timers for one app, plus the heartbeat and exporters"""
+    
+    def __init__(self, app, kiosk=None, jsonl_path=None, port=None):
+        self.app = app
+        self.kiosk = kiosk or socket.gethostname()
+        self.jsonl_path = jsonl_path
+        self.port = port
+        self.counters = {}
+        self.timers = {}
+        self.root = None
+        self.server = None
+        self.expected_beat = 0.0
+    
+    def count(self, name, amount=1):
+        """Add to a counter"""
+        self.counters[name] = self.counters.get(name, 0) + amount
+    
+    def observe(self, name, seconds):
+        """Add one duration to a timer"""
+        timer = self.timers.get(name)
+        if timer is None:
+            timer = self.timers[name] = Timer()
+        timer.observe(seconds)
+    
+    def wrap_methods(self, cls, names):
+        """Time every call of cls.<name> for each name (like profile_method)"""
+        for name in names:
+            original = getattr(cls, name)
+            
+            def timed(*args, _original=original, _name=name, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return _original(*args, **kwargs)
+                finally:
+                    self.observe(_name, time.perf_counter() - start)
+            
+            setattr(cls, name, timed)
+    
+    def start(self, root):
+        """Start the heartbeat and the exporters for this window"""
+        self.root = root
+        self.expected_beat = time.perf_counter() + HEARTBEAT_MS / 1000
+        root.after(HEARTBEAT_MS, self.heartbeat)
+        if self.jsonl_path:
+            root.after(EXPORT_SECONDS * 1000, self.export_jsonl)
+        if self.port is not None:
+            try:
+                self.serve(self.port)
+            except OSError as e:
+                # e.g. the port is taken - the JSON-lines file still works
+                print(f"Could not serve metrics on port {self.port}: {e}")
+    
+    def heartbeat(self):
+        """Runs every HEARTBEAT_MS; records how late it ran"""
+        now = time.perf_counter()
+        self.observe('event_loop_lag', max(0.0, now - self.expected_beat))
+        self.expected_beat = now + HEARTBEAT_MS / 1000
+        self.root.after(HEARTBEAT_MS, self.heartbeat)
+    
+    def snapshot(self):
+        """Everything measured so far as plain data"""
+        # list()/dict() copies are single steps, so the HTTP thread can
+        # take a snapshot while the Tk thread keeps counting
+        return {
+            'time': time.time(),
+            'app': self.app,
+            'kiosk': self.kiosk,
+            'counters': dict(self.counters),
+            'timers': {name: timer.snapshot() for name, timer in list(self.timers.items())}
+        }
+    
+    def export_jsonl(self, again=True):
+        """Append one snapshot line to the JSON-lines file"""
+        try:
+            with open(self.jsonl_path, 'a', encoding='utf-8') as file:
+                file.write(json.dumps(self.snapshot()) + '\n')
+        except OSError as e:
+            # Metrics are a bonus - the app carries on without them
+            print(f"Could not write metrics: {e}")
+        if again:
+            self.root.after(EXPORT_SECONDS * 1000, self.export_jsonl)
+    
+    def prometheus_text(self):
+        """The snapshot in the Prometheus text exposition format"""
+        data = self.snapshot()
+        labels = f'app="{escape(self.app)}",kiosk="{escape(self.kiosk)}"'
+        lines = ['# HELP tk_app_events_total Events counted by the app',
+                 '# TYPE tk_app_events_total counter']
+        for name, value in sorted(data['counters'].items()):
+            lines.append(f'tk_app_events_total{{{labels},name="{escape(name)}"}} {value}')
+        lines += ['# HELP tk_app_call_seconds Time spent in hot methods and event-loop lag',
+                  '# TYPE tk_app_call_seconds histogram']
+        for name, timer in sorted(data['timers'].items()):
+            series = f'{labels},name="{escape(name)}"'
+            cumulative = 0
+            for limit, count in zip(BUCKETS + ('+Inf',), timer['buckets']):
+                cumulative += count
+                lines.append(f'tk_app_call_seconds_bucket{{{series},le="{limit}"}} {cumulative}')
+            lines.append(f'tk_app_call_seconds_sum{{{series}}} {timer["sum"]}')
+            lines.append(f'tk_app_call_seconds_count{{{series}}} {timer["count"]}')
+        return '\n'.join(lines) + '\n'
+    
+    def serve(self, port):
+        """Serve /metrics on localhost from a daemon thread"""
+        metrics = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                # Keep scrapes out of the console
+                pass
+        
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    
+    def stop(self):
+        """Write a last snapshot and stop serving (call after mainloop)"""
+        if self.jsonl_path:
+            self.export_jsonl(again=False)
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+def escape(value):
+    """Escape a Prometheus label value"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def port_number(text):
+    """argparse type for --metrics-port: a whole number from 1 to 65535"""
+    port = int(text)
+    if not 0 < port < 65536:
+        raise argparse.ArgumentTypeError(f"{text} is not a port number (1-65535)")
+    return port
+
+
+def from_args(app, argv):
+    """Metrics set up from --metrics-jsonl PATH, --metrics-port PORT and
+    --kiosk NAME in argv, or None when neither export was asked for
+    
+    Other arguments are left for the app. A bad value is a usage error
+    (message and exit status 2), not a traceback.
+    """
+    parser = argparse.ArgumentParser(prog=app, add_help=False, allow_abbrev=False)
+    parser.add_argument('--metrics-jsonl', metavar='PATH')
+    parser.add_argument('--metrics-port', type=port_number, metavar='PORT')
+    parser.add_argument('--kiosk', metavar='NAME')
+    options = parser.parse_known_args(argv)[0]
+    if options.metrics_jsonl is None and options.metrics_port is None:
+        return None
+    return Metrics(app, options.kiosk, options.metrics_jsonl, options.metrics_port)
\ No newline at end of file
@@ -0,0 +1,279 @@
+"""
+Keyword search over the jokes
+
+JokeIndex is an inverted index: for every word in randomJokes.txt it
+keeps the ids of the jokes that contain it. The words are kept sorted,
+so a prefix search such as 'pizz*' is two bisects. The ids for all words
+sit in one postings array with an offsets table (word i owns
+postings[offsets[i]:offsets[i + 1]]). That makes a random match a
+single array lookup, and lets the index be saved next to the jokes file
+and mapped straight back in on the next start.
+"""
+
+import mmap
+import os
+import random
+import re
+import struct
+from array import array
+from bisect import bisect_left
+
+# A word is a run of letters and digits (matched on lowercased UTF-8 bytes)
+WORD = re.compile(rb'[a-z0-9]+')
+QUERY_WORD = re.compile(r'([a-z0-9]+)(\*?)')
+
+# Words too common to be worth indexing
+STOPWORDS = frozenset(
+    b"a an and are as at be but by did do does for from had has have he her "
+    b"his how i if in is it its me my of on or so that the their them they "
+    b"this to was we what when where who why with you your".split()
+)
+
+# Saved index: magic, version, source size, source mtime, jokes, words,
+# then the word list, the offsets ('Q') and the postings ('I')
+MAGIC = b'JIDX'
+VERSION = 1
+HEADER = struct.Struct('<4sH2xQqQQQ')
+
+# Random ids tried before a multi-word search falls back to a full scan
+SAMPLE_TRIES = 64
+
+
+def index_path_for(jokes_path):
+    """Where the index for a jokes file is saved (next to it)"""
+    return os.path.splitext(jokes_path)[0] + '.idx'
+
+
+def load_or_build(jokes, jokes_path=None):
+    """The index saved for jokes_path if it is still up to date, otherwise
+    a freshly built one (saved for next time when jokes_path is given)"""
+    index = None
+    if jokes_path is not None:
+        index_path = index_path_for(jokes_path)
+        index = JokeIndex.load(index_path, jokes_path)
+        if index is not None and index.joke_count != len(jokes):
+            index.close()
+            index = None
+    
+    if index is None:
+        index = JokeIndex.build(jokes.texts(), len(jokes))
+        if jokes_path is not None:
+            try:
+                index.save(index_path, jokes_path)
+            except OSError:
+                pass  # Search still works, the index is just rebuilt next time
+    return index
+
+
+def parse_query(text):
+    """Split a search into (word, is_prefix) pairs; 'pizz*' is a prefix"""
+    words = []
+    for word, star in QUERY_WORD.findall(text.lower()):
+        if star or word.encode() not in STOPWORDS:
+            words.append((word, bool(star)))
+    return words
+
+
+class JokeIndex:
+    """Word -> joke ids, with keyword and prefix search"""
+    
+    def __init__(self, terms, offsets, postings, joke_count):
+        self.terms = terms            # sorted list of words
+        self.offsets = offsets        # len(terms) + 1 positions into postings
+        self.postings = postings      # joke ids, ascending within each word
+        self.joke_count = joke_count
+        self.map = None
+        # Words of jokes added later with add() (word -> ids), kept apart
+        # so the saved arrays never change
+        self.added = {}
+    
+    @classmethod
+    def build(cls, texts, joke_count):
+        """Index (joke id, raw bytes) pairs, e.g. from a store's texts()"""
+        by_term = {}
+        findall = WORD.findall
+        for joke_id, text in texts:
+            for word in set(findall(text.lower())):
+                if word in STOPWORDS:
+                    continue
+                ids = by_term.get(word)
+                if ids is None:
+                    ids = by_term[word] = array('I')
+                ids.append(joke_id)
+        
+        terms = sorted(by_term)
+        offsets = array('Q', [0])
+        postings = array('I')
+        for term in terms:
+            postings.extend(by_term[term])
+            offsets.append(len(postings))
+        return cls([term.decode() for term in terms], offsets, postings, joke_count)
+    
+    def add(self, texts, joke_count):
+        """Index more (joke id, raw bytes) pairs, e.g. lines appended to the file
+        
+        These are not saved - the jokes file's new mtime makes the saved
+        index get rebuilt on the next start anyway.
+        """
+        findall = WORD.findall
+        for joke_id, text in texts:
+            for word in set(findall(text.lower())):
+                if word not in STOPWORDS:
+                    self.added.setdefault(word.decode(), []).append(joke_id)
+        self.joke_count = joke_count
+    
+    def save(self, path, jokes_path):
+        """Write the index, stamped with the jokes file's size and mtime"""
+        stat = os.stat(jokes_path)
+        words = '\n'.join(self.terms).encode()
+        # Pad the word list so the arrays after it stay 8-byte aligned
+        words += b'\0' * (-(HEADER.size + len(words)) % 8)
+        
+        # Write to a temporary name first so a half-written index is never used
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, stat.st_size, stat.st_mtime_ns,
+                                   self.joke_count, len(self.terms), len(words)))
+            file.write(words)
+            file.write(array('Q', self.offsets).tobytes())
+            file.write(array('I', self.postings).tobytes())
+        os.replace(temp_path, path)
+    
+    @classmethod
+    def load(cls, path, jokes_path):
+        """Map a saved index; None if it is missing or the jokes file changed"""
+        try:
+            stat = os.stat(jokes_path)
+            file = open(path, 'rb')
+        except OSError:
+            return None
+        
+        with file:
+            if os.fstat(file.fileno()).st_size < HEADER.size:
+                return None
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        magic, version, size, mtime_ns, joke_count, term_count, words_size = \
+            HEADER.unpack_from(data, 0)
+        if (magic, version, size, mtime_ns) != (MAGIC, VERSION, stat.st_size, stat.st_mtime_ns):
+            data.close()
+            return None
+        
+        # The file must be exactly as long as the header says: the last
+        # offset is the number of postings. Anything else (e.g. the disk
+        # filled up while saving) means it is rebuilt.
+        offsets_start = HEADER.size + words_size
+        postings_start = offsets_start + (term_count + 1) * 8
+        if postings_start > len(data) or \
+                postings_start + struct.unpack_from('<Q', data, postings_start - 8)[0] * 4 != len(data):
+            data.close()
+            return None
+        try:
+            terms = data[HEADER.size:offsets_start].rstrip(b'\0').decode().split('\n') if term_count else []
+        except UnicodeDecodeError:
+            terms = None
+        if terms is None or len(terms) != term_count:
+            data.close()
+            return None
+        
+        # The arrays are used in place - nothing is copied (the sizes were
+        # checked above, so the casts cannot fail)
+        view = memoryview(data)
+        try:
+            offsets = view[offsets_start:postings_start].cast('Q')
+            postings = view[postings_start:].cast('I')
+        finally:
+            view.release()
+        
+        index = cls(terms, offsets, postings, joke_count)
+        index.map = data
+        return index
+    
+    def close(self):
+        """Release a mapped index"""
+        if self.map is not None:
+            # The views must go before the map can be closed
+            self.offsets.release()
+            self.postings.release()
+            self.map.close()
+            self.map = None
+    
+    def term_range(self, word, prefix=False):
+        """(first, end) positions in self.terms of the words matching word"""
+        first = bisect_left(self.terms, word)
+        if not prefix:
+            found = first < len(self.terms) and self.terms[first] == word
+            return first, first + 1 if found else first
+        # Every word starting with the prefix sorts before prefix + U+FFFF
+        return first, bisect_left(self.terms, word + '\uffff', first)
+    
+    def added_ids(self, word, prefix=False):
+        """Ids of jokes added since the index was built that match word"""
+        if not prefix:
+            return self.added.get(word, [])
+        ids = []
+        for term, term_ids in self.added.items():
+            if term.startswith(word):
+                ids.extend(term_ids)
+        return ids
+    
+    def _contains(self, group, joke_id):
+        """Is joke_id among the jokes of a (first, end, added ids) group?"""
+        first, end, added = group
+        offsets, postings = self.offsets, self.postings
+        for term in range(first, end):
+            start, stop = offsets[term], offsets[term + 1]
+            position = bisect_left(postings, joke_id, start, stop)
+            if position < stop and postings[position] == joke_id:
+                return True
+        return joke_id in added
+    
+    def _groups(self, query):
+        """(first, end, added ids) for each query word, fewest jokes first"""
+        offsets = self.offsets
+        groups = [self.term_range(word, prefix) + (self.added_ids(word, prefix),)
+                  for word, prefix in parse_query(query)]
+        return sorted(groups, key=lambda g: offsets[g[1]] - offsets[g[0]] + len(g[2]))
+    
+    def search(self, query):
+        """All jokes matching every word of the query, as sorted ids"""
+        groups = self._groups(query)
+        if not groups:
+            return []
+        offsets, postings = self.offsets, self.postings
+        matches = None
+        for first, end, added in groups:
+            ids = set(postings[offsets[first]:offsets[end]])
+            ids.update(added)
+            matches = ids if matches is None else matches & ids
+            if not matches:
+                return []
+        return sorted(matches)
+    
+    def random_match(self, query, rng=random):
+        """A random joke id matching the query, or None if nothing matches
+        
+        The ids of the rarest word are sampled and checked against the
+        other words, so even a million-joke corpus needs no full scan.
+        (With a prefix, a joke containing two matching words is a little
+        more likely to be picked.)
+        """
+        groups = self._groups(query)
+        if not groups:
+            return None
+        offsets, postings = self.offsets, self.postings
+        first, end, added = groups[0]
+        start, stop = offsets[first], offsets[end]
+        count = stop - start + len(added)
+        if not count:
+            return None
+        
+        for _ in range(SAMPLE_TRIES if len(groups) > 1 else 1):
+            pick = rng.randrange(count)
+            joke_id = postings[start + pick] if pick < stop - start else added[pick - (stop - start)]
+            if all(self._contains(other, joke_id) for other in groups[1:]):
+                return joke_id
+        
+        # The words rarely appear together - look at every match instead
+        matches = self.search(query)
+        return rng.choice(matches) if matches else None
\ No newline at end of file
@@ -0,0 +1,96 @@
+"""
+Line layout cache for the joke labels
+
+With wraplength set, Tk measures and wraps a Label's text again every
+time the text changes. JokeLayout breaks a joke into lines once, with
+the label's font and width, and keeps the result by joke id. The labels
+only ever get text that already fits, so they are left with
+wraplength=0 and Tk just draws the lines. The app lays the punchline out
+while the setup is on screen, so revealing it only sets prepared text.
+
+Word widths are remembered as well. A joke file uses the same words over
+and over, so most new jokes need very few calls into Tk to measure.
+"""
+
+from collections import OrderedDict
+
+# Laid-out texts kept (the least recently used is dropped first)
+CACHE_SIZE = 512
+
+# Word widths kept before the table is emptied and started again
+WORD_CACHE_SIZE = 50_000
+
+
+class JokeLayout:
+    """Wraps text to a pixel width and caches the result by key"""
+    
+    def __init__(self, measure, width, cache_size=CACHE_SIZE):
+        self.measure = measure        # measure(text) -> width in pixels (font.Font.measure)
+        self.width = width
+        self.cache_size = cache_size
+        self.layouts = OrderedDict()  # key -> wrapped text
+        self.word_widths = {}
+        self.space = measure(' ')
+    
+    def word_width(self, word):
+        width = self.word_widths.get(word)
+        if width is None:
+            if len(self.word_widths) >= WORD_CACHE_SIZE:
+                self.word_widths.clear()
+            width = self.word_widths[word] = self.measure(word)
+        return width
+    
+    def split_word(self, word):
+        """Break a word wider than the label into pieces that fit (as Tk does)"""
+        pieces = []
+        start = 0
+        for end in range(1, len(word) + 1):
+            if end - start > 1 and self.measure(word[start:end]) > self.width:
+                pieces.append(word[start:end - 1])
+                start = end - 1
+        pieces.append(word[start:])
+        return pieces
+    
+    def wrap(self, text):
+        """text with newlines put in so that no line is wider than self.width"""
+        lines = []
+        for paragraph in text.split('\n'):
+            line = []
+            line_width = 0
+            for word in paragraph.split():
+                width = self.word_width(word)
+                if width > self.width:
+                    # Too long for any line - it gets lines of its own
+                    if line:
+                        lines.append(' '.join(line))
+                    *full, word = self.split_word(word)
+                    lines.extend(full)
+                    line, line_width = [word], self.measure(word)
+                elif line and line_width + self.space + width > self.width:
+                    lines.append(' '.join(line))
+                    line, line_width = [word], width
+                else:
+                    line_width += self.space + width if line else width
+                    line.append(word)
+            lines.append(' '.join(line))
+        return '\n'.join(lines)
+    
+    def get(self, key, text):
+        """The wrapped text for key, working it out from text on a miss"""
+        layout = self.layouts.get(key)
+        if layout is None:
+            layout = self.layouts[key] = self.wrap(text)
+            if len(self.layouts) > self.cache_size:
+                self.layouts.popitem(last=False)
+        else:
+            self.layouts.move_to_end(key)
+        return layout
+    
+    def clear(self):
+        """Forget every layout (joke ids have changed meaning)"""
+        self.layouts.clear()
+    
+    def forget_from(self, first_id):
+        """Forget the layouts of joke ids >= first_id (their text may have changed)"""
+        for key in [key for key in self.layouts if key[0] >= first_id]:
+            del self.layouts[key]
\ No newline at end of file
@@ -0,0 +1,192 @@
+"""
+Compiled joke packs for the Alexa Joke Teller
+
+A joke pack holds randomJokes.txt already split into setups and
+punchlines, so nothing has to be searched for '?' at startup:
+    
+    header    magic, version, offset type, source size and mtime, count
+    offsets   2 * count + 1 positions into the blob - joke i's setup is
+              blob[offsets[2i]:offsets[2i + 1]] and its punchline runs
+              to offsets[2i + 2]
+    blob      the UTF-8 text of every setup and punchline, back to back
+
+Lines without a '?' keep their place (so joke ids match the text file)
+as an empty setup. The app memory-maps the pack and reads the offsets
+through a memoryview, so opening it copies nothing.
+
+Build one with:
+    python joke_pack.py [randomJokes.txt] [-o randomJokes.pack]
+"""
+
+import argparse
+import mmap
+import os
+import struct
+from array import array
+
+from joke_store import MappedJokeStore
+
+MAGIC = b'JPAK'
+VERSION = 1
+HEADER = struct.Struct('<4sHcxQqQ')
+
+
+def pack_path_for(jokes_path):
+    """Where the pack for a jokes file is kept (next to it)"""
+    return os.path.splitext(jokes_path)[0] + '.pack'
+
+
+def write_pack(jokes_path, pack_path=None):
+    """Compile a jokes text file into a pack; returns (pack path, jokes)"""
+    if pack_path is None:
+        pack_path = pack_path_for(jokes_path)
+    store = MappedJokeStore(jokes_path)
+    count = len(store)
+    # The blob is never bigger than the text, so this offset size is enough
+    typecode = store.typecode
+    offsets = array(typecode, [0])
+    
+    temp_path = f"{pack_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'wb') as file:
+            # Stamped with the text file as it was mapped, so a later append
+            # makes the pack stale
+            file.write(HEADER.pack(MAGIC, VERSION, typecode.encode(),
+                                   store.size, store.mtime_ns, count))
+            # Leave room for the offsets and write the blob first
+            file.seek(HEADER.size + (2 * count + 1) * offsets.itemsize)
+            position = 0
+            for joke_id in range(count):
+                joke = store.get(joke_id)
+                if joke is not None:
+                    setup, punchline = (part.encode('utf-8') for part in joke)
+                    file.write(setup)
+                    file.write(punchline)
+                    offsets.append(position + len(setup))
+                    position += len(setup) + len(punchline)
+                else:
+                    offsets.append(position)
+                offsets.append(position)
+            file.seek(HEADER.size)
+            file.write(offsets.tobytes())
+        os.replace(temp_path, pack_path)
+    finally:
+        store.close()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return pack_path, count
+
+
+# Jokes served straight out of a memory-mapped pack
+class PackedJokeStore:
+    """Read-only joke store over a compiled joke pack"""
+    
+    def __init__(self, pack_path, jokes_path):
+        self.pack_path = pack_path
+        # The text file it was built from (watched for changes, used for the index)
+        self.path = jokes_path
+        with open(pack_path, 'rb') as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        # Every size is checked against the file before any view is taken,
+        # so a damaged pack never leaves a view open on the map
+        try:
+            if len(self.map) < HEADER.size:
+                raise ValueError("shorter than its header")
+            magic, version, typecode, self.size, self.mtime_ns, count = \
+                HEADER.unpack_from(self.map, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("not a joke pack")
+            if typecode not in (b'I', b'Q'):
+                raise ValueError("unknown offset type")
+            typecode = typecode.decode()
+            table_end = HEADER.size + (2 * count + 1) * array(typecode).itemsize
+            if table_end > len(self.map):
+                raise ValueError("offsets table is cut short")
+        except ValueError as e:
+            self.map.close()
+            raise ValueError(f"{pack_path} is damaged: {e}") from None
+        
+        view = memoryview(self.map)
+        try:
+            self.offsets = view[HEADER.size:table_end].cast(typecode)
+        finally:
+            view.release()
+        # Blob positions are relative to here
+        self.blob_start = table_end
+        self.count = count
+        if self.offsets[2 * count] > len(self.map) - table_end:
+            self.close()
+            raise ValueError(f"{pack_path} is damaged: text is cut short")
+    
+    @classmethod
+    def load(cls, pack_path, jokes_path):
+        """Open the pack if it exists and matches jokes_path, else None"""
+        try:
+            stat = os.stat(jokes_path)
+            store = cls(pack_path, jokes_path)
+        except Exception:
+            # Any trouble with the pack just means reading the text file instead
+            return None
+        if (store.size, store.mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+            store.close()
+            return None
+        return store
+    
+    def get(self, joke_id):
+        """Return (setup, punchline) for a joke id, or None if the line is not a joke"""
+        offsets, base = self.offsets, self.blob_start
+        start, middle, end = offsets[2 * joke_id], offsets[2 * joke_id + 1], offsets[2 * joke_id + 2]
+        if start == middle:
+            return None
+        data = self.map
+        return data[base + start:base + middle].decode('utf-8'), data[base + middle:base + end].decode('utf-8')
+    
+    def texts(self, start=0):
+        """Yield (joke id, UTF-8 text) for the jokes from id start on"""
+        offsets, base, data = self.offsets, self.blob_start, self.map
+        for joke_id in range(start, self.count):
+            first, middle, end = offsets[2 * joke_id], offsets[2 * joke_id + 1], offsets[2 * joke_id + 2]
+            if first != middle:
+                yield joke_id, data[base + first:base + middle] + b' ' + data[base + middle:base + end]
+    
+    def changed(self):
+        """'rewritten' once the text file no longer matches the pack, else None
+        
+        Any change counts, appends too - the text file then has to be read
+        anyway, because the pack does not have the new jokes.
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        if (stat.st_size, stat.st_mtime_ns) != (self.size, self.mtime_ns):
+            return 'rewritten'
+        return None
+    
+    def __len__(self):
+        return self.count
+    
+    def __getitem__(self, joke_id):
+        return self.get(joke_id)
+    
+    def close(self):
+        # The offsets view must go before the map can be closed
+        self.offsets.release()
+        self.map.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile randomJokes.txt into a joke pack")
+    parser.add_argument('jokes', nargs='?',
+                        default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                             "randomJokes.txt"))
+    parser.add_argument('-o', '--output', help="pack file (default: next to the jokes file)")
+    args = parser.parse_args()
+    
+    pack_path, count = write_pack(args.jokes, args.output)
+    print(f"Wrote {count:,} jokes to {pack_path} ({os.path.getsize(pack_path):,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,400 @@
+import mmap
+import os
+import random
+from array import array
+
+# NumPy is imported by the first scan (normally on the loading thread),
+# so the window never waits for it
+np = None
+_numpy_checked = False
+
+# Bytes scanned at a time while building the line index
+SCAN_CHUNK = 1 << 26
+
+
+def load_numpy():
+    """Import NumPy once; returns None if it is not installed"""
+    global np, _numpy_checked
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            # NumPy is optional - it only speeds up finding the line breaks
+            pass
+    return np
+
+
+def parse_joke(line):
+    """Split a 'setup?punchline' line, or return None if there is no '?'"""
+    if '?' not in line:
+        return None
+    setup, punchline = line.split('?', 1)  # Split only at first '?'
+    return setup.strip() + '?', punchline.strip()
+
+
+# Holds every joke by id so any joke can be fetched in O(1)
+class JokeStore:
+    def __init__(self, jokes=()):
+        # Setups and punchlines are kept in two parallel lists (id = position)
+        self.setups = []
+        self.punchlines = []
+        for setup, punchline in jokes:
+            self.add(setup, punchline)
+    
+    def add(self, setup, punchline):
+        """Add a joke and return its id"""
+        self.setups.append(setup)
+        self.punchlines.append(punchline)
+        return len(self.setups) - 1
+    
+    def get(self, joke_id):
+        """Return (setup, punchline) for a joke id"""
+        return self.setups[joke_id], self.punchlines[joke_id]
+    
+    def texts(self, start=0):
+        """Yield (joke id, UTF-8 text) for the jokes from id start on"""
+        for joke_id in range(start, len(self.setups)):
+            yield joke_id, f"{self.setups[joke_id]} {self.punchlines[joke_id]}".encode('utf-8')
+    
+    def __len__(self):
+        return len(self.setups)
+    
+    def __getitem__(self, joke_id):
+        return self.get(joke_id)
+
+
+# One random pass over a run of joke ids, used by ShuffleBag
+class ShuffleWalk:
+    """offset..offset+count-1 in a random order, from a full-period LCG
+    
+    x -> (a * x + c) mod m visits every number below m exactly once when
+    m is a power of two, c is odd and a % 4 == 1. a == 1 is left out (that
+    is just a fixed stride), and each state goes through a keyed scramble
+    (xor, odd multiply, xorshift - each one-to-one below m) so the order
+    does not show the LCG's patterns, e.g. ids alternating odd and even.
+    Numbers >= count are skipped, and only a handful of integers of state
+    are kept - nothing per joke.
+    """
+    __slots__ = ('offset', 'count', 'left', 'mask', 'shift', 'multiplier',
+                 'increment', 'key', 'mix', 'state')
+    
+    def __init__(self, offset, count, rng):
+        self.offset = offset
+        self.count = count
+        self.left = count
+        # m is at least 8 so there is a multiplier other than 1 to pick
+        bits = max(3, (count - 1).bit_length())
+        self.mask = (1 << bits) - 1
+        self.shift = (bits + 1) // 2
+        self.multiplier = rng.randrange(5, self.mask + 1, 4)
+        self.increment = rng.randrange(1, self.mask + 1, 2)
+        self.key = rng.randrange(self.mask + 1)
+        self.mix = rng.randrange(1, self.mask + 1, 2)
+        self.state = rng.randrange(self.mask + 1)
+    
+    def next(self):
+        """The next id of this walk (only call while self.left > 0)"""
+        mask = self.mask
+        # Step the generator until it lands inside the run
+        # (m < 2 * count, so this takes fewer than 2 steps on average)
+        while True:
+            self.state = (self.multiplier * self.state + self.increment) & mask
+            x = ((self.state ^ self.key) * self.mix) & mask
+            x ^= x >> self.shift
+            x = (x * self.mix) & mask
+            if x < self.count:
+                break
+        self.left -= 1
+        return self.offset + x
+
+
+# Hands out every joke id once, in a random order, before any repeats
+class ShuffleBag:
+    """No-repeat random order over joke ids 0..size-1
+    
+    A round is normally one ShuffleWalk over every joke. Jokes added while
+    a round is going (the file still loading, or appended to) get a walk
+    of their own, and each draw picks a walk in proportion to the jokes it
+    has left, so the new jokes are mixed into the rest of the round rather
+    than starting it over.
+    """
+    
+    def __init__(self, size, rng=None):
+        self.rng = rng or random.Random()
+        self.reset(size)
+    
+    def reset(self, size):
+        """Start a fresh round over size jokes (e.g. the file was replaced)"""
+        self.size = size
+        self.walks = [ShuffleWalk(0, size, self.rng)] if size else []
+    
+    def resize(self, size):
+        """Take in more jokes without starting the round over
+        
+        A smaller size means the jokes were replaced, so a fresh round starts.
+        """
+        if size < self.size:
+            self.reset(size)
+            return
+        if size == self.size:
+            return
+        last = self.walks[-1] if self.walks else None
+        if last is not None and last.left == last.count and last.offset + last.count == self.size:
+            # Nothing dealt from the newest walk yet - it can just take the new jokes too
+            self.walks[-1] = ShuffleWalk(last.offset, size - last.offset, self.rng)
+        else:
+            self.walks.append(ShuffleWalk(self.size, size - self.size, self.rng))
+        self.size = size
+    
+    def remaining(self):
+        """How many jokes are left before the round starts again"""
+        return sum(walk.left for walk in self.walks)
+    
+    def next(self):
+        """Return the next joke id (None if there are no jokes)"""
+        if self.size == 0:
+            return None
+        if not self.walks:
+            # Round over - every joke has been told once
+            self.walks = [ShuffleWalk(0, self.size, self.rng)]
+        
+        walks = self.walks
+        walk = walks[0]
+        if len(walks) > 1:
+            pick = self.rng.randrange(self.remaining())
+            for walk in walks:
+                if pick < walk.left:
+                    break
+                pick -= walk.left
+        
+        joke_id = walk.next()
+        if not walk.left:
+            walks.remove(walk)
+        return joke_id
+
+
+# Jokes read straight from a memory-mapped file, parsed only when drawn
+class MappedJokeStore:
+    """Joke store over a memory-mapped randomJokes.txt
+    
+    Startup only records where each non-empty line starts and ends, in
+    two compact integer arrays. The text of a joke is decoded and split
+    the first time get() is called for it.
+    
+    With index=False the line index is left empty; scan_batches() can then
+    be run on another thread and each batch handed to add_lines().
+    
+    changed() tells whether the file has since been appended to or
+    rewritten; grow() then indexes just the appended lines.
+    
+    A file rewritten in place (opened for writing, as most editors save)
+    is cut short under the map, and reading a mapped page past its new
+    end kills the process with SIGBUS. So once changed() sees an in-place
+    rewrite the map is dropped and get() and texts() read the file
+    instead; they may return a mixed-up or missing joke until the new
+    store is swapped in, but never crash. The hazard left is the time
+    before changed() is next called (up to WATCH_POLL_MS in the app): a
+    joke drawn then still comes from the map.
+    """
+    
+    # Bytes at the end of the file remembered to spot a rewrite
+    TAIL_BYTES = 64
+    
+    def __init__(self, path, index=True):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.size = 0
+        self.map = None
+        self._map_file()
+        
+        # Where the last line of the file starts (== size if it ends in a newline)
+        self.tail_start = 0
+        
+        # 4-byte offsets are enough for files under 4 GB
+        self.typecode = 'I' if self.size < 2 ** 32 else 'Q'
+        self.starts = array(self.typecode)
+        self.ends = array(self.typecode)
+        if index:
+            for starts, ends in self.scan_batches():
+                self.add_lines(starts, ends)
+    
+    def _map_file(self):
+        """(Re)map the whole file and note what it looks like now"""
+        stat = os.fstat(self.file.fileno())
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        self.size = stat.st_size
+        self.inode = stat.st_ino
+        self.mtime_ns = stat.st_mtime_ns
+        if self.size:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            # Copied, because the map would show a rewrite too
+            self.tail = self.map[max(0, self.size - self.TAIL_BYTES):self.size]
+        else:
+            self.tail = b''
+    
+    def add_lines(self, starts, ends):
+        """Add a batch of line ranges produced by scan_batches()"""
+        self.starts.extend(starts)
+        self.ends.extend(ends)
+    
+    def scan_batches(self, first_chunk=SCAN_CHUNK, start=0):
+        """Yield (starts, ends) arrays for the non-empty lines, chunk by chunk
+        
+        Only reads the file, so it is safe to run on a worker thread. A
+        small first_chunk gets the first jokes out quickly. start must be
+        the beginning of a line.
+        """
+        if self.map is None:
+            return
+        use_numpy = load_numpy() is not None
+        line_start = start
+        chunk_start = start
+        chunk_size = first_chunk
+        while chunk_start < self.size:
+            chunk_end = min(chunk_start + chunk_size, self.size)
+            starts = array(self.typecode)
+            ends = array(self.typecode)
+            if use_numpy:
+                line_start = self._scan_chunk_numpy(line_start, chunk_start, chunk_end, starts, ends)
+            else:
+                line_start = self._scan_chunk(line_start, chunk_start, chunk_end, starts, ends)
+            self._release(chunk_start, chunk_end)
+            
+            if chunk_end == self.size:
+                self.tail_start = line_start
+                if self.size > line_start:
+                    # Last line without a trailing newline
+                    starts.append(line_start)
+                    ends.append(self.size)
+            yield starts, ends
+            chunk_start = chunk_end
+            chunk_size = SCAN_CHUNK
+    
+    def changed(self):
+        """How the file on disk differs from what is indexed
+        
+        Returns None (unchanged, or cannot be read right now), 'grown' (only
+        appended to) or 'rewritten'. Just a stat unless the size changed.
+        A rewrite in place also drops the map (see unmap).
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        if stat.st_size == self.size and stat.st_mtime_ns == self.mtime_ns \
+                and stat.st_ino == self.inode:
+            return None
+        if stat.st_ino != self.inode:
+            # Replaced by a new file - the old one stays whole under the map
+            return 'rewritten'
+        
+        # Bigger: an append only if the old last bytes are still the same
+        if stat.st_size > self.size:
+            with open(self.path, 'rb') as file:
+                file.seek(self.size - len(self.tail))
+                if file.read(len(self.tail)) == self.tail:
+                    return 'grown'
+        
+        # Changed in place - it may have been cut short under the map
+        self.unmap()
+        return 'rewritten'
+    
+    def grow(self):
+        """Index the lines appended since the file was mapped
+        
+        Returns the id of the first new joke. A last line that had no
+        newline yet is indexed again, as it may have been continued.
+        """
+        first_new = len(self.starts)
+        if self.tail_start < self.size:
+            self.starts.pop()
+            self.ends.pop()
+            first_new -= 1
+        
+        self._map_file()
+        for starts, ends in self.scan_batches(start=self.tail_start):
+            self.add_lines(starts, ends)
+        return first_new
+    
+    def _scan_chunk(self, line_start, chunk_start, chunk_end, starts, ends):
+        """Find the lines ending inside one chunk; returns the next line start"""
+        find = self.map.find
+        newline = find(b'\n', chunk_start, chunk_end)
+        while newline != -1:
+            if newline > line_start:
+                starts.append(line_start)
+                ends.append(newline)
+            line_start = newline + 1
+            newline = find(b'\n', line_start, chunk_end)
+        return line_start
+    
+    def _scan_chunk_numpy(self, line_start, chunk_start, chunk_end, starts, ends):
+        """Same as _scan_chunk, but finds the newlines with NumPy"""
+        chunk = np.frombuffer(self.map, dtype=np.uint8,
+                              count=chunk_end - chunk_start, offset=chunk_start)
+        newlines = np.flatnonzero(chunk == 10) + chunk_start
+        if not len(newlines):
+            return line_start
+        line_starts = np.empty_like(newlines)
+        line_starts[0] = line_start
+        line_starts[1:] = newlines[:-1] + 1
+        
+        # Skip empty lines, then copy the offsets straight into the arrays
+        keep = newlines > line_starts
+        dtype = np.dtype(self.typecode)
+        starts.frombytes(line_starts[keep].astype(dtype).tobytes())
+        ends.frombytes(newlines[keep].astype(dtype).tobytes())
+        return int(newlines[-1]) + 1
+    
+    def _release(self, chunk_start, chunk_end):
+        """Drop scanned pages from our memory use (they stay in the OS cache)"""
+        if hasattr(mmap, 'MADV_DONTNEED'):
+            aligned = chunk_start - chunk_start % mmap.PAGESIZE
+            self.map.madvise(mmap.MADV_DONTNEED, aligned, chunk_end - aligned)
+    
+    def unmap(self):
+        """Stop reading through the map (the file was changed in place)
+        
+        get() and texts() read the file with seek/read from then on, which
+        just comes back short if the file is now shorter.
+        """
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+    
+    def _read(self, start, end):
+        """Bytes start..end of the file, once the map has been dropped"""
+        self.file.seek(start)
+        return self.file.read(end - start)
+    
+    def get(self, joke_id):
+        """Return (setup, punchline) for a joke id, or None if the line is not a joke"""
+        start, end = self.starts[joke_id], self.ends[joke_id]
+        line = self.map[start:end] if self.map is not None else self._read(start, end)
+        return parse_joke(line.decode('utf-8', errors='replace'))
+    
+    def texts(self, start=0):
+        """Yield (joke id, raw line bytes) for the jokes from id start on"""
+        data, starts, ends = self.map, self.starts, self.ends
+        for joke_id in range(start, len(starts)):
+            if data is not None:
+                line = data[starts[joke_id]:ends[joke_id]]
+            else:
+                line = self._read(starts[joke_id], ends[joke_id])
+            if b'?' in line:
+                yield joke_id, line
+    
+    def __len__(self):
+        return len(self.starts)
+    
+    def __getitem__(self, joke_id):
+        return self.get(joke_id)
+    
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+        self.file.close()
\ No newline at end of file
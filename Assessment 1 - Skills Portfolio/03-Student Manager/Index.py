@@ -0,0 +1,469 @@
+"""
+03-Student Manager
+
+Browse the student marks in studentMarks.txt: every student's
+coursework, exam mark, overall percentage and grade, with the class
+size and average underneath.
+
+The table is virtual - it only ever has VISIBLE_ROWS rows of canvas
+items, which are refilled from the StudentStore as you scroll, so a
+file with a million students scrolls as smoothly as one with ten.
+Loading, sorting and searching run on a worker thread.
+"""
+
+import gc
+import sys
+import time
+import tkinter as tk
+from tkinter import font
+from collections import OrderedDict
+from pathlib import Path
+import queue
+import threading
+
+from student_records import GRADE_BANDS, TOTAL_MAX, format_student
+from student_store import StudentStore
+
+# Rows drawn at once, and their height in pixels
+VISIBLE_ROWS = 20
+ROW_HEIGHT = 24
+
+# Rows fetched from the store at a time, and how many such pages are kept
+PAGE_SIZE = 100
+PAGE_CACHE = 64
+
+# Rows moved per mouse wheel notch
+WHEEL_ROWS = 3
+
+# How often (ms) the UI checks for results from the worker thread
+LOAD_POLL_MS = 20
+
+# Table columns: (heading, x position, anchor, sort key or None)
+COLUMNS = (
+    ("Name", 12, tk.W, 'name'),
+    ("Number", 300, tk.E, 'number'),
+    ("Coursework", 420, tk.E, None),
+    ("Exam", 510, tk.E, None),
+    ("Overall", 630, tk.E, 'overall'),
+    ("Grade", 720, tk.CENTER, 'overall')
+)
+
+# Colour used to show each grade
+GRADE_COLORS = {
+    'A': '#10b981',
+    'B': '#3b82f6',
+    'C': '#f59e0b',
+    'D': '#ff6b9d',
+    'F': '#ef4444'
+}
+
+# Main class for the Student Manager application
+class StudentManagerApp:
+    def __init__(self, root, marks_path=None):
+        # Initialize the main window
+        self.root = root
+        self.root.title("Student Manager")
+        self.root.geometry("860x720")
+        self.root.resizable(False, False)
+        self.root.configure(bg='#0f0f1e')
+        
+        # The records (loaded on a worker thread) and what the table shows:
+        # students in sort order, filtered by the search box
+        self.store = None
+        self.sort_key = 'overall'
+        self.descending = True
+        self.query = ""
+        
+        # None means "the whole class by overall mark", which is read
+        # straight from the store's mark buckets - anything else is an
+        # array of student numbers made by the worker
+        self.view = None
+        self.view_length = 0
+        self.pages = OrderedDict()    # page number -> list of Students
+        
+        # First visible row, the clicked student, and any queued redraw
+        self.top = 0
+        self.selected = None
+        self.render_pending = None
+        
+        # Worker results come back through this queue; each request gets a
+        # number so an answer to an older one can be thrown away
+        self.work_queue = queue.Queue()
+        self.request = 0
+        self.busy = 0
+        
+        # Main-thread seconds per redraw/update, when a list is put here
+        # (benchmark.py gui does that)
+        self.frame_times = None
+        
+        # Create the user interface, then load the file in the background
+        self.setup_ui()
+        self.load_students(marks_path)
+    
+    def load_students(self, marks_path=None):
+        """Start loading studentMarks.txt (or marks_path) on a worker thread"""
+        if marks_path is None:
+            marks_path = Path(__file__).with_name("studentMarks.txt")
+        self.status_label.config(text="Loading students...")
+        self.start_work('loaded', StudentStore, marks_path)
+    
+    def start_work(self, kind, function, *args):
+        """Run function(*args) on a worker thread and queue (kind, request, result)"""
+        self.request += 1
+        self.busy += 1
+        worker = threading.Thread(target=self.run_work, args=(kind, self.request, function, args), daemon=True)
+        worker.start()
+        if self.busy == 1:
+            self.root.after(LOAD_POLL_MS, self.poll_worker)
+    
+    def run_work(self, kind, request, function, args):
+        """Worker thread: do the slow part and hand the result back"""
+        try:
+            self.work_queue.put((kind, request, function(*args)))
+        except Exception as e:
+            self.work_queue.put(('error', request, e))
+    
+    def poll_worker(self):
+        """Main thread: take in finished work (only the newest request counts)"""
+        try:
+            while True:
+                kind, request, result = self.work_queue.get_nowait()
+                self.busy -= 1
+                if request != self.request:
+                    continue
+                started = time.perf_counter()
+                if kind == 'loaded':
+                    self.store = result
+                    # A big class is millions of long-lived objects - keep
+                    # them out of the garbage collector's full passes
+                    gc.freeze()
+                    # (A sort or search asked for while loading is applied now)
+                    self.refresh_view()
+                elif kind == 'view':
+                    self.show_view(result)
+                else:
+                    self.status_label.config(text=f"Error: {result}")
+                self.record_frame(kind, started)
+        except queue.Empty:
+            pass
+        
+        if self.busy:
+            self.root.after(LOAD_POLL_MS, self.poll_worker)
+    
+    def record_frame(self, name, started):
+        if self.frame_times is not None:
+            self.frame_times.append((name, time.perf_counter() - started))
+    
+    def setup_ui(self):
+        """Set up all the visual elements of the GUI"""
+        
+        # Create custom fonts for different text elements
+        title_font = font.Font(family="Arial", size=24, weight="bold")
+        self.row_font = font.Font(family="Arial", size=11)
+        heading_font = font.Font(family="Arial", size=11, weight="bold")
+        button_font = font.Font(family="Arial", size=10, weight="bold")
+        
+        # Title at the top of the window
+        title_label = tk.Label(
+            self.root,
+            text="🎓 Student Manager",
+            font=title_font,
+            bg='#0f0f1e',
+            fg='#6c63ff',
+            pady=10
+        )
+        title_label.pack()
+        
+        # Controls row - search box and the menu buttons
+        controls = tk.Frame(self.root, bg='#0f0f1e')
+        controls.pack(pady=(0, 10))
+        
+        # Search by name or student number (Return looks the number up directly)
+        self.search_var = tk.StringVar()
+        self.search_entry = tk.Entry(
+            controls,
+            textvariable=self.search_var,
+            font=self.row_font,
+            width=24,
+            bg='#1a1a2e',
+            fg='#ffffff',
+            insertbackground='#ffffff',
+            relief=tk.FLAT
+        )
+        self.search_entry.grid(row=0, column=0, padx=5, ipady=4)
+        self.search_entry.bind('<Return>', lambda event: self.search())
+        
+        # Common settings for all buttons
+        button_config = {
+            'font': button_font,
+            'fg': 'white',
+            'activeforeground': 'white',
+            'bd': 0,
+            'relief': tk.FLAT,
+            'cursor': 'hand2',
+            'padx': 8,
+            'pady': 4
+        }
+        
+        buttons = (
+            ("🔍 Search", self.search, '#6c63ff', '#5848cc'),
+            ("🏆 Highest", lambda: self.show_extreme(highest=True), '#10b981', '#0d9467'),
+            ("📉 Lowest", lambda: self.show_extreme(highest=False), '#ff6b9d', '#cc4d73'),
+            ("↕ Sort order", self.toggle_order, '#00d4ff', '#00a8cc'),
+            ("❌ Quit", self.root.quit, '#ff4757', '#cc3644')
+        )
+        for column, (text, command, colour, active) in enumerate(buttons, start=1):
+            button = tk.Button(controls, text=text, command=command, bg=colour,
+                               activebackground=active, **button_config)
+            button.grid(row=0, column=column, padx=4)
+        
+        # Column headings - click one to sort by it, click again to reverse
+        table_frame = tk.Frame(self.root, bg='#1a1a2e', bd=2, relief=tk.SUNKEN)
+        table_frame.pack(padx=20)
+        
+        heading_frame = tk.Frame(table_frame, bg='#0f3460', width=800, height=ROW_HEIGHT + 6)
+        heading_frame.grid(row=0, column=0, columnspan=2, sticky='we')
+        self.heading_labels = {}
+        for heading, x, anchor, sort_key in COLUMNS:
+            label = tk.Label(heading_frame, text=heading, font=heading_font,
+                             bg='#0f3460', fg='#00d9ff', cursor='hand2' if sort_key else '')
+            label.place(x=x, y=3, anchor={tk.W: tk.NW, tk.E: tk.NE, tk.CENTER: tk.N}[anchor])
+            if sort_key:
+                label.bind('<Button-1>', lambda event, key=sort_key: self.sort_by(key))
+            self.heading_labels[heading] = label
+        
+        # The table itself: a fixed set of row items, refilled as it scrolls
+        self.table = tk.Canvas(
+            table_frame,
+            width=800,
+            height=VISIBLE_ROWS * ROW_HEIGHT,
+            bg='#1a1a2e',
+            highlightthickness=0
+        )
+        self.table.grid(row=1, column=0)
+        self.row_boxes = []
+        self.row_cells = []
+        for row in range(VISIBLE_ROWS):
+            y = row * ROW_HEIGHT
+            self.row_boxes.append(self.table.create_rectangle(0, y, 800, y + ROW_HEIGHT, width=0))
+            self.row_cells.append([
+                self.table.create_text(x, y + ROW_HEIGHT // 2, anchor=anchor,
+                                       font=self.row_font, fill='#ffffff')
+                for _, x, anchor, _ in COLUMNS
+            ])
+        self.table.bind('<Button-1>', self.click_row)
+        
+        self.scrollbar = tk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.scroll_command)
+        self.scrollbar.grid(row=1, column=1, sticky='ns')
+        
+        # Mouse wheel (Windows/macOS send <MouseWheel>, X11 sends buttons 4/5)
+        # and keyboard scrolling - the keys only while the table has the
+        # focus (it takes it when clicked), so they still move the cursor
+        # in the search box
+        self.root.bind('<MouseWheel>', lambda event: self.scroll_by(-WHEEL_ROWS if event.delta > 0 else WHEEL_ROWS))
+        self.root.bind('<Button-4>', lambda event: self.scroll_by(-WHEEL_ROWS))
+        self.root.bind('<Button-5>', lambda event: self.scroll_by(WHEEL_ROWS))
+        for key, rows in (('<Up>', -1), ('<Down>', 1),
+                          ('<Prior>', -(VISIBLE_ROWS - 1)), ('<Next>', VISIBLE_ROWS - 1)):
+            self.table.bind(key, lambda event, rows=rows: self.scroll_by(rows))
+        self.table.focus_set()
+        
+        # The chosen student, shown as in "View all student records"
+        self.detail_label = tk.Label(
+            self.root,
+            text="Click a student to see their record",
+            font=self.row_font,
+            bg='#0f0f1e',
+            fg='#00ff88',
+            pady=10
+        )
+        self.detail_label.pack()
+        
+        # Class summary - number of students and average percentage
+        self.status_label = tk.Label(
+            self.root,
+            text="",
+            font=self.row_font,
+            bg='#0f0f1e',
+            fg='#94a3b8'
+        )
+        self.status_label.pack()
+        self.update_headings()
+    
+    def update_headings(self):
+        """Mark the sorted column with an arrow"""
+        arrow = " ▼" if self.descending else " ▲"
+        for heading, _, _, sort_key in COLUMNS:
+            shown = sort_key == self.sort_key and heading != "Grade"
+            self.heading_labels[heading].config(text=heading + (arrow if shown else ""))
+    
+    def sort_by(self, sort_key):
+        """Sort by a column, or reverse the order if it is already sorted by it"""
+        if sort_key == self.sort_key:
+            self.descending = not self.descending
+        else:
+            self.sort_key = sort_key
+            # Best marks first, but names and numbers from the start
+            self.descending = sort_key == 'overall'
+        self.refresh_view()
+    
+    def toggle_order(self):
+        """Ascending <-> descending"""
+        self.sort_by(self.sort_key)
+    
+    def search(self):
+        """Show only the students whose name or number matches the search box"""
+        query = self.search_var.get().strip()
+        if self.store is not None and query.isdigit():
+            # A whole student number is a single lookup - show it straight away
+            student = self.store.get(int(query))
+            if student is not None:
+                self.select(student)
+        if query != self.query:
+            self.query = query
+            self.refresh_view()
+    
+    def refresh_view(self):
+        """Work out the order for the current sort and search"""
+        self.update_headings()
+        if self.store is None:
+            return
+        if self.sort_key == 'overall' and not self.query:
+            # Nothing to sort - the store already keeps this order
+            self.request += 1
+            self.show_view(None)
+            return
+        self.status_label.config(text="Sorting..." if not self.query else "Searching...")
+        self.start_work('view', self.store.select, self.sort_key, self.descending, self.query)
+    
+    def show_view(self, view):
+        """Switch the table to a new order and go back to its top"""
+        self.view = view
+        self.view_length = len(self.store) if view is None else len(view)
+        self.pages.clear()
+        self.top = 0
+        self.update_status()
+        self.render()
+    
+    def update_status(self):
+        """Class size and average - worked out from the mark buckets, not the rows"""
+        store = self.store
+        if not len(store):
+            self.status_label.config(text="No students found")
+            return
+        total = sum(mark * len(bucket) for mark, bucket in enumerate(store.by_overall))
+        average = total * 100 / (len(store) * TOTAL_MAX)
+        shown = f" - {self.view_length:,} match '{self.query}'" if self.query else ""
+        self.status_label.config(text=f"{len(store):,} students, average {average:.2f}%{shown}")
+    
+    def page(self, number):
+        """Rows number * PAGE_SIZE onwards of the current order (cached)"""
+        rows = self.pages.get(number)
+        if rows is not None:
+            self.pages.move_to_end(number)
+            return rows
+        start = number * PAGE_SIZE
+        if self.view is None:
+            rows = self.store.ranked(start, PAGE_SIZE, self.descending)
+        else:
+            get = self.store.get
+            rows = [get(student) for student in self.view[start:start + PAGE_SIZE]]
+        self.pages[number] = rows
+        if len(self.pages) > PAGE_CACHE:
+            self.pages.popitem(last=False)
+        return rows
+    
+    def visible_students(self):
+        """The students in the rows on screen"""
+        first_page, last_page = self.top // PAGE_SIZE, (self.top + VISIBLE_ROWS - 1) // PAGE_SIZE
+        rows = []
+        for number in range(first_page, last_page + 1):
+            rows.extend(self.page(number))
+        offset = self.top - first_page * PAGE_SIZE
+        return rows[offset:offset + VISIBLE_ROWS]
+    
+    def scroll_command(self, action, amount, unit=None):
+        """Scrollbar callback: ('moveto', fraction) or ('scroll', n, 'units'/'pages')"""
+        if action == 'moveto':
+            self.scroll_to(int(float(amount) * self.view_length))
+        elif unit == 'pages':
+            self.scroll_by(int(amount) * (VISIBLE_ROWS - 1))
+        else:
+            self.scroll_by(int(amount))
+    
+    def scroll_by(self, rows):
+        self.scroll_to(self.top + rows)
+    
+    def scroll_to(self, top):
+        """Move the first visible row, redrawing at most once per idle moment"""
+        top = max(0, min(top, self.view_length - VISIBLE_ROWS))
+        if top != self.top:
+            self.top = top
+            if self.render_pending is None:
+                self.render_pending = self.root.after_idle(self.render)
+    
+    def render(self):
+        """Fill the row items with the students now on screen"""
+        started = time.perf_counter()
+        self.render_pending = None
+        students = self.visible_students() if self.store is not None else []
+        
+        itemconfig = self.table.itemconfigure
+        for row in range(VISIBLE_ROWS):
+            cells = self.row_cells[row]
+            if row < len(students):
+                student = students[row]
+                values = (student.name, student.number, f"{student.coursework}/60",
+                          f"{student.exam}/100", f"{student.percentage:.2f}%", student.grade)
+                for cell, value in zip(cells, values):
+                    itemconfig(cell, text=value)
+                itemconfig(cells[-1], fill=GRADE_COLORS[student.grade])
+                picked = self.selected is not None and student.number == self.selected.number
+                fill = '#2d2b55' if picked else '#1a1a2e' if (self.top + row) % 2 else '#16213e'
+            else:
+                for cell in cells:
+                    itemconfig(cell, text="")
+                fill = '#1a1a2e'
+            itemconfig(self.row_boxes[row], fill=fill)
+        
+        # Scrollbar thumb: the visible part of the whole list
+        if self.view_length:
+            self.scrollbar.set(self.top / self.view_length,
+                               min(1.0, (self.top + VISIBLE_ROWS) / self.view_length))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        self.record_frame('render', started)
+    
+    def click_row(self, event):
+        """Show the record of the student whose row was clicked"""
+        self.table.focus_set()  # For the arrow and page keys
+        row = event.y // ROW_HEIGHT
+        students = self.visible_students() if self.store is not None else []
+        if 0 <= row < len(students):
+            self.select(students[row])
+    
+    def select(self, student):
+        """Show one student's record under the table"""
+        self.selected = student
+        message = next(message for _, grade, message in GRADE_BANDS if grade == student.grade)
+        self.detail_label.config(text=f"{format_student(student)}   {message}",
+                                 fg=GRADE_COLORS[student.grade])
+        self.render()
+    
+    def show_extreme(self, highest):
+        """Show the student with the highest (or lowest) overall mark"""
+        if self.store is None or not len(self.store):
+            return
+        self.select(self.store.ranked(0, 1, descending=highest)[0])
+
+# Main function to run the program
+def main():
+    # An optional marks file to open instead of studentMarks.txt
+    marks_path = sys.argv[1] if len(sys.argv) > 1 else None
+    root = tk.Tk()  # Create main window
+    app = StudentManagerApp(root, marks_path)  # Create application instance
+    root.mainloop()  # Start the GUI event loop
+
+# Run the program when script is executed
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,266 @@
+"""
+Benchmarks for the Student Manager
+
+Run from this folder, e.g.
+    python benchmark.py summary --rows 1000000
+    python benchmark.py records --rows 1000000
+    python benchmark.py parallel --rows 4000000 --workers 8
+    python benchmark.py gui --rows 1000000
+"""
+
+import argparse
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import student_records
+from student_records import parse_line, split_ranges, summarise, summarise_parallel
+from student_store import StudentStore
+
+FIRST_NAMES = ["John", "Sam", "Lee", "Matt", "Ron", "Jake", "Jo", "Gareth", "Alan", "Les",
+               "Amira", "Priya", "Chen", "Olu", "Niamh", "Tomasz", "Sofia", "Kwame"]
+LAST_NAMES = ["Curry", "Sturtivant", "Scott", "Thompson", "Herrema", "Hobbs", "Hyde",
+              "Southgate", "Shearer", "Ferdinand", "Okafor", "Patel", "Wei", "Byrne", "Nowak"]
+
+
+def generate_marks(path, rows, seed=1):
+    """Write a studentMarks.txt style file with the given number of rows"""
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(f"{rows}\n")
+        lines = []
+        for row in range(rows):
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            lines.append(f"{1000 + row},{name},{rng.randint(0, 20)},{rng.randint(0, 20)},"
+                         f"{rng.randint(0, 20)},{rng.randint(0, 100)}\n")
+            if len(lines) == 10_000:
+                file.writelines(lines)
+                lines = []
+        file.writelines(lines)
+
+
+def measure_summary(path, backend):
+    """Child process: one summary pass, print seconds, peak RSS (MB) and the result"""
+    if backend == 'python':
+        # Pretend NumPy is missing so the plain loops are used
+        student_records._numpy_checked = True
+    start = time.perf_counter()
+    summary = summarise(path)
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{elapsed} {peak_mb}")
+    print(repr(summary_result(summary)))
+
+
+def bench_summary(rows):
+    """Single-pass summary per backend, each in a fresh process"""
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, "studentMarks.txt")
+    generate_marks(path, rows)
+    print(f"{rows:,} rows ({os.path.getsize(path) / 1024 / 1024:.1f} MB)")
+    
+    try:
+        results = {}
+        for backend in ('python', 'numpy'):
+            child = subprocess.run([sys.executable, __file__, '_summary', path, backend],
+                                   capture_output=True, text=True, check=True)
+            timing, results[backend] = child.stdout.split('\n', 1)
+            elapsed, peak_mb = (float(value) for value in timing.split())
+            print(f"{backend:>7}: {elapsed:6.2f} s, {rows / elapsed:12,.0f} rows/sec, "
+                  f"{peak_mb:6.1f} MB peak RSS")
+        print(f"same results: {results['python'] == results['numpy']}")
+    finally:
+        os.remove(path)
+        os.rmdir(folder)
+
+
+def summary_result(summary):
+    """Everything a summary reports, for comparing two summaries"""
+    return (summary.count, summary.skipped, summary.average_percentage(), summary.best(),
+            summary.worst(), summary.bands())
+
+
+def bench_parallel(rows, max_workers):
+    """summarise_parallel() with 1, 2, 4 ... max_workers processes"""
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, "studentMarks.txt")
+    generate_marks(path, rows)
+    print(f"{rows:,} rows ({os.path.getsize(path) / 1024 / 1024:.1f} MB), "
+          f"{os.cpu_count()} CPUs")
+    
+    counts = [1]
+    while counts[-1] * 2 < max_workers:
+        counts.append(counts[-1] * 2)
+    if max_workers > 1:
+        counts.append(max_workers)
+    
+    try:
+        # Untimed pass so the file is in the page cache and NumPy is loaded
+        summarise(path)
+        start = time.perf_counter()
+        expected = summary_result(summarise(path))
+        single = time.perf_counter() - start
+        print(f"summarise():        {single:6.2f} s")
+        for workers in counts:
+            start = time.perf_counter()
+            result = summary_result(summarise_parallel(path, workers=workers))
+            elapsed = time.perf_counter() - start
+            print(f"{workers:>2} worker(s) ({len(split_ranges(path, workers))} ranges): "
+                  f"{elapsed:6.2f} s, {single / elapsed:5.2f}x, same results: {result == expected}")
+    finally:
+        os.remove(path)
+        os.rmdir(folder)
+
+
+def per_call_us(fn, args_list):
+    """Average microseconds per call of fn over a list of argument tuples"""
+    start = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    return (time.perf_counter() - start) / len(args_list) * 1e6
+
+
+def scan_for(path, number):
+    """What a lookup costs without an index: read the file until the number turns up"""
+    with open(path, 'rb') as file:
+        for line in file:
+            row = parse_line(line)
+            if row is not None and row[0] == number:
+                return row
+    return None
+
+
+def bench_records(rows, operations=20_000):
+    """Load, lookups, changes, sorted pages and compaction on a StudentStore"""
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, "studentMarks.txt")
+    generate_marks(path, rows)
+    print(f"{rows:,} rows ({os.path.getsize(path) / 1024 / 1024:.1f} MB)")
+    rng = random.Random(2)
+    
+    try:
+        start = time.perf_counter()
+        store = StudentStore(path)
+        print(f"load:            {time.perf_counter() - start:8.2f} s")
+        
+        numbers = [(1000 + rng.randrange(rows),) for _ in range(operations)]
+        start = time.perf_counter()
+        scan_for(path, 1000 + rows - 1)
+        print(f"scan lookup:     {(time.perf_counter() - start) * 1e6:10,.0f} us (last row, no index)")
+        print(f"get:             {per_call_us(store.get, numbers):10.2f} us")
+        names = [(f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",) for _ in range(100)]
+        print(f"find_name:       {per_call_us(store.find_name, names):10,.0f} us "
+              f"(~{rows // (len(FIRST_NAMES) * len(LAST_NAMES)):,} matches each)")
+        print(f"rank:            {per_call_us(store.rank, numbers):10.2f} us")
+        pages = [(rng.randrange(rows), 50, rng.random() < 0.5) for _ in range(operations // 10)]
+        print(f"ranked page/50:  {per_call_us(store.ranked, pages):10.2f} us")
+        
+        new = [(1000 + rows + i, "New Student", (rng.randint(0, 20), rng.randint(0, 20),
+                                                 rng.randint(0, 20)), rng.randint(0, 100))
+               for i in range(operations)]
+        print(f"add:             {per_call_us(store.add, new):10.2f} us")
+        changes = [(number, None, None, rng.randint(0, 100)) for number, in numbers]
+        print(f"update:          {per_call_us(store.update, changes):10.2f} us")
+        doomed = [(number,) for number, *_ in new]
+        print(f"delete:          {per_call_us(store.delete, doomed):10.2f} us")
+        
+        order = [list(bucket) for bucket in store.by_overall]
+        journal_size = os.path.getsize(store.journal_path)
+        store.close()
+        del store
+        
+        start = time.perf_counter()
+        reloaded = StudentStore(path)
+        print(f"reload+journal:  {time.perf_counter() - start:8.2f} s "
+              f"({reloaded.journal_entries:,} entries, {journal_size / 1024:.0f} KB)")
+        start = time.perf_counter()
+        reloaded.compact()
+        print(f"compact:         {time.perf_counter() - start:8.2f} s")
+        reloaded.close()
+        del reloaded
+        same = [list(bucket) for bucket in StudentStore(path).by_overall] == order
+        print(f"same order after reload and compact: {same}")
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"peak RSS:        {peak_mb:8.1f} MB")
+    finally:
+        for name in os.listdir(folder):
+            os.remove(os.path.join(folder, name))
+        os.rmdir(folder)
+
+
+def bench_gui(rows, scrolls=500):
+    """Main-thread time per redraw and per re-sort in the real window
+    
+    Needs a display. Scrolls to random places, then sorts by each column
+    both ways and searches, waiting for the worker each time.
+    """
+    import tkinter as tk
+    from Index import StudentManagerApp
+    
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, "studentMarks.txt")
+    generate_marks(path, rows)
+    rng = random.Random(3)
+    
+    root = tk.Tk()
+    app = StudentManagerApp(root, path)
+    app.frame_times = []
+    steps = [lambda: app.scroll_to(rng.randrange(rows)) for _ in range(scrolls)]
+    for sort_key in ('name', 'name', 'number', 'number', 'overall', 'overall'):
+        steps.append(lambda sort_key=sort_key: app.sort_by(sort_key))
+    steps.append(lambda: (app.search_var.set("scott"), app.search()))
+    
+    def next_step():
+        # Wait for loading or the last sort to finish, then do the next thing
+        if app.store is None or app.busy:
+            root.after(5, next_step)
+        elif steps:
+            steps.pop(0)()
+            root.after(1, next_step)
+        else:
+            root.quit()
+    
+    start = time.perf_counter()
+    root.after(5, next_step)
+    root.mainloop()
+    root.destroy()
+    os.remove(path)
+    os.rmdir(folder)
+    
+    print(f"{rows:,} rows, {time.perf_counter() - start:.1f} s including loading")
+    by_kind = {}
+    for kind, seconds in app.frame_times:
+        by_kind.setdefault(kind, []).append(seconds * 1000)
+    for kind, times in by_kind.items():
+        times.sort()
+        print(f"{kind:>8}: {len(times):4} times, median {times[len(times) // 2]:6.2f} ms, "
+              f"max {times[-1]:6.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Student Manager benchmarks")
+    parser.add_argument('which', choices=['summary', 'records', 'parallel', 'gui', '_summary'])
+    parser.add_argument('args', nargs='*')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="most worker processes for the parallel benchmark")
+    args = parser.parse_args()
+    
+    if args.which == 'summary':
+        bench_summary(args.rows)
+    elif args.which == 'records':
+        bench_records(args.rows)
+    elif args.which == 'parallel':
+        bench_parallel(args.rows, args.workers)
+    elif args.which == 'gui':
+        bench_gui(args.rows)
+    elif args.which == '_summary':
+        measure_summary(*args.args)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,422 @@
+"""
+Student marks processing for the Student Manager
+
+studentMarks.txt starts with a line holding the number of students,
+then has one 'number,name,cw1,cw2,cw3,exam' line per student: three
+pieces of coursework out of 20 and an exam out of 100.
+
+read_batches() streams the file in fixed-size batches of numeric
+arrays, so memory use stays the same however many rows there are.
+MarksSummary works out totals, percentages and grades one batch at a
+time, keeping only:
+- counts and sums
+- the lowest/highest mark in each grade band
+- the top and bottom N students
+Summaries of different parts of a file can be merged, which is how
+summarise_parallel() shares a big file between worker processes.
+NumPy is used for the batch maths when it is installed.
+"""
+
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+from array import array
+from collections import namedtuple
+from pathlib import Path
+
+# The marks file that ships with the Student Manager
+MARKS_PATH = Path(__file__).with_name("studentMarks.txt")
+
+# Marks available: 3 x 20 coursework + 100 exam
+PIECE_MAX = 20
+COURSEWORK_MAX = 3 * PIECE_MAX
+EXAM_MAX = 100
+TOTAL_MAX = COURSEWORK_MAX + EXAM_MAX
+
+# Grade bands: (minimum percentage, grade, message), highest first - the
+# same layout as the Maths Quiz bands, with the Exercise 3 thresholds
+GRADE_BANDS = (
+    (70, "A", "Excellent Work! 🎯"),
+    (60, "B", "Good Job! 👍"),
+    (50, "C", "Keep Practicing! 📚"),
+    (40, "D", "Nearly There! 💪"),
+    (0, "F", "Try Again! 📖")
+)
+GRADES = tuple(grade for _, grade, _ in GRADE_BANDS)
+
+# The bands as minimum overall marks out of 160 (70% -> 112 and so on), so
+# a whole batch is graded with integer comparisons only
+BAND_MIN_MARKS = tuple(-(-minimum * TOTAL_MAX // 100) for minimum, _, _ in GRADE_BANDS)
+
+# Rows read per batch
+BATCH_SIZE = 1 << 16
+
+# Files smaller than this are not worth starting worker processes for
+PARALLEL_MIN_BYTES = 4 << 20
+
+# Ranking keys pack the overall mark above the byte offset of the row, so
+# every key is unique and equal marks go to whoever comes first in the file
+OFFSET_BITS = 47
+OFFSET_LIMIT = 1 << OFFSET_BITS
+
+# One student's results, as shown by the Student Manager
+Student = namedtuple('Student', 'number name coursework exam overall percentage grade')
+
+# Student numbers are kept in 32-bit arrays
+NUMBER_LIMIT = 2 ** 31
+
+# A batch of rows: byte offsets, student numbers, names, coursework totals, exam marks
+MarksBatch = namedtuple('MarksBatch', 'offsets numbers names coursework exam skipped')
+
+# NumPy is loaded by the first batch that gets summarised
+np = None
+_numpy_checked = False
+
+
+def load_numpy():
+    """Import NumPy the first time a batch needs it (None if not installed)"""
+    global np, _numpy_checked
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            # NumPy is optional - plain loops give exactly the same results
+            pass
+    return np
+
+
+def grade_for(percentage):
+    """Return (grade, message) for an overall percentage"""
+    for min_percentage, grade, message in GRADE_BANDS:
+        if percentage >= min_percentage:
+            return grade, message
+    return GRADE_BANDS[-1][1], GRADE_BANDS[-1][2]
+
+
+def band_index(overall):
+    """Position in GRADE_BANDS for an overall mark out of 160"""
+    for index, min_marks in enumerate(BAND_MIN_MARKS):
+        if overall >= min_marks:
+            return index
+    return len(BAND_MIN_MARKS) - 1
+
+
+def make_student(number, name, coursework, exam):
+    """Build a Student with the overall mark, percentage and grade filled in"""
+    overall = coursework + exam
+    return Student(number, name, coursework, exam, overall,
+                   overall * 100 / TOTAL_MAX, GRADES[band_index(overall)])
+
+
+def parse_line(line, pieces=False):
+    """(number, name, coursework total, exam) from a row, or None if it is not one
+    
+    With pieces=True the three coursework marks come back separately:
+    (number, name, cw1, cw2, cw3, exam).
+    """
+    # Called for every row, so it is kept to plain unpacking and comparisons
+    try:
+        number, name, cw1, cw2, cw3, exam = line.split(b',')
+        number = int(number)
+        cw1 = int(cw1)
+        cw2 = int(cw2)
+        cw3 = int(cw3)
+        exam = int(exam)
+    except ValueError:
+        # Wrong number of fields, or a mark that is not a number
+        return None
+    if not (0 <= cw1 <= PIECE_MAX and 0 <= cw2 <= PIECE_MAX and 0 <= cw3 <= PIECE_MAX
+            and 0 <= exam <= EXAM_MAX and 0 <= number < NUMBER_LIMIT):
+        return None
+    name = name.decode('utf-8', errors='replace').strip()
+    if pieces:
+        return number, name, cw1, cw2, cw3, exam
+    return number, name, cw1 + cw2 + cw3, exam
+
+
+def read_header(path):
+    """The student count from the first line, or None if there is none"""
+    with open(path, 'rb') as file:
+        first = file.readline().strip()
+    return int(first) if first.isdigit() else None
+
+
+def read_batches(path, batch_size=BATCH_SIZE, start=0, end=None):
+    """Yield MarksBatch objects for the rows starting in [start, end)
+    
+    start must be the beginning of a line. The count line and blank
+    lines are passed over; other lines that are not valid rows are
+    counted in skipped.
+    """
+    def empty():
+        return array('q'), array('i'), [], array('h'), array('h')
+    
+    offsets, numbers, names, coursework, exam = empty()
+    skipped = 0
+    with open(path, 'rb') as file:
+        file.seek(start)
+        offset = start
+        for line in file:
+            if end is not None and offset >= end:
+                break
+            row = parse_line(line)
+            if row is not None:
+                offsets.append(offset)
+                numbers.append(row[0])
+                names.append(row[1])
+                coursework.append(row[2])
+                exam.append(row[3])
+                if len(numbers) == batch_size:
+                    yield MarksBatch(offsets, numbers, names, coursework, exam, skipped)
+                    offsets, numbers, names, coursework, exam = empty()
+                    skipped = 0
+            elif line.strip() and not (offset == 0 and line.strip().isdigit()):
+                skipped += 1
+            offset += len(line)
+    
+    if numbers or skipped:
+        yield MarksBatch(offsets, numbers, names, coursework, exam, skipped)
+
+
+class MarksSummary:
+    """Running totals, grade bands and top/bottom N over any number of batches"""
+    
+    def __init__(self, top=5, bottom=5):
+        self.top_n = top
+        self.bottom_n = bottom
+        self.count = 0
+        self.skipped = 0
+        self.coursework_total = 0
+        self.exam_total = 0
+        
+        # Per grade band: students, sum of overall marks, lowest and highest mark
+        self.band_counts = [0] * len(GRADES)
+        self.band_totals = [0] * len(GRADES)
+        self.band_lowest = [None] * len(GRADES)
+        self.band_highest = [None] * len(GRADES)
+        
+        # Min-heaps of (key, number, name, coursework, exam) holding the N
+        # largest keys - for the top, key grows with the mark; for the bottom
+        # it grows as the mark falls
+        self.top = []
+        self.bottom = []
+    
+    def add(self, batch):
+        """Fold one MarksBatch into the summary"""
+        self.skipped += batch.skipped
+        if not batch.numbers:
+            return
+        if load_numpy() is not None:
+            self._add_numpy(batch)
+        else:
+            self._add_python(batch)
+    
+    def _add_python(self, batch):
+        """Plain loop over the rows of a batch"""
+        push = self._push
+        for row in range(len(batch.numbers)):
+            coursework, exam = batch.coursework[row], batch.exam[row]
+            overall = coursework + exam
+            band = band_index(overall)
+            self._add_to_band(band, 1, overall, overall, overall)
+            
+            tie_break = OFFSET_LIMIT - 1 - batch.offsets[row]
+            entry = (batch.numbers[row], batch.names[row], coursework, exam)
+            push(self.top, self.top_n, overall << OFFSET_BITS | tie_break, entry)
+            push(self.bottom, self.bottom_n, (TOTAL_MAX - overall) << OFFSET_BITS | tie_break, entry)
+            
+            self.coursework_total += coursework
+            self.exam_total += exam
+        self.count += len(batch.numbers)
+    
+    def _add_numpy(self, batch):
+        """Vectorised version of _add_python"""
+        coursework = np.frombuffer(batch.coursework, dtype=np.int16).astype(np.int64)
+        exam = np.frombuffer(batch.exam, dtype=np.int16).astype(np.int64)
+        overall = coursework + exam
+        
+        # Band number = how many band minimums the mark falls below
+        bands = np.zeros(len(overall), dtype=np.int64)
+        for min_marks in BAND_MIN_MARKS[:-1]:
+            bands += overall < min_marks
+        counts = np.bincount(bands, minlength=len(GRADES))
+        totals = np.bincount(bands, weights=overall, minlength=len(GRADES))
+        for band in np.flatnonzero(counts):
+            in_band = overall[bands == band]
+            self._add_to_band(int(band), int(counts[band]), int(totals[band]),
+                              int(in_band.min()), int(in_band.max()))
+        
+        # Only the best/worst N of the batch can make it into the heaps
+        tie_break = OFFSET_LIMIT - 1 - np.frombuffer(batch.offsets, dtype=np.int64)
+        for heap, size, keys in ((self.top, self.top_n, overall << OFFSET_BITS | tie_break),
+                                 (self.bottom, self.bottom_n,
+                                  (TOTAL_MAX - overall) << OFFSET_BITS | tie_break)):
+            if size <= 0:
+                continue
+            rows = np.argpartition(keys, -size)[-size:] if len(keys) > size else range(len(keys))
+            for row in rows:
+                row = int(row)
+                entry = (batch.numbers[row], batch.names[row],
+                         batch.coursework[row], batch.exam[row])
+                self._push(heap, size, int(keys[row]), entry)
+        
+        self.coursework_total += int(coursework.sum())
+        self.exam_total += int(exam.sum())
+        self.count += len(overall)
+    
+    @staticmethod
+    def _push(heap, size, key, entry):
+        """Keep the `size` largest keys in a min-heap"""
+        if len(heap) < size:
+            heapq.heappush(heap, (key,) + entry)
+        elif size and key > heap[0][0]:
+            heapq.heapreplace(heap, (key,) + entry)
+    
+    def _add_to_band(self, band, count, total, lowest, highest):
+        self.band_counts[band] += count
+        self.band_totals[band] += total
+        if self.band_lowest[band] is None or lowest < self.band_lowest[band]:
+            self.band_lowest[band] = lowest
+        if self.band_highest[band] is None or highest > self.band_highest[band]:
+            self.band_highest[band] = highest
+    
+    def merge(self, other):
+        """Fold in a summary of another part of the file"""
+        self.count += other.count
+        self.skipped += other.skipped
+        self.coursework_total += other.coursework_total
+        self.exam_total += other.exam_total
+        for band in range(len(GRADES)):
+            if other.band_counts[band]:
+                self._add_to_band(band, other.band_counts[band], other.band_totals[band],
+                                  other.band_lowest[band], other.band_highest[band])
+        for key, *entry in other.top:
+            self._push(self.top, self.top_n, key, tuple(entry))
+        for key, *entry in other.bottom:
+            self._push(self.bottom, self.bottom_n, key, tuple(entry))
+        return self
+    
+    def average_percentage(self):
+        """Average overall percentage of every student counted"""
+        if not self.count:
+            return 0.0
+        return (self.coursework_total + self.exam_total) * 100 / (self.count * TOTAL_MAX)
+    
+    def best(self):
+        """The top N students, highest overall mark first"""
+        return [make_student(*entry) for _, *entry in sorted(self.top, reverse=True)]
+    
+    def worst(self):
+        """The bottom N students, lowest overall mark first"""
+        return [make_student(*entry) for _, *entry in sorted(self.bottom, reverse=True)]
+    
+    def bands(self):
+        """Per grade: (grade, students, average %, lowest %, highest %)"""
+        report = []
+        for band, grade in enumerate(GRADES):
+            count = self.band_counts[band]
+            if count:
+                report.append((grade, count,
+                               self.band_totals[band] * 100 / (count * TOTAL_MAX),
+                               self.band_lowest[band] * 100 / TOTAL_MAX,
+                               self.band_highest[band] * 100 / TOTAL_MAX))
+            else:
+                report.append((grade, 0, 0.0, None, None))
+        return report
+
+
+def summarise(path=MARKS_PATH, top=5, bottom=5, batch_size=BATCH_SIZE):
+    """One pass over a marks file: totals, grade bands, top and bottom N"""
+    return summarise_range(path, 0, None, top, bottom, batch_size)
+
+
+def split_ranges(path, parts):
+    """Cut a file into up to `parts` (start, end) byte ranges that begin on line starts"""
+    size = os.path.getsize(path)
+    starts = [0]
+    with open(path, 'rb') as file:
+        for part in range(1, parts):
+            # Move each cut on to the start of the next line
+            file.seek(max(size * part // parts - 1, starts[-1]))
+            file.readline()
+            position = file.tell()
+            if position >= size:
+                break
+            if position > starts[-1]:
+                starts.append(position)
+    return list(zip(starts, starts[1:] + [size]))
+
+
+def summarise_range(path, start, end, top=5, bottom=5, batch_size=BATCH_SIZE):
+    """Summary of the rows starting in [start, end) - run in a worker process"""
+    summary = MarksSummary(top, bottom)
+    for batch in read_batches(path, batch_size, start, end):
+        summary.add(batch)
+    return summary
+
+
+def summarise_parallel(path=MARKS_PATH, top=5, bottom=5, workers=None, batch_size=BATCH_SIZE):
+    """summarise() shared out over worker processes, one byte range each
+    
+    Gives exactly the same summary as summarise(): the counts and sums
+    are whole numbers, and every ranking key is unique, so merging the
+    parts cannot change the result.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or os.path.getsize(path) < PARALLEL_MIN_BYTES:
+        return summarise(path, top, bottom, batch_size)
+    
+    summary = MarksSummary(top, bottom)
+    ranges = split_ranges(path, workers)
+    with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+        parts = [pool.submit(summarise_range, path, start, end, top, bottom, batch_size)
+                 for start, end in ranges]
+        # Merged in file order, though any order gives the same summary
+        for part in parts:
+            summary.merge(part.result())
+    return summary
+
+
+def format_student(student):
+    """One line of output for a student, as in 'View all student records'"""
+    return (f"{student.name:<20} {student.number:>6}  coursework {student.coursework:>2}/60  "
+            f"exam {student.exam:>3}/100  {student.percentage:6.2f}%  {student.grade}")
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Summarise a student marks file")
+    parser.add_argument('path', nargs='?', default=MARKS_PATH)
+    parser.add_argument('--top', type=int, default=5, help="students to list at each end")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="processes to share the file between (0 = one per CPU)")
+    args = parser.parse_args()
+    
+    summary = summarise_parallel(args.path, args.top, args.top, args.workers or None)
+    declared = read_header(args.path)
+    print(f"Students: {summary.count:,}" +
+          (f" (count line says {declared:,})" if declared not in (None, summary.count) else ""))
+    if summary.skipped:
+        print(f"Skipped {summary.skipped:,} lines that are not student records")
+    print(f"Average percentage: {summary.average_percentage():.2f}%")
+    
+    print("\nHighest overall marks:")
+    for student in summary.best():
+        print("  " + format_student(student))
+    print("\nLowest overall marks:")
+    for student in summary.worst():
+        print("  " + format_student(student))
+    
+    print("\nGrade bands:")
+    for grade, count, average, lowest, highest in summary.bands():
+        if count:
+            print(f"  {grade}: {count:>9,} students, average {average:6.2f}%, "
+                  f"range {lowest:.2f}-{highest:.2f}%")
+        else:
+            print(f"  {grade}: {count:>9,} students")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
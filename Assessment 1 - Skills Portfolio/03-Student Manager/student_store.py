@@ -0,0 +1,367 @@
+"""
+Student records with indexes for the Student Manager
+
+StudentStore loads studentMarks.txt once and keeps two indexes over it:
+- a dict from student number to the record's slot (hash lookups)
+- one sorted array of student numbers per overall mark (0-160), so
+  the class sorted by overall mark is read straight off the buckets
+  in either direction, without sorting anything per request
+
+Changes are not written back by rewriting the whole marks file. Each
+add, update or delete appends one line to a journal next to it
+(studentMarks.journal): a normal record line replaces or adds that
+student, '-number' deletes one. Loading replays the journal over the
+marks file. Once the journal gets long compared to the class, it is
+compacted: the marks file is rewritten once with every change applied
+and the journal is emptied.
+"""
+
+import heapq
+import os
+from array import array
+from bisect import bisect_left, insort
+
+from student_records import MARKS_PATH, TOTAL_MAX, make_student, parse_line
+
+# Compact once the journal has this many entries and is a quarter of the class
+COMPACT_MIN = 1024
+COMPACT_RATIO = 4
+
+# select() works in pieces this long (sorting each one, then merging), so
+# a worker thread never holds the GIL - and the window - for more than a
+# few ms at a time
+SORT_CHUNK = 1 << 13
+
+# Orders select() can put the students in
+SORT_KEYS = ('overall', 'name', 'number')
+
+
+def journal_path_for(marks_path):
+    """Where the journal for a marks file is kept (next to it)"""
+    return os.path.splitext(marks_path)[0] + '.journal'
+
+
+def format_row(number, name, cw1, cw2, cw3, exam):
+    """A record as a line of the marks file"""
+    return f"{number},{name},{cw1},{cw2},{cw3},{exam}\n"
+
+
+def sorted_in_chunks(items, key=None, reverse=False):
+    """sorted(items), done as short sorts and a merge"""
+    chunks = [sorted(items[start:start + SORT_CHUNK], key=key, reverse=reverse)
+              for start in range(0, len(items), SORT_CHUNK)]
+    return list(heapq.merge(*chunks, key=key, reverse=reverse))
+
+
+def release(items):
+    """Empty a big list a piece at a time - freeing a million ints in one
+    go would hold the GIL for tens of ms too"""
+    while items:
+        del items[-SORT_CHUNK:]
+
+
+def to_array(items):
+    """array('i', items), emptying items as it goes"""
+    result = array('i')
+    for start in range(0, len(items), SORT_CHUNK):
+        result.extend(items[start:start + SORT_CHUNK])
+    release(items)
+    return result
+
+
+class StudentStore:
+    """Student records with lookup by number or name and a by-mark order"""
+    
+    def __init__(self, path=MARKS_PATH, journal_path=None):
+        self.path = os.fspath(path)
+        self.journal_path = journal_path or journal_path_for(self.path)
+        self.journal = None           # opened on the first change
+        self.journal_entries = 0
+        
+        # Records by slot, in file order: deleted slots keep number -1
+        # until the next compaction
+        self.numbers = array('i')
+        self.names = []
+        self.marks = array('B')       # cw1, cw2, cw3, exam for each slot
+        self.slots = {}               # student number -> slot
+        self.by_name = {}             # casefolded name -> student numbers
+        self.by_overall = None        # built once the records are loaded
+        self.skipped = 0
+        self._load()
+    
+    def _load(self):
+        """Read the marks file, replay the journal, then build the mark buckets"""
+        with open(self.path, 'rb') as file:
+            for line_number, line in enumerate(file):
+                row = parse_line(line, pieces=True)
+                if row is not None:
+                    self._put(*row)
+                elif line.strip() and not (line_number == 0 and line.strip().isdigit()):
+                    self.skipped += 1
+        
+        try:
+            with open(self.journal_path, 'rb') as file:
+                for line in file:
+                    self._replay(line)
+                    self.journal_entries += 1
+        except FileNotFoundError:
+            pass
+        
+        # Bucket the numbers by overall mark, then sort each bucket once
+        buckets = [[] for _ in range(TOTAL_MAX + 1)]
+        numbers, marks = self.numbers, self.marks
+        for slot, number in enumerate(numbers):
+            if number >= 0:
+                buckets[sum(marks[4 * slot:4 * slot + 4])].append(number)
+        self.by_overall = [array('i', sorted(bucket)) for bucket in buckets]
+    
+    def _replay(self, line):
+        """Apply one journal line"""
+        if line.startswith(b'-'):
+            try:
+                self._remove(int(line[1:]))
+            except (KeyError, ValueError):
+                pass  # Already gone, e.g. replayed again after a compaction
+        else:
+            row = parse_line(line, pieces=True)
+            if row is not None:
+                self._put(*row)
+    
+    def _put(self, number, name, cw1, cw2, cw3, exam):
+        """Add a record, or replace the one with the same number"""
+        slot = self.slots.get(number)
+        if slot is None:
+            slot = self.slots[number] = len(self.numbers)
+            self.numbers.append(number)
+            self.names.append(name)
+            self.marks.extend((cw1, cw2, cw3, exam))
+            self._index_name(number, name)
+            self._index_overall(number, cw1 + cw2 + cw3 + exam)
+            return
+        
+        # Only move the student in the indexes that the change affects
+        old_name, old_overall = self.names[slot], self.overall(slot)
+        if name.casefold() != old_name.casefold():
+            self._unindex_name(number, old_name)
+            self._index_name(number, name)
+        if cw1 + cw2 + cw3 + exam != old_overall:
+            self._unindex_overall(number, old_overall)
+            self._index_overall(number, cw1 + cw2 + cw3 + exam)
+        self.names[slot] = name
+        self.marks[4 * slot:4 * slot + 4] = array('B', (cw1, cw2, cw3, exam))
+    
+    def _remove(self, number):
+        slot = self.slots.pop(number)
+        self._unindex_name(number, self.names[slot])
+        self._unindex_overall(number, self.overall(slot))
+        self.numbers[slot] = -1
+        self.names[slot] = None
+    
+    def _index_name(self, number, name):
+        self.by_name.setdefault(name.casefold(), []).append(number)
+    
+    def _unindex_name(self, number, name):
+        key = name.casefold()
+        same_name = self.by_name[key]
+        same_name.remove(number)
+        if not same_name:
+            del self.by_name[key]
+    
+    def _index_overall(self, number, overall):
+        # The buckets are built in one go at the end of loading
+        if self.by_overall is not None:
+            insort(self.by_overall[overall], number)
+    
+    def _unindex_overall(self, number, overall):
+        if self.by_overall is not None:
+            bucket = self.by_overall[overall]
+            del bucket[bisect_left(bucket, number)]
+    
+    def overall(self, slot):
+        """Overall mark out of 160 of the record in a slot"""
+        return sum(self.marks[4 * slot:4 * slot + 4])
+    
+    def __len__(self):
+        return len(self.slots)
+    
+    def __contains__(self, number):
+        return number in self.slots
+    
+    def record(self, number):
+        """(number, name, cw1, cw2, cw3, exam) for a student number, or None"""
+        slot = self.slots.get(number)
+        if slot is None:
+            return None
+        return (number, self.names[slot]) + tuple(self.marks[4 * slot:4 * slot + 4])
+    
+    def get(self, number):
+        """The Student with this number, or None"""
+        slot = self.slots.get(number)
+        if slot is None:
+            return None
+        cw1, cw2, cw3, exam = self.marks[4 * slot:4 * slot + 4]
+        return make_student(number, self.names[slot], cw1 + cw2 + cw3, exam)
+    
+    def find_name(self, name):
+        """Every Student with this name (case is ignored)"""
+        return [self.get(number) for number in self.by_name.get(name.strip().casefold(), [])]
+    
+    def add(self, number, name, coursework, exam):
+        """Add a new student; coursework is the three marks out of 20"""
+        if number in self.slots:
+            raise KeyError(f"Student {number} already exists")
+        self._change(self._check(number, name, *coursework, exam))
+    
+    def update(self, number, name=None, coursework=None, exam=None):
+        """Change some of a student's details - anything left as None stays"""
+        record = self.record(number)
+        if record is None:
+            raise KeyError(f"No student with number {number}")
+        _, old_name, *old_coursework, old_exam = record
+        self._change(self._check(number,
+                                 old_name if name is None else name,
+                                 *(old_coursework if coursework is None else coursework),
+                                 old_exam if exam is None else exam))
+    
+    def delete(self, number):
+        """Remove a student"""
+        if number not in self.slots:
+            raise KeyError(f"No student with number {number}")
+        self._remove(number)
+        self._log(f"-{number}\n")
+    
+    @staticmethod
+    def _check(number, name, cw1, cw2, cw3, exam):
+        """The record as it will be saved; ValueError if it cannot be saved"""
+        line = format_row(number, name, cw1, cw2, cw3, exam)
+        # Read it back with the file's own rules (marks in range, no commas
+        # in the name and so on)
+        row = parse_line(line.encode('utf-8'), pieces=True) if line.count('\n') == 1 else None
+        if row is None or not row[1]:
+            raise ValueError(f"Not a valid student record: {line.strip()!r}")
+        return row
+    
+    def _change(self, row):
+        self._put(*row)
+        self._log(format_row(*row))
+    
+    def _log(self, entry):
+        """Append a change to the journal, compacting when it has grown long"""
+        if self.journal is None:
+            self.journal = open(self.journal_path, 'a', encoding='utf-8')
+        self.journal.write(entry)
+        self.journal.flush()
+        self.journal_entries += 1
+        if self.journal_entries >= max(COMPACT_MIN, len(self) // COMPACT_RATIO):
+            self.compact()
+    
+    def compact(self):
+        """Rewrite the marks file with every change applied and empty the journal"""
+        numbers, names, marks = self.numbers, self.names, self.marks
+        # Write to a temporary name first so a half-written file is never used
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                file.write(f"{len(self)}\n")
+                file.writelines(format_row(number, names[slot], *marks[4 * slot:4 * slot + 4])
+                                for slot, number in enumerate(numbers) if number >= 0)
+            os.replace(temp_path, self.path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        
+        # If this stops before the journal is emptied, replaying it again
+        # next time just repeats changes already in the file
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        open(self.journal_path, 'w').close()
+        self.journal_entries = 0
+        
+        # Drop the deleted slots
+        if len(numbers) != len(self):
+            live = [slot for slot, number in enumerate(numbers) if number >= 0]
+            self.numbers = array('i', (numbers[slot] for slot in live))
+            self.names = [names[slot] for slot in live]
+            self.marks = array('B')
+            for slot in live:
+                self.marks.extend(marks[4 * slot:4 * slot + 4])
+            self.slots = {number: slot for slot, number in enumerate(self.numbers)}
+    
+    def _buckets(self, descending):
+        return reversed(self.by_overall) if descending else iter(self.by_overall)
+    
+    def ranked(self, start=0, count=None, descending=True):
+        """Students in order of overall mark, from position start on
+        
+        Equal marks are in student-number order either way. Finding the
+        start only walks the 161 mark buckets, so any page of the class
+        costs about the same.
+        """
+        page = []
+        for bucket in self._buckets(descending):
+            if start >= len(bucket):
+                start -= len(bucket)
+                continue
+            stop = None if count is None else start + count - len(page)
+            page.extend(self.get(number) for number in bucket[start:stop])
+            start = 0
+            if count is not None and len(page) >= count:
+                break
+        return page
+    
+    def select(self, sort_key='overall', descending=True, query=''):
+        """Student numbers in sort_key order, keeping only the students whose
+        name contains query or whose number starts with it
+        
+        By overall mark this reads the buckets (equal marks in number order,
+        as in ranked()); by name or number it sorts (equal names in file
+        order). Either way it can take a second or more on a big class, so
+        the viewer runs it on a worker thread. The result is an array, which
+        is freed in one go when the viewer drops it.
+        """
+        numbers, names, slots = self.numbers, self.names, self.slots
+        query = query.strip().casefold()
+        by_number = query.isdigit()
+        
+        def matches(number, name):
+            return query in name.casefold() or (by_number and str(number).startswith(query))
+        
+        if sort_key == 'overall':
+            buckets = reversed(self.by_overall) if descending else self.by_overall
+            if not query:
+                return to_array([number for bucket in buckets for number in bucket])
+            return to_array([number for bucket in buckets for number in bucket
+                             if matches(number, names[slots[number]])])
+        
+        live = [slot for slot, number in enumerate(numbers)
+                if number >= 0 and (not query or matches(number, names[slot]))]
+        if sort_key == 'name':
+            # Sorting slots by the stored names makes no new objects per student
+            order = sorted_in_chunks(live, key=names.__getitem__, reverse=descending)
+            release(live)
+            result = [numbers[slot] for slot in order]
+            release(order)
+            return to_array(result)
+        if sort_key == 'number':
+            order = sorted_in_chunks([numbers[slot] for slot in live], reverse=descending)
+            release(live)
+            return to_array(order)
+        raise ValueError(f"Cannot sort by {sort_key!r}")
+    
+    def rank(self, number, descending=True):
+        """Position of a student in ranked() order, or None if there is no such student"""
+        slot = self.slots.get(number)
+        if slot is None:
+            return None
+        overall = self.overall(slot)
+        before = 0
+        for mark, bucket in enumerate(self.by_overall):
+            if (mark > overall) if descending else (mark < overall):
+                before += len(bucket)
+        return before + bisect_left(self.by_overall[overall], number)
+    
+    def close(self):
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
\ No newline at end of file